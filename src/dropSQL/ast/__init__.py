@@ -2,6 +2,7 @@ from . import stmt
 from .alias import Alias, AliasedTable, AliasedExpression
 from .ast import Ast, AstStmt, FromSQL
 from .column_def import ColumnDef
+from .create_index import CreateIndex
 from .create_table import CreateTable
 from .delete_from import DeleteFrom
 from .drop_table import DropTable
@@ -12,5 +13,7 @@ from .insert_into import InsertInto
 from .join import *
 from .result_column import ResultColumn, ResultStar, ResultExpression
 from .select_from import SelectFrom
+from .transaction import BeginTransaction, CommitTransaction, RollbackTransaction, TransactionControl
 from .ty import *
 from .update_set import UpdateSet
+from .vacuum_database import VacuumDatabase
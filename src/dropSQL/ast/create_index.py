@@ -0,0 +1,140 @@
+from typing import *
+
+from dropSQL.engine.types import *
+from dropSQL.generic import *
+from dropSQL.parser.streams import *
+from dropSQL.parser.tokens import *
+from .ast import AstStmt
+from .existence import IfNotExists
+
+if TYPE_CHECKING:
+    from dropSQL import fs
+
+__all__ = [
+    'CreateIndex',
+    'INDEX',
+]
+
+# words of the statement which are not reserved, so that they still may name tables and columns
+INDEX = Identifier('index')
+USING = Identifier('using')
+
+
+class CreateIndex(AstStmt):
+    def __init__(self, if_not_exists: Optional[IfNotExists], index: Identifier, table: Identifier,
+                 column: Identifier, using: Optional[Identifier] = None) -> None:
+        super().__init__()
+
+        self.if_not_exists = if_not_exists
+        self.index = index
+        self.table = table
+        self.column = column
+        self.using = using  # kind of index, hash by default
+
+    def to_sql(self) -> str:
+        stmt = '/create index '
+
+        if self.if_not_exists is not None:
+            stmt += self.if_not_exists.to_sql()
+            stmt += ' '
+
+        stmt += str(self.index)
+        stmt += ' on '
+        stmt += str(self.table)
+        stmt += ' ('
+        stmt += str(self.column)
+        stmt += ')'
+
+        if self.using is not None:
+            stmt += ' /using '
+            stmt += str(self.using)
+
+        stmt += ' /drop'
+
+        return stmt
+
+    @classmethod
+    def from_sql(cls, tokens: Stream[Token]) -> IResult['CreateIndex']:
+        """
+        /create_index_stmt
+            : "/create" "index" existence /index_name "on" /table_name "(" /column_name ")" /index_kind /drop
+            ;
+
+        /index_kind
+            : /* empty */
+            | "/using" ("hash" | "btree")
+            ;
+        """
+        # next item must be the '/create' token
+        t = tokens.next().and_then(Cast(Create))
+        if not t: return IErr(t.err())
+
+        t = tokens.next().and_then(Cast(Identifier))
+        if not t: return IErr(t.err().empty_to_incomplete())
+        if t.ok() != INDEX: return IErr(Syntax('index', str(t.ok())))
+
+        t = IfNotExists.from_sql(tokens)
+        if not t: return IErr(t.err().empty_to_incomplete())
+        if_not_exists = t.ok()
+
+        t = tokens.next().and_then(Cast(Identifier))
+        if not t: return IErr(t.err().empty_to_incomplete())
+        index = t.ok()
+
+        t = tokens.next().and_then(Cast(On))
+        if not t: return IErr(t.err().empty_to_incomplete())
+
+        t = tokens.next().and_then(Cast(Identifier))
+        if not t: return IErr(t.err().empty_to_incomplete())
+        table = t.ok()
+
+        t = tokens.next().and_then(Cast(LParen))
+        if not t: return IErr(t.err().empty_to_incomplete())
+
+        t = tokens.next().and_then(Cast(Identifier))
+        if not t: return IErr(t.err().empty_to_incomplete())
+        column = t.ok()
+
+        t = tokens.next().and_then(Cast(RParen))
+        if not t: return IErr(t.err().empty_to_incomplete())
+
+        using = None
+        t = tokens.peek()
+        if t and t.ok() == USING:
+            tokens.next()
+
+            t = tokens.next().and_then(Cast(Identifier))
+            if not t: return IErr(t.err().empty_to_incomplete())
+            using = t.ok()
+
+        t = tokens.next().and_then(Cast(Drop))
+        if not t: return IErr(t.err().empty_to_incomplete())
+
+        return IOk(CreateIndex(if_not_exists, index, table, column, using))
+
+    def execute(self, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[bool, str]:
+        if self.table == Identifier('autism'): return Err('Can not operate on master table')
+
+        for table in db.get_tables():
+            for definition in table.get_indexes():
+                if definition.name == self.index:
+                    if self.if_not_exists is not None:  # error-tolerant
+                        return Ok(False)
+                    else:
+                        return Err(f'Index {self.index} exists')
+
+        t = db.get_table_by_name(self.table)
+        if not t: return Err(t.err())
+        table = t.ok()
+
+        for i, column in enumerate(table.get_columns()):
+            if column.name == self.column:
+                break
+        else:
+            return Err(f'Column {self.column} not found in table {self.table}')
+
+        kind = 'hash' if self.using is None else self.using.identifier.lower()
+        t = table.create_index(self.index, i, kind)
+        if not t: return Err(t.err())
+
+        return Ok(True)
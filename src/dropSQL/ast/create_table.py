@@ -113,6 +113,9 @@ class CreateTable(AstStmt):
                 return Err(f'Table {self.table} exists')
 
         else:
+            if sum(column.is_primary_key for column in self.columns) > 1:
+                return Err('Only one column can be the primary key')
+
             t = db.new_table()
             if not t: return Err(t.err())
             table = t.ok()
@@ -8,6 +8,7 @@ from dropSQL.parser.tokens import *
 from .ast import AstStmt
 from .expression import Expression
 from .identifier import Identifier
+from .planner import filter_row_set
 from .where import WhereFromSQL
 
 if TYPE_CHECKING:
@@ -66,9 +67,9 @@ class DeleteFrom(AstStmt):
         if not t: return Err(t.err())
         table = t.ok()
 
-        rs = TableRowSet(table)
-        if self.where is not None:
-            rs = FilteredRowSet(rs, self.where, args)
+        t = filter_row_set(TableRowSet(table), self.where, args)
+        if not t: return Err(t.err())
+        rs = t.ok()
 
         ids: List[int] = [row.id for row in rs.iter()]
 
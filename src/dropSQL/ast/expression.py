@@ -1,6 +1,8 @@
 import abc
+from operator import add, itemgetter, mul, sub, truediv
 from typing import *
 
+from dropSQL.engine.types import EVAL_ERRORS
 from dropSQL.generic import *
 from dropSQL.parser.streams import *
 from dropSQL.parser.tokens import *
@@ -8,9 +10,12 @@ from .ast import Ast, FromSQL
 
 if TYPE_CHECKING:
     from dropSQL.engine.types import *
+    from dropSQL.engine.column import Column
     from dropSQL.engine.context import Context
+    from .ty import Ty
 
 __all__ = [
+    'Evaluator',
     'Expression',
     'ExpressionLiteral',
     'ExpressionLiteralInt',
@@ -21,8 +26,30 @@ __all__ = [
     'ExpressionParen',
     'ExpressionBinary',
     'PrimitiveTy',
+    'literal',
+    'unwrap',
 ]
 
+# compiled expression: row data -> value
+Evaluator = Callable[['ROW_TYPE'], 'DB_TYPE']
+
+# binary operators except for /and and /or, which short-circuit
+OPERATORS: Dict[str, Callable[['DB_TYPE', 'DB_TYPE'], 'DB_TYPE']] = {
+    Operator.EQ: lambda lhs, rhs: int(lhs == rhs),
+    Operator.NE: lambda lhs, rhs: int(lhs != rhs),
+    Operator.ADD: add,
+    Operator.SUB: sub,
+    Operator.MUL: mul,
+    Operator.DIV: truediv,
+    Operator.GT: lambda lhs, rhs: int(lhs > rhs),
+    Operator.LT: lambda lhs, rhs: int(lhs < rhs),
+    Operator.GE: lambda lhs, rhs: int(lhs >= rhs),
+    Operator.LE: lambda lhs, rhs: int(lhs <= rhs),
+}
+
+# binary operators whose result is not necessarily 0 or 1
+ARITHMETIC = (Operator.ADD, Operator.SUB, Operator.MUL, Operator.DIV)
+
 
 class Expression(Ast, FromSQL['Expression'], metaclass=abc.ABCMeta):
     @classmethod
@@ -98,6 +125,31 @@ class Expression(Ast, FromSQL['Expression'], metaclass=abc.ABCMeta):
         :return: Positive result with scalar value, or error description.
         """
 
+    @abc.abstractmethod
+    def compile(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result[Evaluator, str]:
+        """
+        Turn expression into a function of row data, with references and placeholders resolved once.
+
+        The function raises one of `EVAL_ERRORS` where `eval_with` would return an error.
+        :return: Positive result with the function, or error description.
+        """
+
+    @abc.abstractmethod
+    def simplify(self, args: 'ARGS_TYPE') -> 'Expression':
+        """
+        Equivalent expression with constant parts computed in advance: placeholders replaced by argument values,
+        operations over literals folded, parentheses dropped, and `/and`, `/or` with a constant operand reduced.
+
+        Result is meant to be compiled, not printed: without parentheses it may not parse back the same.
+        """
+
+    @abc.abstractmethod
+    def derive_type(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result['Ty', str]:
+        """
+        Type of values of the expression, known without evaluating it.
+        :return: Positive result with the type, or error description.
+        """
+
 
 PrimitiveTy = TypeVar('PrimitiveTy', int, float, str)
 
@@ -111,6 +163,17 @@ class ExpressionLiteral(Expression, Generic[PrimitiveTy]):
     def __eq__(self, o: object) -> bool:
         return isinstance(o, type(self)) and self.value == o.value
 
+    def compile(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result[Evaluator, str]:
+        value = self.value
+        return Ok(lambda _: value)
+
+    def simplify(self, args: 'ARGS_TYPE') -> Expression:
+        return self
+
+    def derive_type(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result['Ty', str]:
+        from .ty import Ty
+        return Ok(Ty.of(self.value))
+
 
 class ExpressionLiteralInt(ExpressionLiteral[int]):
     def __init__(self, lit: int) -> None:
@@ -174,6 +237,23 @@ class ExpressionPlaceholder(Expression):
         lit: DB_TYPE = context.args[self.index - 1]
         return Ok(lit)
 
+    def compile(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result[Evaluator, str]:
+        if len(args) <= (self.index - 1): return Err(f'Not enough arguments')
+        value = args[self.index - 1]
+        return Ok(lambda _: value)
+
+    def simplify(self, args: 'ARGS_TYPE') -> Expression:
+        if len(args) <= (self.index - 1): return self  # error is reported by `compile`
+        lit = literal(args[self.index - 1])
+        return self if lit is None else lit
+
+    def derive_type(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result['Ty', str]:
+        from .ty import Ty
+        if len(args) <= (self.index - 1): return Err(f'Not enough arguments')
+        ty = Ty.of(args[self.index - 1])
+        if ty is None: return Err(f'Unsupported argument type: {type(args[self.index - 1]).__name__}')
+        return Ok(ty)
+
 
 class ExpressionReference(Expression):
     """ Reference to a /table/column """
@@ -194,17 +274,33 @@ class ExpressionReference(Expression):
         return s
 
     def eval_with(self, context: 'Context') -> Result['DB_TYPE', str]:
-        # TODO: cache index
-        # find column with corresponding table and column names
-        for i, column in enumerate(context.row.set.columns()):
-            if self.table is None:
-                if self.column == column.name:
-                    return Ok(context.row.data[i])
-            else:
-                if self.table == column.table and self.column == column.name:
-                    return Ok(context.row.data[i])
+        i = self.resolve(context.row.set.columns())
+        if not i: return Err(i.err())
+        return Ok(context.row.data[i.ok()])
+
+    def compile(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result[Evaluator, str]:
+        i = self.resolve(columns)
+        if not i: return Err(i.err())
+        return Ok(itemgetter(i.ok()))
 
-        return Err(f'Reference not found in context: {self.to_sql()}')
+    def simplify(self, args: 'ARGS_TYPE') -> Expression:
+        return self
+
+    def derive_type(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result['Ty', str]:
+        i = self.resolve(columns)
+        if not i: return Err(i.err())
+        return Ok(columns[i.ok()].ty)
+
+    def resolve(self, columns: List['Column']) -> Result[int, str]:
+        """
+        Position of the only column with matching table and column names.
+        """
+        found = [i for i, column in enumerate(columns)
+                 if self.column == column.name and (self.table is None or self.table == column.table)]
+
+        if not found: return Err(f'Reference not found in context: {self.to_sql()}')
+        if len(found) > 1: return Err(f'Ambiguous reference: {self.to_sql()}')
+        return Ok(found[0])
 
 
 class ExpressionParen(Expression):
@@ -222,6 +318,15 @@ class ExpressionParen(Expression):
     def eval_with(self, context: 'Context') -> Result['DB_TYPE', str]:
         return self.inner.eval_with(context)
 
+    def compile(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result[Evaluator, str]:
+        return self.inner.compile(columns, args)
+
+    def simplify(self, args: 'ARGS_TYPE') -> Expression:
+        return self.inner.simplify(args)
+
+    def derive_type(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result['Ty', str]:
+        return self.inner.derive_type(columns, args)
+
 
 class ExpressionBinary(Expression):
     def __init__(self, op: Operator, lhs: Expression, rhs: Expression) -> None:
@@ -296,3 +401,115 @@ class ExpressionBinary(Expression):
 
         except TypeError as e:
             return Err(str(e))
+
+    def compile(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result[Evaluator, str]:
+        op = self.operator.operator
+        if op not in OPERATORS and op not in (Operator.AND, Operator.OR): return Err(f'Unsupported operator: {op}')
+
+        lhs = self.lhs.compile(columns, args)
+        if not lhs: return Err(lhs.err())
+        lhs = lhs.ok()
+
+        rhs = self.rhs.compile(columns, args)
+        if not rhs: return Err(rhs.err())
+        rhs = rhs.ok()
+
+        if op == Operator.AND:
+            return Ok(lambda row: int(bool(lhs(row)) and bool(rhs(row))))
+        if op == Operator.OR:
+            return Ok(lambda row: int(bool(lhs(row)) or bool(rhs(row))))
+
+        f = OPERATORS[op]
+
+        # common case: column compared with a constant
+        left, right = unwrap(self.lhs), unwrap(self.rhs)
+        if isinstance(left, ExpressionReference) and isinstance(right, (ExpressionLiteral, ExpressionPlaceholder)):
+            i = left.resolve(columns).ok()
+            value = rhs(None)
+            return Ok(lambda row: f(row[i], value))
+
+        return Ok(lambda row: f(lhs(row), rhs(row)))
+
+    def simplify(self, args: 'ARGS_TYPE') -> Expression:
+        lhs = self.lhs.simplify(args)
+        rhs = self.rhs.simplify(args)
+        op = self.operator.operator
+
+        if isinstance(lhs, ExpressionLiteral) and isinstance(rhs, ExpressionLiteral):
+            try:
+                if op == Operator.AND:
+                    lit = literal(int(bool(lhs.value) and bool(rhs.value)))
+                elif op == Operator.OR:
+                    lit = literal(int(bool(lhs.value) or bool(rhs.value)))
+                elif op in OPERATORS:
+                    lit = literal(OPERATORS[op](lhs.value, rhs.value))
+                else:
+                    lit = None
+                if lit is not None: return lit
+
+            except EVAL_ERRORS:
+                pass  # error is raised when rows are evaluated, if there are any
+
+        if op in (Operator.AND, Operator.OR):
+            for const, other in ((lhs, rhs), (rhs, lhs)):
+                if not isinstance(const, ExpressionLiteral): continue
+
+                # `x /and 0` is 0, `x /or 1` is 1
+                if bool(const.value) == (op == Operator.OR): return literal(int(bool(const.value)))
+                # `x /and 1` and `x /or 0` are x, as long as x is 0 or 1 itself
+                if isinstance(other, ExpressionBinary) and other.operator.operator not in ARITHMETIC: return other
+
+        return ExpressionBinary(self.operator, lhs, rhs)
+
+    def derive_type(self, columns: List['Column'], args: 'ARGS_TYPE') -> Result['Ty', str]:
+        from .ty import FloatTy, IntegerTy, VarCharTy
+
+        lhs = self.lhs.derive_type(columns, args)
+        if not lhs: return Err(lhs.err())
+        lhs = lhs.ok()
+
+        rhs = self.rhs.derive_type(columns, args)
+        if not rhs: return Err(rhs.err())
+        rhs = rhs.ok()
+
+        # comparisons and logic give 0 or 1
+        op = self.operator.operator
+        if op not in ARITHMETIC: return Ok(IntegerTy())
+
+        left, right = lhs.primitive(), rhs.primitive()
+        if left is str and right is str and op == Operator.ADD:
+            if lhs.width is None or rhs.width is None: return Ok(VarCharTy(None))
+            return Ok(VarCharTy(lhs.width + rhs.width))
+        if op == Operator.MUL and (left, right) in ((str, int), (int, str)):
+            string, count = (lhs, self.rhs) if left is str else (rhs, self.lhs)
+            # repeated string has known width only if it is repeated a constant number of times
+            count = count.simplify(args)
+            if string.width is None or not isinstance(count, ExpressionLiteral): return Ok(VarCharTy(None))
+            return Ok(VarCharTy(string.width * max(count.value, 0)))
+        if str in (left, right):
+            return Err(f'Unsupported operand types for {op}: {lhs.to_sql()} and {rhs.to_sql()}')
+
+        if op == Operator.DIV or float in (left, right): return Ok(FloatTy())
+        return Ok(IntegerTy())
+
+
+def literal(value: 'DB_TYPE') -> Optional[ExpressionLiteral]:
+    """
+    Literal expression of the value, or None if values of its type can not be written in SQL.
+    """
+    if isinstance(value, int):
+        return ExpressionLiteralInt(value)
+    if isinstance(value, float):
+        return ExpressionLiteralFloat(value)
+    if isinstance(value, str):
+        return ExpressionLiteralVarChar(value)
+    return None
+
+
+def unwrap(expr: Expression) -> Expression:
+    """
+    Strip redundant parentheses.
+    """
+    while isinstance(expr, ExpressionParen):
+        expr = expr.inner
+    return expr
@@ -1,6 +1,5 @@
 from typing import *
 
-from dropSQL.engine.context import Context
 from dropSQL.engine.types import *
 from dropSQL.generic import *
 from dropSQL.parser.streams import *
@@ -106,23 +105,27 @@ class InsertInto(AstStmt, FromSQL['InsertInto']):
         if not t: return Err(t.err())
         transition = t.ok()
 
-        ctx = Context.empty()
-        ctx.args = args
-
+        rows: List[ROW_TYPE] = []
         for value in self.values:
             if len(value) != len(self.columns): return Err('#values != number of columns')
 
             row: ROW_TYPE = [None] * len(self.columns)
             for i, expr in enumerate(value):
 
-                res = expr.eval_with(ctx)
+                res = expr.compile([], args)
                 if not res: return Err(res.err())
-                item = res.ok()
+
+                try:
+                    item = res.ok()([])
+                except EVAL_ERRORS as e:
+                    return Err(str(e))
 
                 row[transition[i]] = item
 
-            res = table.insert(row)
-            if not res: return Err(res.err())
+            rows.append(row)
+
+        res = table.insert_many(rows)
+        if not res: return Err(res.err())
 
         return Ok(None)
 
@@ -1,8 +1,6 @@
 import abc
 from typing import *
 
-from dropSQL.engine.row_set import *
-from dropSQL.engine.types import *
 from dropSQL.generic import *
 from dropSQL.parser.streams import *
 from dropSQL.parser.tokens import *
@@ -10,9 +8,6 @@ from .alias import AliasedTable
 from .ast import *
 from .expression import Expression
 
-if TYPE_CHECKING:
-    from dropSQL import fs
-
 __all__ = [
     'JoinClausesParser',
     'JoinAst',
@@ -51,12 +46,7 @@ class JoinAst(Ast, FromSQL['JoinAst'], metaclass=abc.ABCMeta):
         super().__init__()
 
         self.table = table
-
-    @abc.abstractmethod
-    def join(self, lhs: RowSet, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[RowSet, str]:
-        """
-        Join `lhs` on the left with self on the right.
-        """
+        self.constraint: Optional[Expression] = None
 
     @classmethod
     def from_sql(cls, tokens: Stream[Token]) -> IResult['JoinAst']:
@@ -83,14 +73,6 @@ class CrossJoin(JoinAst, FromSQL['CrossJoin']):
     def __init__(self, table: AliasedTable) -> None:
         super().__init__(table)
 
-    def join(self, lhs: RowSet, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[RowSet, str]:
-        rhs = self.table.row_set(db)
-        if not rhs: return Err(rhs.err())
-
-        rs = CrossJoinRowSet(lhs, rhs.ok())
-
-        return Ok(rs)
-
     def to_sql(self) -> str:
         join = ', '
         join += self.table.to_sql()
@@ -120,13 +102,6 @@ class InnerJoin(CrossJoin, FromSQL['InnerJoin']):
 
         self.constraint = constraint
 
-    def join(self, lhs: RowSet, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[RowSet, str]:
-        r = self.table.row_set(db)
-        if not r: return Err(r.err())
-        rhs = r.ok()
-
-        return Ok(InnerJoinRowSet(lhs, rhs, self.constraint, args))
-
     def to_sql(self) -> str:
         join = ' /join '
         join += self.table.to_sql()
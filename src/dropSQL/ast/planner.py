@@ -0,0 +1,425 @@
+"""
+Choice of access paths for row sets.
+"""
+
+from typing import *
+
+from dropSQL.engine.column import Column
+from dropSQL.engine.row_set import *
+from dropSQL.engine.spool import MEMORY_ROWS
+from dropSQL.engine.types import *
+from dropSQL.generic import *
+from dropSQL.parser.tokens import Operator
+from .expression import *
+
+if TYPE_CHECKING:
+    from dropSQL import fs
+
+__all__ = [
+    'check_references',
+    'conjuncts',
+    'filter_row_set',
+    'join_row_set',
+    'join_tables',
+    'prune_columns',
+    'references',
+]
+
+
+def filter_row_set(rs: RowSet, where: Optional[Expression], args: ARGS_TYPE) -> Result[RowSet, str]:
+    """
+    Restrict row set to the rows which satisfy `where` clause.
+
+    If the row set reads a table directly, and the clause compares an indexed column with a literal
+    or an argument, then only matching records are fetched through the index:
+    equality through any index, `<`, `<=`, `>`, `>=` through btree index.
+    The whole clause is still checked against every row.
+    Clause is simplified first; if it turns out to be constant, the row set is either kept whole or replaced
+    by an empty one.
+
+    :return: Filtered row set, or error if the clause does not fit the row set, e.g. unknown column.
+    """
+    if where is None: return Ok(rs)
+
+    # folding may throw away parts of the clause, which must be valid nonetheless
+    t = check_references(where, rs.columns())
+    if not t: return Err(t.err())
+
+    where = where.simplify(args)
+    if isinstance(where, ExpressionLiteral):
+        return Ok(rs if where.value else EmptyRowSet(rs.columns()))
+
+    scan = index_scan(rs, where, args)
+    if scan is not None: rs = scan
+
+    rs = FilteredRowSet(rs, where, args)
+    if not rs.predicate: return Err(rs.predicate.err())
+
+    return Ok(rs)
+
+
+def join_tables(tables: List[RowSet], constraints: List[Optional[Expression]], where: Optional[Expression],
+                args: ARGS_TYPE) -> Result[RowSet, str]:
+    """
+    Join row sets of the tables from left to right, and filter the result.
+
+    `/where` clause and `/on` constraints of the joins are split into terms, and every term is applied
+    as early as possible: terms which mention columns of a single table filter that table before the joins,
+    terms which mention several tables become constraints of the join which adds the last of them.
+    Terms without columns filter the final result.
+
+    :param constraints: `/on` constraint of every table except for the first one, None for cross joins.
+    :return: Joined row set, or error if a term does not fit the tables, e.g. unknown column.
+    """
+    columns: List[Column] = []
+    owners: List[int] = []  # table of every column
+    scopes: List[int] = []  # number of columns visible to the constraint of the join with the table
+    for i, rs in enumerate(tables):
+        columns.extend(rs.columns())
+        owners.extend(i for _ in rs.columns())
+        scopes.append(len(columns))
+
+    terms: List[Tuple[Expression, int]] = []
+    if where is not None: terms.extend((term, len(columns)) for term in conjuncts(where))
+    for i, constraint in enumerate(constraints, 1):
+        if constraint is not None: terms.extend((term, scopes[i]) for term in conjuncts(constraint))
+
+    filters: List[List[Expression]] = [[] for _ in tables]
+    joins: List[List[Expression]] = [[] for _ in tables]
+    rest: List[Expression] = []
+    for term, scope in terms:
+        used: Set[int] = set()
+        for ref in references(term):
+            column = ref.resolve(columns[:scope])
+            if not column: return Err(column.err())
+            used.add(owners[column.ok()])
+
+        if not used:
+            rest.append(term)
+        elif len(used) == 1:
+            filters[used.pop()].append(term)
+        else:
+            joins[max(used)].append(term)
+
+    def where_all(rs: RowSet, terms: List[Expression]) -> Result[RowSet, str]:
+        return filter_row_set(rs, conjunction(terms) if terms else None, args)
+
+    r = where_all(tables[0], filters[0])
+    if not r: return Err(r.err())
+    rs = r.ok()
+
+    for i in range(1, len(tables)):
+        r = where_all(tables[i], filters[i])
+        if not r: return Err(r.err())
+        rhs = r.ok()
+
+        if joins[i]:
+            r = join_row_set(rs, rhs, conjunction(joins[i]), args)
+            if not r: return Err(r.err())
+            rs = r.ok()
+        else:
+            rs = CrossJoinRowSet(rs, rhs)
+
+    return where_all(rs, rest)
+
+
+def prune_columns(rs: RowSet, needed: Optional[Set[int]] = None) -> None:
+    """
+    Tell table scans under the row set which columns are actually used, so that others are not decoded.
+
+    Row sets keep their columns, unused ones just become None.  Only row sets built by the planner are understood,
+    others are left reading everything.
+
+    :param needed: Indices of columns of `rs` read by its consumer, all of them by default.
+    """
+    width = len(rs.columns())
+    if needed is None: needed = set(range(width))
+
+    def used(expr: Expression, columns: List[Column]) -> Set[int]:
+        return {ref.resolve(columns).ok() for ref in references(expr)}
+
+    if isinstance(rs, ProjectionRowSet):
+        inner = rs.inner.columns()
+        below: Set[int] = set()
+        for out in rs.outputs:
+            if out.is_star():
+                below.update(range(len(inner)))
+            else:
+                below.update(used(out.as_expression().expression.expression, inner))
+        prune_columns(rs.inner, below)
+
+    elif isinstance(rs, FilteredRowSet):
+        prune_columns(rs.inner, needed | used(rs.expr, rs.columns()))
+
+    elif isinstance(rs, (RenameTableRowSet, InnerJoinRowSet)):
+        prune_columns(rs.inner, needed)
+
+    elif isinstance(rs, SortedRowSet):
+        prune_columns(rs.inner, needed | set(rs.keys))
+
+    elif isinstance(rs, (CrossJoinRowSet, HashJoinRowSet, MergeJoinRowSet)):
+        split = len(rs.lhs.columns())
+        left = {i for i in needed if i < split}
+        right = {i - split for i in needed if i >= split}
+        if not isinstance(rs, CrossJoinRowSet):
+            left.update(i for i, _ in rs.keys)
+            right.update(i for _, i in rs.keys)
+        prune_columns(rs.lhs, left)
+        prune_columns(rs.rhs, right)
+
+    elif type(rs) is TableRowSet and len(needed) < width:
+        rs.needed = sorted(needed)
+
+
+def join_row_set(lhs: RowSet, rhs: RowSet, on: Expression, args: ARGS_TYPE) -> Result[RowSet, str]:
+    """
+    Inner join of two row sets on a condition.
+
+    Terms of the condition which compare a left column with a right column for equality are answered
+    by hash join, and the remaining terms are checked against joined rows.
+    Merge join is used instead when both inputs can be read in key order through btree indexes,
+    or when even the smaller input is too large to be hashed in memory; then unordered inputs are sorted.
+    Without such terms every pair of rows is checked (nested loops).
+
+    :return: Joined row set, or error if the condition does not fit the row sets.
+    """
+    columns = lhs.columns() + rhs.columns()
+    split = len(lhs.columns())
+
+    t = check_references(on, columns)
+    if not t: return Err(t.err())
+
+    on = on.simplify(args)
+    if isinstance(on, ExpressionLiteral):
+        return Ok(CrossJoinRowSet(lhs, rhs) if on.value else EmptyRowSet(columns))
+
+    keys: List[Tuple[int, int]] = []
+    residual: List[Expression] = []
+    for term in conjuncts(on):
+        key = equi_key(term, columns, split)
+        if key is not None:
+            keys.append(key)
+        else:
+            residual.append(term)
+
+    if not keys:
+        rs = InnerJoinRowSet(lhs, rhs, on, args)
+        if not rs.inner.predicate: return Err(rs.inner.predicate.err())
+        return Ok(rs)
+
+    left_keys = [left for left, _ in keys]
+    right_keys = [right for _, right in keys]
+    left_ordered, right_ordered = index_order(lhs, left_keys), index_order(rhs, right_keys)
+    sizes = lhs.size_hint(), rhs.size_hint()
+
+    if left_ordered is not None and right_ordered is not None:
+        rs = MergeJoinRowSet(left_ordered, right_ordered, keys)
+    elif None not in sizes and min(sizes) > MEMORY_ROWS:
+        rs = MergeJoinRowSet(left_ordered or SortedRowSet(lhs, left_keys),
+                             right_ordered or SortedRowSet(rhs, right_keys), keys)
+    else:
+        rs = HashJoinRowSet(lhs, rhs, keys)
+
+    if not residual: return Ok(rs)
+
+    rs = FilteredRowSet(rs, conjunction(residual), args)
+    if not rs.predicate: return Err(rs.predicate.err())
+
+    return Ok(rs)
+
+
+def equi_key(expr: Expression, columns: List[Column], split: int) -> Optional[Tuple[int, int]]:
+    """
+    Match `column = column` where one column comes from the left row set, and the other from the right one.
+
+    :param split: Number of left columns, which go first.
+    :return: Index of the left column and index of the right column within their row sets; or None.
+    """
+    if not isinstance(expr, ExpressionBinary) or expr.operator.operator != Operator.EQ: return None
+
+    lhs, rhs = unwrap(expr.lhs), unwrap(expr.rhs)
+    if not isinstance(lhs, ExpressionReference) or not isinstance(rhs, ExpressionReference): return None
+
+    a, b = lhs.resolve(columns), rhs.resolve(columns)
+    if not a or not b: return None
+    a, b = sorted((a.ok(), b.ok()))
+
+    if a < split <= b: return a, b - split
+    return None
+
+
+def index_order(rs: RowSet, keys: List[int]) -> Optional[RowSet]:
+    """
+    Read a table in the order of a single key column through its btree index.
+
+    :return: Ordered row set with the same columns, or None if the row set does not read such a table.
+    """
+    rename = None
+    base = rs
+    if isinstance(base, RenameTableRowSet):
+        rename = base.rename
+        base = base.inner
+    if type(base) is not TableRowSet or len(keys) != 1: return None
+
+    definition = base.table.find_index(keys[0], 'btree')
+    if definition is None: return None
+
+    ordered: RowSet = IndexRangeRowSet(base.table, definition, None, True, None, True)
+    if rename is not None: ordered = RenameTableRowSet(ordered, rename)
+    return ordered
+
+
+def check_references(expr: Expression, columns: List[Column]) -> Result[None, str]:
+    """
+    Make sure that every column reference within expression is bound to exactly one of the columns.
+    Should be done before `Expression.simplify`, which may drop references.
+    """
+    for ref in references(expr):
+        t = ref.resolve(columns)
+        if not t: return Err(t.err())
+
+    return Ok(None)
+
+
+def references(expr: Expression) -> Iterator[ExpressionReference]:
+    """
+    All column references within expression.
+    """
+    if isinstance(expr, ExpressionReference):
+        yield expr
+    elif isinstance(expr, ExpressionParen):
+        yield from references(expr.inner)
+    elif isinstance(expr, ExpressionBinary):
+        yield from references(expr.lhs)
+        yield from references(expr.rhs)
+
+
+def conjunction(terms: List[Expression]) -> Expression:
+    """
+    Inverse of `conjuncts`: `/and` chain of the terms.
+    """
+    expr = terms[-1]
+    for term in reversed(terms[:-1]):
+        expr = ExpressionBinary(Operator(Operator.AND), term, expr)
+    return expr
+
+
+def index_scan(rs: RowSet, where: Expression, args: ARGS_TYPE) -> Optional[RowSet]:
+    rename = None
+    base = rs
+    if isinstance(base, RenameTableRowSet):
+        rename = base.rename
+        base = base.inner
+    if type(base) is not TableRowSet: return None
+
+    table = base.table
+    columns = rs.columns()
+    terms = [c for c in (comparison(term, columns, args) for term in conjuncts(where)) if c is not None]
+    scan: Optional[RowSet] = None
+
+    # equality is the most selective
+    for column, op, value in terms:
+        if op != Operator.EQ: continue
+
+        definition = table.find_index(column, 'hash')
+        if definition is None and comparable(value, columns[column]):
+            definition = table.find_index(column, 'btree')
+        if definition is None: continue
+
+        scan = IndexScanRowSet(table, definition, value)
+        break
+
+    # otherwise intersect all bounds on the first column with btree index
+    if scan is None:
+        for column, _, _ in terms:
+            definition = table.find_index(column, 'btree')
+            if definition is None: continue
+
+            bounds = [(op, value) for c, op, value in terms
+                      if c == column and op in RANGE and comparable(value, columns[column])]
+            if not bounds: continue
+
+            scan = range_scan(table, definition, bounds)
+            break
+
+    if scan is not None and rename is not None: scan = RenameTableRowSet(scan, rename)
+    return scan
+
+
+# comparison operators with column on the left, which btree can answer
+RANGE = (Operator.LT, Operator.LE, Operator.GT, Operator.GE)
+# the same comparison with operands swapped
+FLIPPED = {
+    Operator.EQ: Operator.EQ,
+    Operator.LT: Operator.GT,
+    Operator.LE: Operator.GE,
+    Operator.GT: Operator.LT,
+    Operator.GE: Operator.LE,
+}
+
+
+def range_scan(table: 'fs.Table', definition: 'fs.IndexDef', bounds: List[Tuple[str, DB_TYPE]]) -> RowSet:
+    low, low_inclusive = None, True
+    high, high_inclusive = None, True
+
+    for op, value in bounds:
+        inclusive = op in (Operator.LE, Operator.GE)
+        if op in (Operator.GT, Operator.GE):
+            if low is None or value > low or value == low and not inclusive:
+                low, low_inclusive = value, inclusive
+        else:
+            if high is None or value < high or value == high and not inclusive:
+                high, high_inclusive = value, inclusive
+
+    return IndexRangeRowSet(table, definition, low, low_inclusive, high, high_inclusive)
+
+
+def conjuncts(expr: Expression) -> Iterator[Expression]:
+    """
+    Terms of `/and` chain, each of which must hold.
+    """
+    expr = unwrap(expr)
+    if isinstance(expr, ExpressionBinary) and expr.operator.operator == Operator.AND:
+        yield from conjuncts(expr.lhs)
+        yield from conjuncts(expr.rhs)
+    else:
+        yield expr
+
+
+def comparison(expr: Expression, columns: List[Column], args: ARGS_TYPE) -> Optional[Tuple[int, str, DB_TYPE]]:
+    """
+    Match `column op constant` in either order, where op is `=`, `<`, `<=`, `>` or `>=`.
+
+    :return: Index of the column, operator as if the column was on the left, and the constant value; or None.
+    """
+    if not isinstance(expr, ExpressionBinary) or expr.operator.operator not in FLIPPED: return None
+    op = expr.operator.operator
+
+    for ref, other, flip in ((expr.lhs, expr.rhs, False), (expr.rhs, expr.lhs, True)):
+        ref, other = unwrap(ref), unwrap(other)
+        if not isinstance(ref, ExpressionReference): continue
+
+        value = constant(other, args)
+        if value is None: continue
+
+        column = ref.resolve(columns)
+        if not column: continue
+
+        return column.ok(), FLIPPED[op] if flip else op, value
+
+    return None
+
+
+def comparable(value: DB_TYPE, column: Column) -> bool:
+    """
+    Whether value can be ordered against keys of the column.
+    """
+    return isinstance(value, str) == (column.ty.primitive() is str)
+
+
+def constant(expr: Expression, args: ARGS_TYPE) -> Optional[DB_TYPE]:
+    if isinstance(expr, ExpressionLiteral):
+        return expr.value
+    if isinstance(expr, ExpressionPlaceholder) and expr.index <= len(args):
+        return args[expr.index - 1]
+    return None
@@ -10,6 +10,7 @@ from .ast import AstStmt
 from .comma_separated import CommaSeparated
 from .expression import Expression
 from .join import *
+from .planner import join_tables, prune_columns
 from .result_column import ResultColumn
 from .where import WhereFromSQL
 
@@ -87,18 +88,19 @@ class SelectFrom(AstStmt):
         return IOk(SelectFrom(columns, table, joins, where))
 
     def execute(self, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result['RowSet', str]:
-        r = self.table.row_set(db)
-        if not r: return Err(r.err())
-        rs = r.ok()
-
-        for join in self.joins:
-            r = join.join(rs, db, args)
+        tables: List[RowSet] = []
+        for table in [self.table] + [join.table for join in self.joins]:
+            r = table.row_set(db)
             if not r: return Err(r.err())
-            rs = r.ok()
+            tables.append(r.ok())
 
-        if self.where is not None:
-            rs = FilteredRowSet(rs, self.where, args)
+        r = join_tables(tables, [join.constraint for join in self.joins], self.where, args)
+        if not r: return Err(r.err())
+        rs = r.ok()
 
         rs = ProjectionRowSet(rs, self.columns, args)
+        if not rs.evaluators: return Err(rs.evaluators.err())
+
+        prune_columns(rs)
 
         return Ok(rs)
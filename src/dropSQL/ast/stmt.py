@@ -1,17 +1,26 @@
 from .ast import AstStmt
+from .create_index import CreateIndex
 from .create_table import CreateTable
 from .delete_from import DeleteFrom
 from .drop_table import DropTable
 from .insert_into import InsertInto
 from .select_from import SelectFrom
+from .transaction import BeginTransaction, CommitTransaction, RollbackTransaction, TransactionControl
 from .update_set import UpdateSet
+from .vacuum_database import VacuumDatabase
 
 __all__ = [
     'AstStmt',
+    'BeginTransaction',
+    'CommitTransaction',
+    'CreateIndex',
     'CreateTable',
     'DeleteFrom',
     'DropTable',
     'InsertInto',
+    'RollbackTransaction',
     'SelectFrom',
+    'TransactionControl',
     'UpdateSet',
+    'VacuumDatabase',
 ]
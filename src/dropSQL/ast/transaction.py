@@ -0,0 +1,67 @@
+import abc
+from typing import *
+
+from dropSQL.engine.types import *
+from dropSQL.generic import *
+from dropSQL.parser.streams import *
+from dropSQL.parser.tokens import *
+from .ast import AstStmt
+
+if TYPE_CHECKING:
+    from dropSQL import fs
+
+__all__ = [
+    'BeginTransaction',
+    'CommitTransaction',
+    'RollbackTransaction',
+    'TransactionControl',
+]
+
+
+class TransactionControl(AstStmt, metaclass=abc.ABCMeta):
+    """
+    Base class for statements which start or finish transactions, rather than run inside them.
+    """
+    keyword: Type[Keyword]
+
+    def to_sql(self) -> str:
+        return f'{self.keyword()} /drop'
+
+    @classmethod
+    def from_sql(cls, tokens: Stream[Token]) -> IResult['TransactionControl']:
+        """
+        /transaction_stmt
+            : "/begin" /drop
+            | "/commit" /drop
+            | "/rollback" /drop
+            ;
+        """
+        # next item must be the keyword token
+        t = tokens.next().and_then(Cast(cls.keyword))
+        if not t: return IErr(t.err())
+
+        t = tokens.next().and_then(Cast(Drop))
+        if not t: return IErr(t.err().empty_to_incomplete())
+
+        return IOk(cls())
+
+
+class BeginTransaction(TransactionControl):
+    keyword = Begin
+
+    def execute(self, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[None, str]:
+        return db.begin()
+
+
+class CommitTransaction(TransactionControl):
+    keyword = Commit
+
+    def execute(self, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[None, str]:
+        return db.commit()
+
+
+class RollbackTransaction(TransactionControl):
+    keyword = Rollback
+
+    def execute(self, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[None, str]:
+        return db.rollback()
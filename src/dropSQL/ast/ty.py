@@ -149,12 +149,17 @@ class FloatTy(Ty[ExpressionLiteralFloat]):
 
 
 class VarCharTy(Ty[ExpressionLiteralVarChar]):
-    def __init__(self, width: int) -> None:
+    def __init__(self, width: Optional[int]) -> None:
+        """
+        :param width: Maximum length in bytes, or None for computed strings whose length is not known in advance.
+            Such strings can not be stored.
+        """
         super().__init__()
 
         self.width = width
 
     def to_sql(self) -> str:
+        if self.width is None: return 'varchar'
         return f'varchar({self.width})'
 
     def construct(self, primitive: str) -> ExpressionLiteralVarChar:
@@ -164,9 +169,11 @@ class VarCharTy(Ty[ExpressionLiteralVarChar]):
         return str
 
     def struct_format_string(self) -> str:
+        assert self.width is not None, 'Unbounded varchar can not be stored'
         return str(self.width) + 's'
 
     def encode(self) -> bytes:
+        assert self.width is not None, 'Unbounded varchar can not be stored'
         varchar = self.width.to_bytes(2, byteorder=BYTEORDER)
         assert len(varchar) == 2
         return varchar
@@ -1,7 +1,7 @@
 from typing import *
 
 from dropSQL.ast.comma_separated import CommaSeparated
-from dropSQL.engine.context import Context
+from dropSQL.engine.column import Column
 from dropSQL.engine.row import Row
 from dropSQL.engine.row_set import *
 from dropSQL.engine.types import *
@@ -9,8 +9,9 @@ from dropSQL.generic import *
 from dropSQL.parser.streams import *
 from dropSQL.parser.tokens import *
 from .ast import AstStmt, FromSQL
-from .expression import Expression
+from .expression import Evaluator, Expression
 from .identifier import Identifier
+from .planner import check_references, filter_row_set
 from .where import WhereFromSQL
 
 if TYPE_CHECKING:
@@ -87,8 +88,8 @@ class UpdateSet(AstStmt):
         get table
         reorder expressions
         apply "where" clause
-        for each row:
-            update values
+        compute new values of each row
+        update all rows at once
 
         Set of columns in 'update set' statement must be a non-strict subset of a column set of the table.
         """
@@ -98,25 +99,27 @@ class UpdateSet(AstStmt):
         if not t: return Err(t.err())
         table = t.ok()
 
-        rs = TableRowSet(table)
-        if self.where is not None:
-            rs = FilteredRowSet(rs, self.where, args)
+        t = filter_row_set(TableRowSet(table), self.where, args)
+        if not t: return Err(t.err())
+        rs = t.ok()
 
         t = self.make_transformations(rs)
         if not t: return Err(t.err())
         transformation = t.ok()
 
-        count = 0
+        t = compile_transformation(transformation, rs.columns(), args)
+        if not t: return Err(t.err())
+        compiled = t.ok()
+
+        # rows are collected first: unique columns are checked against the final state,
+        # and an index scan must not see records which are already updated
+        updates: List[Tuple[int, ROW_TYPE]] = []
         for row in rs.iter():
-            r = update_row(row, transformation, args)
+            r = update_row(row, compiled)
             if not r: return Err(r.err())
-            new_row = r.ok()
+            updates.append((row.id, r.ok()))
 
-            t = table.update(new_row, row.id)
-            if not t: return Err(t.err())
-            count += 1
-
-        return Ok(count)
+        return table.update_many(updates)
 
     def make_transformations(self, rs: RowSet) -> Result[List[Optional[Expression]], str]:
         assignments = dict(self.assignments)
@@ -132,19 +135,37 @@ class UpdateSet(AstStmt):
         return Ok(transformation)
 
 
-def update_row(row: Row, transformation: List[Optional[Expression]], args: ARGS_TYPE) -> Result[ROW_TYPE, str]:
-    r: ROW_TYPE = []
+def compile_transformation(transformation: List[Optional[Expression]], columns: List[Column],
+                           args: ARGS_TYPE) -> Result[List[Optional[Evaluator]], str]:
+    compiled: List[Optional[Evaluator]] = []
 
-    for cell, expr in zip(row.data, transformation):
+    for expr in transformation:
         if expr is None:
-            r.append(cell)
+            compiled.append(None)
 
         else:
-            v = expr.eval_with(Context(row, args))
-            if not v: return Err(v.err())
-            val = v.ok()
+            t = check_references(expr, columns)
+            if not t: return Err(t.err())
+
+            f = expr.simplify(args).compile(columns, args)
+            if not f: return Err(f.err())
+            compiled.append(f.ok())
+
+    return Ok(compiled)
+
+
+def update_row(row: Row, transformation: List[Optional[Evaluator]]) -> Result[ROW_TYPE, str]:
+    r: ROW_TYPE = []
+
+    try:
+        for cell, f in zip(row.data, transformation):
+            if f is None:
+                r.append(cell)
+            else:
+                r.append(f(row.data))
 
-            r.append(val)
+    except EVAL_ERRORS as e:
+        return Err(str(e))
 
     return Ok(r)
 
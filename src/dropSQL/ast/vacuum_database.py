@@ -0,0 +1,37 @@
+from typing import *
+
+from dropSQL.engine.types import *
+from dropSQL.generic import *
+from dropSQL.parser.streams import *
+from dropSQL.parser.tokens import *
+from .ast import AstStmt
+
+if TYPE_CHECKING:
+    from dropSQL import fs
+
+
+class VacuumDatabase(AstStmt):
+    def to_sql(self) -> str:
+        return '/vacuum /drop'
+
+    @classmethod
+    def from_sql(cls, tokens: Stream[Token]) -> IResult['VacuumDatabase']:
+        """
+        /vacuum_stmt
+            : "/vacuum" /drop
+            ;
+        """
+        # next item must be the "/vacuum" token
+        t = tokens.next().and_then(Cast(Vacuum))
+        if not t: return IErr(t.err())
+
+        t = tokens.next().and_then(Cast(Drop))
+        if not t: return IErr(t.err().empty_to_incomplete())
+
+        return IOk(VacuumDatabase())
+
+    def execute(self, db: 'fs.DBFile', args: ARGS_TYPE = ()) -> Result[int, str]:
+        """
+        :return: Number of bytes reclaimed.
+        """
+        return db.vacuum()
@@ -1,21 +1,28 @@
 from .empty import EmptyRowSet
 from .filtered import FilteredRowSet
+from .index_scan import IndexRangeRowSet, IndexScanRowSet
 from .joins import *
 from .mock import MockRowSet
 from .projection import ProjectionRowSet
 from .rename_table import RenameTableRowSet
 from .row_set import RowSet
+from .sorted import SortedRowSet
 from .table import TableRowSet
 
 __all__ = [
     'EmptyRowSet',
     'FilteredRowSet',
+    'IndexRangeRowSet',
+    'IndexScanRowSet',
     'MockRowSet',
     'ProjectionRowSet',
     'RenameTableRowSet',
     'RowSet',
+    'SortedRowSet',
     'TableRowSet',
 
     'CrossJoinRowSet',
+    'HashJoinRowSet',
     'InnerJoinRowSet',
+    'MergeJoinRowSet',
 ]
@@ -8,8 +8,20 @@ if TYPE_CHECKING:
 
 
 class EmptyRowSet(RowSet):
+    """
+    Row set without rows, e.g. one filtered by a condition which never holds.
+    """
+
+    def __init__(self, columns: Optional[List[Column]] = None) -> None:
+        super().__init__()
+
+        self._columns: List[Column] = columns or []
+
     def columns(self) -> List[Column]:
-        return []
+        return self._columns
 
     def iter(self) -> Iterator['Row']:
         yield from ()
+
+    def size_hint(self) -> Optional[int]:
+        return 0
@@ -1,36 +1,21 @@
 from typing import *
 
+from dropSQL.generic import *
 from .row_set import RowSet
 from ..column import Column
-from ..context import Context
 from ..row import Row
 from ..types import *
 
 if TYPE_CHECKING:
-    from dropSQL.ast.expression import Expression
+    from dropSQL.ast.expression import Evaluator, Expression
 
 
 class FilteredRowSet(RowSet):
     """
     Filters row set based on given predicate expression. Used for `/where`, `/join ... /on` clauses.
 
-    Context
-    - row
-    - arguments
-    - eval(expression: Expression) -> Result[DB_TYPE, error]
-
-    Expression
-    - AST
-        * references to row's cells
-        * references to `?N` arguments
-    - eval(context: Context) -> Literal
-
-    Row
-    - data: Tuple[DB_TYPE, ...]
-    - set: RowSet
-    - resolve(reference: ExpressionReference) -> Optional[DB_TYPE]
-
-    For each row in the underlying row set
+    Expression is bound to columns of the underlying row set and arguments when the row set is built,
+    then called with data of each row.  Binding errors are kept in `predicate`, and raised by `iter`.
     """
 
     def __init__(self, inner: RowSet, expr: 'Expression', args: ARGS_TYPE) -> None:
@@ -39,15 +24,22 @@ class FilteredRowSet(RowSet):
         self.inner = inner
         self.expr = expr
         self.args = args
+        self.predicate: Result['Evaluator', str] = expr.compile(inner.columns(), args)
 
     def columns(self) -> List[Column]:
         return self.inner.columns()
 
+    def size_hint(self) -> Optional[int]:
+        return self.inner.size_hint()
+
     def iter(self) -> Iterator[Row]:
-        ctx = Context.with_args(self.args)
-        for row in self.inner.iter():
-            ctx.row = row
-            res = self.expr.eval_with(ctx)
-            if not res: raise ValueError(res.err())
-            if res.ok() != 0:
-                yield Row(self, row.data, row.id)
+        if not self.predicate: raise ValueError(self.predicate.err())
+        predicate = self.predicate.ok()
+
+        try:
+            for row in self.inner.iter():
+                if predicate(row.data) != 0:
+                    yield Row(self, row.data, row.id)
+
+        except EVAL_ERRORS as e:
+            raise ValueError(str(e))
@@ -0,0 +1,51 @@
+from typing import *
+
+from .table import TableRowSet
+from ..row import Row
+from ..types import *
+
+if TYPE_CHECKING:
+    from dropSQL import fs
+
+
+class IndexScanRowSet(TableRowSet):
+    """
+    Fetches only rows whose indexed column is equal to the given value.
+    """
+
+    def __init__(self, table: 'fs.Table', index: 'fs.IndexDef', value: DB_TYPE) -> None:
+        super().__init__(table)
+
+        self.index = index
+        self.value = value
+
+    def iter(self) -> Iterator[Row]:
+        for i, row in self.table.lookup(self.index, self.value):
+            yield Row(self, row, i)
+
+    def size_hint(self) -> Optional[int]:
+        return None
+
+
+class IndexRangeRowSet(TableRowSet):
+    """
+    Fetches rows whose indexed column is within the bounds, in the order of the column.  None means unbounded.
+    """
+
+    def __init__(self, table: 'fs.Table', index: 'fs.IndexDef',
+                 low: Optional[DB_TYPE], low_inclusive: bool,
+                 high: Optional[DB_TYPE], high_inclusive: bool) -> None:
+        super().__init__(table)
+
+        self.index = index
+        self.low = low
+        self.low_inclusive = low_inclusive
+        self.high = high
+        self.high_inclusive = high_inclusive
+
+    def iter(self) -> Iterator[Row]:
+        for i, row in self.table.scan_range(self.index, self.low, self.low_inclusive, self.high, self.high_inclusive):
+            yield Row(self, row, i)
+
+    def size_hint(self) -> Optional[int]:
+        return None
@@ -1,7 +1,11 @@
 from .cross import CrossJoinRowSet
+from .hash import HashJoinRowSet
 from .inner import InnerJoinRowSet
+from .merge import MergeJoinRowSet
 
 __all__ = [
     'CrossJoinRowSet',
+    'HashJoinRowSet',
     'InnerJoinRowSet',
+    'MergeJoinRowSet',
 ]
@@ -3,23 +3,60 @@ from typing import *
 from ..row_set import RowSet
 from ...column import Column
 from ...row import Row
+from ...spool import *
+from ...types import *
+
+# left rows joined per pass over spilled right side
+CHUNK_ROWS = 1024
 
 
 class CrossJoinRowSet(RowSet):
     """
     Cross Join produces all possible combinations from left and right tables' row sets.
+
+    Right side is read once into a spool.  If it fits in memory, every left row is joined with all of it;
+    otherwise (block nested loops) left rows are taken by chunks, and the spilled right side is read once per chunk.
     """
 
-    def __init__(self, lhs: RowSet, rhs: RowSet) -> None:
+    def __init__(self, lhs: RowSet, rhs: RowSet,
+                 chunk_rows: int = CHUNK_ROWS, memory_rows: int = MEMORY_ROWS) -> None:
         super().__init__()
 
         self.lhs = lhs
         self.rhs = rhs
+        self.chunk_rows = chunk_rows
+        self.memory_rows = memory_rows
+        self._columns: List[Column] = lhs.columns() + rhs.columns()
 
     def columns(self) -> List[Column]:
-        return self.lhs.columns() + self.rhs.columns()
+        return self._columns
+
+    def size_hint(self) -> Optional[int]:
+        lhs, rhs = self.lhs.size_hint(), self.rhs.size_hint()
+        if lhs is None or rhs is None: return None
+        return lhs * rhs
 
     def iter(self) -> Iterator['Row']:
-        for left in self.lhs.iter():
-            for right in self.rhs.iter():
-                yield Row(self, left.data + right.data)
+        with RowSpool(self.memory_rows) as spool:
+            spool.extend(row.data for row in self.rhs.iter())
+            if len(spool) == 0: return
+
+            if not spool.spilled():
+                for left in self.lhs.iter():
+                    for right in spool.rows:
+                        yield Row(self, left.data + right)
+                return
+
+            chunk: List[ROW_TYPE] = []
+            for left in self.lhs.iter():
+                chunk.append(left.data)
+                if len(chunk) == self.chunk_rows:
+                    yield from self.join_chunk(chunk, spool)
+                    chunk = []
+            if chunk:
+                yield from self.join_chunk(chunk, spool)
+
+    def join_chunk(self, chunk: List[ROW_TYPE], spool: RowSpool) -> Iterator['Row']:
+        for right in spool:
+            for left in chunk:
+                yield Row(self, left + right)
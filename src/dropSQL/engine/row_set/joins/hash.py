@@ -0,0 +1,67 @@
+from typing import *
+
+from dropSQL.engine.types import *
+from ..row_set import RowSet
+from ...column import Column
+from ...row import Row
+
+
+class HashJoinRowSet(RowSet):
+    """
+    Equi-join: rows of the smaller input are put into a hash table by their key columns,
+    then every row of the other input picks its matches from the table.
+
+    Keys are pairs of column positions in left and right row sets, which must be equal.
+    Joined rows always consist of left columns followed by right columns.
+    """
+
+    def __init__(self, lhs: RowSet, rhs: RowSet, keys: List[Tuple[int, int]]) -> None:
+        super().__init__()
+
+        self.lhs = lhs
+        self.rhs = rhs
+        self.keys = keys
+        self._columns: List[Column] = lhs.columns() + rhs.columns()
+
+    def columns(self) -> List[Column]:
+        return self._columns
+
+    def size_hint(self) -> Optional[int]:
+        lhs, rhs = self.lhs.size_hint(), self.rhs.size_hint()
+        if lhs is None or rhs is None: return None
+        return lhs * rhs
+
+    def build_left(self) -> bool:
+        """
+        Whether hash table is built from the left input.  Right input is preferred unless left one is known to be smaller.
+        """
+        lhs, rhs = self.lhs.size_hint(), self.rhs.size_hint()
+        return lhs is not None and (rhs is None or lhs < rhs)
+
+    def iter(self) -> Iterator[Row]:
+        left_keys = [left for left, _ in self.keys]
+        right_keys = [right for _, right in self.keys]
+
+        if self.build_left():
+            build, probe = self.lhs, self.rhs
+            build_keys, probe_keys = left_keys, right_keys
+        else:
+            build, probe = self.rhs, self.lhs
+            build_keys, probe_keys = right_keys, left_keys
+
+        table: Dict[Tuple[DB_TYPE, ...], List[ROW_TYPE]] = {}
+        for row in build.iter():
+            key = tuple(row.data[i] for i in build_keys)
+            table.setdefault(key, []).append(row.data)
+        if not table: return
+
+        for row in probe.iter():
+            matches = table.get(tuple(row.data[i] for i in probe_keys))
+            if matches is None: continue
+
+            if build is self.lhs:
+                for data in matches:
+                    yield Row(self, data + row.data)
+            else:
+                for data in matches:
+                    yield Row(self, row.data + data)
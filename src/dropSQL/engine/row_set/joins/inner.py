@@ -20,5 +20,8 @@ class InnerJoinRowSet(RowSet):
     def columns(self) -> List[Column]:
         return self.inner.columns()
 
+    def size_hint(self) -> Optional[int]:
+        return self.inner.size_hint()
+
     def iter(self) -> Iterator['Row']:
         yield from self.inner.iter()
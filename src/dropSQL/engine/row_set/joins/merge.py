@@ -0,0 +1,64 @@
+from typing import *
+
+from ..row_set import RowSet
+from ..sorted import sort_key
+from ...column import Column
+from ...row import Row
+from ...spool import *
+
+
+class MergeJoinRowSet(RowSet):
+    """
+    Equi-join of two inputs which are already ordered by their key columns, as `SortedRowSet` orders them.
+
+    Both inputs are read once, side by side.  Right rows with the same key are kept in a spool
+    while left rows with that key are joined with them, so memory is bounded even for large groups.
+    """
+
+    def __init__(self, lhs: RowSet, rhs: RowSet, keys: List[Tuple[int, int]], memory_rows: int = MEMORY_ROWS) -> None:
+        super().__init__()
+
+        self.lhs = lhs
+        self.rhs = rhs
+        self.keys = keys
+        self.memory_rows = memory_rows
+        self._columns: List[Column] = lhs.columns() + rhs.columns()
+
+    def columns(self) -> List[Column]:
+        return self._columns
+
+    def size_hint(self) -> Optional[int]:
+        lhs, rhs = self.lhs.size_hint(), self.rhs.size_hint()
+        if lhs is None or rhs is None: return None
+        return lhs * rhs
+
+    def iter(self) -> Iterator[Row]:
+        left_keys = [left for left, _ in self.keys]
+        right_keys = [right for _, right in self.keys]
+
+        rhs = self.rhs.iter()
+        right = next(rhs, None)
+
+        group = RowSpool(self.memory_rows)
+        group_key = None
+        try:
+            for left in self.lhs.iter():
+                key = sort_key(left.data, left_keys)
+
+                if key != group_key:
+                    group.close()
+                    group_key = key
+
+                    while right is not None and sort_key(right.data, right_keys) < key:
+                        right = next(rhs, None)
+                    while right is not None and sort_key(right.data, right_keys) == key:
+                        group.append(right.data)
+                        right = next(rhs, None)
+
+                    if right is None and len(group) == 0: return
+
+                for data in group:
+                    yield Row(self, left.data + data)
+
+        finally:
+            group.close()
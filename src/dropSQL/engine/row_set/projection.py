@@ -1,13 +1,14 @@
 from typing import *
 
+from dropSQL.generic import *
 from dropSQL.parser.tokens import Identifier
 from .row_set import RowSet
 from ..column import Column
-from ..context import Context
 from ..row import Row
 from ..types import *
 
 if TYPE_CHECKING:
+    from dropSQL.ast.expression import Evaluator
     from dropSQL.ast.result_column import *
 
 
@@ -19,48 +20,57 @@ class ProjectionRowSet(RowSet):
         self._columns: List[Column] = []
         self.outputs: List['ResultColumn'] = columns
         self.args = args
+        self.evaluators = self.bind()
 
-        for column in columns:
-            if column.is_star():
+    def columns(self) -> List[Column]:
+        return self._columns
+
+    def size_hint(self) -> Optional[int]:
+        return self.inner.size_hint()
+
+    def bind(self) -> Result[List[Optional['Evaluator']], str]:
+        """
+        Compile output expressions against the columns of the underlying row set, and derive their types.
+        None stands for star.
+        """
+        evaluators: List[Optional['Evaluator']] = []
+        for out in self.outputs:
+            if out.is_star():
+                evaluators.append(None)
                 self._columns.extend(Column(Identifier(''), c.name, c.ty) for c in self.inner.columns())
 
             else:
-                aliased = column.as_expression().expression
+                aliased = out.as_expression().expression
+                expr = aliased.expression
 
-                if aliased.alias is not None:
-                    alias = aliased.alias
-                else:
-                    alias = aliased.expression.to_sql()
+                # typing resolves every reference, including those which simplification may drop
+                ty = expr.derive_type(self.inner.columns(), self.args)
+                if not ty: return Err(ty.err())
 
-                # TODO: Expression::derive_type(args) -> Result[Ty]
-                from dropSQL.ast.ty import IntegerTy
-                ty = IntegerTy()
-                self._columns.append(Column(Identifier(''), alias, ty))
+                res = expr.simplify(self.args).compile(self.inner.columns(), self.args)
+                if not res: return Err(res.err())
+                evaluators.append(res.ok())
 
-        row = next(self.iter(), None)
-        if row is not None:
-            assert len(row.data) == len(self._columns)
-            for column, cell in zip(self._columns, row.data):
-                column.ty = column.ty.of(cell)
+                alias = aliased.alias if aliased.alias is not None else expr.to_sql()
+                self._columns.append(Column(Identifier(''), alias, ty.ok()))
 
-    def columns(self) -> List[Column]:
-        return self._columns
+        return Ok(evaluators)
 
     def iter(self) -> Iterator[Row]:
-        ctx = Context.with_args(self.args)
-        for row in self.inner.iter():
-            ctx.row = row
-            data: ROW_TYPE = []
-
-            for out in self.outputs:
-                if out.is_star():
-                    data.extend(row.data)
-
-                else:
-                    expr = out.as_expression().expression.expression
-                    res = expr.eval_with(ctx)
-                    if not res: raise ValueError(res.err())
-                    data.append(res.ok())
-
-            new_row = Row(self, data, row.id)
-            yield new_row
+        if not self.evaluators: raise ValueError(self.evaluators.err())
+        evaluators = self.evaluators.ok()
+
+        try:
+            for row in self.inner.iter():
+                data: ROW_TYPE = []
+
+                for f in evaluators:
+                    if f is None:
+                        data.extend(row.data)
+                    else:
+                        data.append(f(row.data))
+
+                yield Row(self, data, row.id)
+
+        except EVAL_ERRORS as e:
+            raise ValueError(str(e))
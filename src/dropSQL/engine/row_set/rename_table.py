@@ -14,6 +14,7 @@ class RenameTableRowSet(RowSet):
         super().__init__()
 
         self.inner = inner
+        self.rename = rename
         self._columns: List[Column] = [
             Column(rename, c.name, c.ty)
             for c in inner.columns()
@@ -26,3 +27,6 @@ class RenameTableRowSet(RowSet):
         for row in self.inner.iter():
             new_row = Row(self, row.data, row.id)
             yield new_row
+
+    def size_hint(self) -> Optional[int]:
+        return self.inner.size_hint()
@@ -19,3 +19,9 @@ class RowSet(metaclass=abc.ABCMeta):
         """
         Return a generator which yields rows from the underlying row stream or a table.
         """
+
+    def size_hint(self) -> Optional[int]:
+        """
+        Estimated upper bound of the number of rows, or None if unknown.  Used to choose join strategies.
+        """
+        return None
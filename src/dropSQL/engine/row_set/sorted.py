@@ -0,0 +1,61 @@
+import heapq
+from typing import *
+
+from .row_set import RowSet
+from ..column import Column
+from ..row import Row
+from ..spool import *
+from ..types import *
+
+
+def sort_key(data: ROW_TYPE, columns: List[int]) -> Tuple[Tuple[bool, DB_TYPE], ...]:
+    """
+    Key by which rows are ordered on the given columns.  Numbers go before strings, so any values can be compared,
+    and values which are equal for `=` have equal keys, e.g. 1 and 1.0.
+    """
+    return tuple((isinstance(data[i], str), data[i]) for i in columns)
+
+
+class SortedRowSet(RowSet):
+    """
+    Orders rows of the underlying row set by the given columns (external merge sort).
+
+    Rows are sorted in memory by runs of `memory_rows`.  If there is more than one run,
+    every run is spilled to a temporary file, and the runs are merged while reading.
+    """
+
+    def __init__(self, inner: RowSet, keys: List[int], memory_rows: int = MEMORY_ROWS) -> None:
+        super().__init__()
+
+        self.inner = inner
+        self.keys = keys
+        self.memory_rows = memory_rows
+
+    def columns(self) -> List[Column]:
+        return self.inner.columns()
+
+    def size_hint(self) -> Optional[int]:
+        return self.inner.size_hint()
+
+    def key(self, data: ROW_TYPE) -> Tuple[Tuple[bool, DB_TYPE], ...]:
+        return sort_key(data, self.keys)
+
+    def iter(self) -> Iterator[Row]:
+        runs: List[RowSpool] = []
+        run: List[ROW_TYPE] = []
+
+        try:
+            for row in self.inner.iter():
+                run.append(row.data)
+                if len(run) == self.memory_rows:
+                    run.sort(key=self.key)
+                    runs.append(RowSpool(0).extend(run))
+                    run = []
+
+            run.sort(key=self.key)
+            for data in heapq.merge(*runs, run, key=self.key):
+                yield Row(self, data)
+
+        finally:
+            for spool in runs:
+                spool.close()
@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 class TableRowSet(RowSet):
     """
     Fetches row directly from the dropSQL table.
+
+    If `needed` is set, only those columns are decoded, and the others are None.
     """
 
     def __init__(self, table: 'fs.Table') -> None:
@@ -18,17 +20,16 @@ class TableRowSet(RowSet):
 
         self.table = table
         self.name = self.table.get_table_name()
+        self._columns: List[Column] = [Column(self.name, column.name, column.ty)
+                                       for column in self.table.get_columns()]
+        self.needed: Optional[List[int]] = None
 
     def columns(self) -> List[Column]:
-        return [Column(self.name, column.name, column.ty)
-                for column in self.table.get_columns()]
+        return self._columns
 
     def iter(self) -> Iterator[Row]:
-        n = self.table.count_records()
-        i = 0
-        while i < n:
-            res = self.table.select(i)
-            if res:
-                row = res.ok()
-                yield Row(self, row, i)
-            i += 1
+        for i, row in self.table.scan(self.needed):
+            yield Row(self, row, i)
+
+    def size_hint(self) -> Optional[int]:
+        return self.table.count_records()
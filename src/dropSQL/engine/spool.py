@@ -0,0 +1,86 @@
+"""
+Buffers of rows which outgrow memory.
+"""
+
+import io
+import marshal
+import tempfile
+from typing import *
+
+from .types import *
+
+__all__ = [
+    'MEMORY_ROWS',
+    'RowSpool',
+]
+
+# rows kept in memory before the spool spills to a temporary file
+MEMORY_ROWS = 64 * 1024
+
+
+class RowSpool:
+    """
+    Append-only sequence of rows, which may be read any number of times.
+
+    Rows stay in memory until there are more than `memory_rows` of them,
+    then all of them are moved to an anonymous temporary file, which is removed on close.
+    Spilled spool can not be appended to or read again while it is being read.
+    """
+
+    def __init__(self, memory_rows: int = MEMORY_ROWS) -> None:
+        super().__init__()
+
+        self.memory_rows = memory_rows
+        self.rows: List[ROW_TYPE] = []
+        self.file: Optional[IO[bytes]] = None
+        self.count = 0
+
+    def __enter__(self) -> 'RowSpool':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[ROW_TYPE]:
+        if self.file is None:
+            yield from self.rows
+            return
+
+        self.file.seek(0)
+        try:
+            for _ in range(self.count):
+                yield marshal.load(self.file)
+        finally:
+            self.file.seek(0, io.SEEK_END)
+
+    def spilled(self) -> bool:
+        return self.file is not None
+
+    def append(self, row: ROW_TYPE) -> None:
+        self.count += 1
+
+        if self.file is not None:
+            marshal.dump(row, self.file)
+            return
+
+        self.rows.append(row)
+        if len(self.rows) > self.memory_rows:
+            self.file = tempfile.TemporaryFile()
+            for row in self.rows:
+                marshal.dump(row, self.file)
+            self.rows = []
+
+    def extend(self, rows: Iterable[ROW_TYPE]) -> 'RowSpool':
+        for row in rows:
+            self.append(row)
+        return self
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.rows = []
+        self.count = 0
@@ -11,6 +11,7 @@ __all__ = [
     'BYTEORDER',
     'DB_META_TYPE',
     'DB_TYPE',
+    'EVAL_ERRORS',
     'ROW_TYPE',
     'MASTER_TABLE_NAME',
     'MEMORY',
@@ -21,6 +22,9 @@ DB_META_TYPE = Union[Type[str], Type[int], Type[float]]
 ARGS_TYPE = Tuple[DB_TYPE, ...]
 ROW_TYPE = List[DB_TYPE]
 
+# exceptions which compiled expressions may raise while evaluating
+EVAL_ERRORS = (TypeError, ZeroDivisionError)
+
 BYTEORDER = 'big'
 
 MASTER_TABLE_NAME = 'autism'
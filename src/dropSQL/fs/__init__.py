@@ -1,6 +1,14 @@
 __version__ = "0.00001"
 
+from .btree_index import BTreeIndex
+from .buffer_pool import BufferPool, BufferPoolStats
 from .connection import Connection
 from .db_file import DBFile
+from .file_storage import FileBlockStorage
+from .free_map import FreeMap
+from .hash_index import HashIndex
 from .metadata import Metadata
-from .table import Table
+from .mmap_storage import MmapBlockStorage
+from .table import IndexDef, Table
+from .transaction import Transaction
+from .wal import WriteAheadLog
@@ -18,6 +18,26 @@ class BlockStorage(metaclass=abc.ABCMeta):
         :raise AssertionError: If block does not exist.
         """
 
+    def view_block(self, index: int) -> memoryview:
+        """
+        Read-only access to the contents of physical block at index `index`.
+
+        Storages which can expose their memory directly should return views without copying.
+        View must not outlive the next modification of the storage.
+
+        :param index: Block index starting from 0.
+        :return: View of BLOCK_SIZE bytes.
+        :raise AssertionError: If block does not exist.
+        """
+        return memoryview(self.read_block(index))
+
+    def scan_block(self, index: int) -> memoryview:
+        """
+        Same as `view_block`, for blocks which are read once by a sequential scan.
+        Caching storages should neither keep such blocks nor copy them.
+        """
+        return self.view_block(index)
+
     @abc.abstractmethod
     def write_block(self, block: Block) -> None:
         """
@@ -35,6 +55,34 @@ class BlockStorage(metaclass=abc.ABCMeta):
         :return: New block object.
         """
 
+    def allocate_blocks(self, count: int) -> int:
+        """
+        Allocate `count` new contiguous zero-filled physical blocks at once.
+
+        :return: Index of the first allocated block.
+        """
+        assert count > 0
+        first = self.allocate_block().idx
+        for _ in range(count - 1):
+            self.allocate_block()
+        return first
+
+    def release_block(self, index: int) -> None:
+        """
+        Declare physical block at index `index` unused, so that it may be allocated again.
+        Storages without free space management simply leak it.
+
+        :param index: Block index starting from 0.
+        """
+
+    @abc.abstractmethod
+    def truncate_blocks(self, count: int) -> None:
+        """
+        Discard every physical block starting from index `count`.
+
+        :param count: New number of blocks, not greater than the current one.
+        """
+
     @abc.abstractmethod
     def count_blocks(self) -> int:
         """
@@ -42,3 +90,20 @@ class BlockStorage(metaclass=abc.ABCMeta):
 
         :return: Non-negative number of blocks.
         """
+
+    def flush(self) -> None:
+        """
+        Push any buffered writes down to the underlying medium.
+        """
+
+    def sync(self) -> None:
+        """
+        Make all written data durable: flush it and wait until it reaches the disk.
+        """
+        self.flush()
+
+    def close(self) -> None:
+        """
+        Flush and release underlying resources. Storage must not be used afterwards.
+        """
+        self.flush()
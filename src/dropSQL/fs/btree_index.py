@@ -0,0 +1,277 @@
+import bisect
+import struct
+from typing import *
+
+from dropSQL.ast.ty import *
+from dropSQL.engine.types import *
+from .block import *
+from .block_storage import BlockStorage
+
+__all__ = [
+    'BTreeIndex',
+    'MIN_FANOUT',
+]
+
+NODE_HEADER = struct.Struct('>cHI')  # kind, number of entries, link
+LEAF = b'L'  # link is the next leaf
+INNER = b'I'  # link is the leftmost child
+
+# nodes which hold fewer entries are useless, keys are too wide for the index
+MIN_FANOUT = 4
+
+# greater than any record id
+MAX_RECORD = 1 << 32
+
+ENTRY_TYPE = Tuple[DB_TYPE, int]  # key and record id
+
+
+class Node:
+    __slots__ = ['idx', 'leaf', 'link', 'entries', 'children']
+
+    def __init__(self, idx: int, leaf: bool, link: int, entries: List[ENTRY_TYPE], children: List[int]) -> None:
+        super().__init__()
+
+        self.idx = idx
+        self.leaf = leaf
+        self.link = link
+        self.entries = entries  # sorted (key, record id) pairs
+        self.children = children  # inner node: child i holds entries in range [entries[i-1], entries[i])
+
+
+class BTreeIndex:
+    """
+    On-disk B+tree which maps column values to record ids in key order.
+
+    Every node is a block: header (kind, number of entries, link) followed by fixed-size entries.
+    Leaves hold (key, record id) pairs and are linked left to right; inner nodes hold separators
+    with the child to the right of each, the leftmost child is the link.
+    Pairs are unique even if keys are not, so any entry can be found and removed exactly.
+
+    Nodes are split when they overflow, but never merged: deleted entries simply leave nodes underfull.
+    Index without nodes (root = 0) is empty; the first insert allocates the root leaf.
+    """
+
+    __slots__ = ['storage', 'root', 'ty', 'leaf_entry', 'inner_entry', 'leaf_capacity', 'inner_capacity']
+
+    def __init__(self, storage: BlockStorage, ty: Ty, root: int = 0) -> None:
+        super().__init__()
+
+        self.storage = storage
+        self.root = root
+        self.ty = ty
+
+        fmt = '>' + ty.struct_format_string()
+        self.leaf_entry = struct.Struct(fmt + 'I')
+        self.inner_entry = struct.Struct(fmt + 'II')
+        self.leaf_capacity = (BLOCK_SIZE - NODE_HEADER.size) // self.leaf_entry.size
+        self.inner_capacity = (BLOCK_SIZE - NODE_HEADER.size) // self.inner_entry.size
+
+    def fits(self) -> bool:
+        """
+        Whether keys of this type are narrow enough for a useful tree.
+        """
+        return self.inner_capacity >= MIN_FANOUT
+
+    ###########
+    # Queries #
+    ###########
+
+    def lookup(self, key: DB_TYPE) -> List[int]:
+        """
+        :return: Ids of records with exactly this key.
+        """
+        return list(self.scan(key, True, key, True))
+
+    def scan(self,
+             low: Optional[DB_TYPE] = None, low_inclusive: bool = True,
+             high: Optional[DB_TYPE] = None, high_inclusive: bool = True) -> Iterator[int]:
+        """
+        Ids of records whose keys are within the bounds, in key order.  None means unbounded.
+        """
+        if self.root == 0: return
+
+        start: ENTRY_TYPE = (low, -1 if low_inclusive else MAX_RECORD)
+        node = self._read(self.root)
+        while not node.leaf:
+            if low is None:
+                node = self._read(node.children[0])
+            else:
+                node = self._read(node.children[bisect.bisect_right(node.entries, start)])
+
+        i = 0 if low is None else bisect.bisect_left(node.entries, start)
+        while True:
+            for key, record in node.entries[i:]:
+                if high is not None and (key > high or key == high and not high_inclusive): return
+                yield record
+
+            if node.link == 0: return
+            node = self._read(node.link)
+            i = 0
+
+    def blocks(self) -> Iterator[int]:
+        """
+        Physical indices of all nodes.
+        """
+        if self.root == 0: return
+
+        stack = [self.root]
+        while stack:
+            pointer = stack.pop()
+            yield pointer
+
+            node = self._read(pointer)
+            if not node.leaf: stack.extend(node.children)
+
+    ################
+    # Modification #
+    ################
+
+    def insert(self, key: DB_TYPE, record: int) -> None:
+        entry = (key, record)
+
+        if self.root == 0:
+            self.root = self._new_node(True, [entry]).idx
+            return
+
+        split = self._insert(self.root, entry)
+        if split is not None:
+            separator, right = split
+            root = self._new_node(False, [separator], [self.root, right])
+            self.root = root.idx
+
+    def insert_many(self, entries: Iterable[Tuple[DB_TYPE, int]]) -> None:
+        """
+        Add (key, record id) entries.  Empty tree is bulk loaded bottom-up from sorted entries.
+        """
+        entries = sorted(entries)
+        if not entries: return
+
+        if self.root != 0:
+            for key, record in entries:
+                self.insert(key, record)
+            return
+
+        # leaves
+        level: List[Tuple[ENTRY_TYPE, int]] = []  # first entry of the subtree, node index
+        first = self.storage.allocate_blocks((len(entries) + self.leaf_capacity - 1) // self.leaf_capacity)
+        for n, i in enumerate(range(0, len(entries), self.leaf_capacity)):
+            chunk = entries[i:i + self.leaf_capacity]
+            link = first + n + 1 if i + self.leaf_capacity < len(entries) else 0
+            self._write(Node(first + n, True, link, chunk, []))
+            level.append((chunk[0], first + n))
+
+        # inner levels
+        while len(level) > 1:
+            upper: List[Tuple[ENTRY_TYPE, int]] = []
+            step = self.inner_capacity + 1
+            for i in range(0, len(level), step):
+                chunk = level[i:i + step]
+                node = self._new_node(False, [entry for entry, _ in chunk[1:]], [idx for _, idx in chunk])
+                upper.append((chunk[0][0], node.idx))
+            level = upper
+
+        self.root = level[0][1]
+
+    def delete(self, key: DB_TYPE, record: int) -> bool:
+        """
+        Remove one (key, record id) entry.
+
+        :return: Whether the entry has been found.
+        """
+        if self.root == 0: return False
+        entry = (key, record)
+
+        node = self._read(self.root)
+        while not node.leaf:
+            node = self._read(node.children[bisect.bisect_right(node.entries, entry)])
+
+        i = bisect.bisect_left(node.entries, entry)
+        if i == len(node.entries) or node.entries[i] != entry: return False
+
+        del node.entries[i]
+        self._write(node)
+        return True
+
+    #############
+    # Internals #
+    #############
+
+    def _insert(self, pointer: int, entry: ENTRY_TYPE) -> Optional[Tuple[ENTRY_TYPE, int]]:
+        """
+        Insert entry into the subtree.
+
+        :return: Separator and index of the new right sibling if the node has been split.
+        """
+        node = self._read(pointer)
+
+        if node.leaf:
+            bisect.insort(node.entries, entry)
+            capacity = self.leaf_capacity
+        else:
+            i = bisect.bisect_right(node.entries, entry)
+            split = self._insert(node.children[i], entry)
+            if split is None: return None
+
+            separator, right = split
+            node.entries.insert(i, separator)
+            node.children.insert(i + 1, right)
+            capacity = self.inner_capacity
+
+        if len(node.entries) <= capacity:
+            self._write(node)
+            return None
+
+        mid = len(node.entries) // 2
+        if node.leaf:
+            sibling = self._new_node(True, node.entries[mid:], link=node.link)
+            separator = sibling.entries[0]
+            node.link = sibling.idx
+            node.entries = node.entries[:mid]
+        else:
+            separator = node.entries[mid]
+            sibling = self._new_node(False, node.entries[mid + 1:], node.children[mid + 1:])
+            node.entries = node.entries[:mid]
+            node.children = node.children[:mid + 1]
+
+        self._write(node)
+        return separator, sibling.idx
+
+    def _new_node(self, leaf: bool, entries: List[ENTRY_TYPE], children: Optional[List[int]] = None,
+                  link: int = 0) -> Node:
+        block = self.storage.allocate_block()
+        node = Node(block.idx, leaf, link, entries, children or [])
+        self._write(node)
+        return node
+
+    def _read(self, pointer: int) -> Node:
+        view = self.storage.view_block(pointer)
+        kind, count, link = NODE_HEADER.unpack_from(view)
+        leaf = kind == LEAF
+        varchar = isinstance(self.ty, VarCharTy)
+
+        layout = self.leaf_entry if leaf else self.inner_entry
+        raw = layout.iter_unpack(view[NODE_HEADER.size:NODE_HEADER.size + count * layout.size])
+        entries: List[ENTRY_TYPE] = []
+        children: List[int] = [link]
+        for item in raw:
+            key = item[0].partition(b'\0')[0].decode('UTF-8') if varchar else item[0]
+            entries.append((key, item[1]))
+            if not leaf: children.append(item[2])
+
+        return Node(pointer, leaf, link, entries, [] if leaf else children)
+
+    def _write(self, node: Node) -> None:
+        varchar = isinstance(self.ty, VarCharTy)
+
+        link = node.link if node.leaf else node.children[0]
+        data = bytearray(NODE_HEADER.pack(LEAF if node.leaf else INNER, len(node.entries), link))
+        for i, (key, record) in enumerate(node.entries):
+            if varchar: key = key.encode('UTF-8')
+            if node.leaf:
+                data += self.leaf_entry.pack(key, record)
+            else:
+                data += self.inner_entry.pack(key, record, node.children[i + 1])
+
+        block = Block.empty(node.idx)
+        block.override(0, bytes(data))
+        self.storage.write_block(block)
@@ -0,0 +1,307 @@
+"""
+Buffer pool keeps recently used blocks in memory in front of another block storage.
+"""
+
+import collections
+from typing import *
+
+from .block import Block
+from .block_storage import BlockStorage
+
+__all__ = [
+    'BufferPool',
+    'BufferPoolStats',
+    'CLOCK',
+    'DEFAULT_CAPACITY',
+    'LRU',
+]
+
+LRU = 'lru'
+CLOCK = 'clock'
+DEFAULT_CAPACITY = 256  # blocks, i.e. 3 MiB
+
+
+class BufferPoolStats:
+    """
+    Counters collected by the buffer pool. Use them to size the pool under real load.
+    """
+
+    __slots__ = ['hits', 'misses', 'evictions', 'writebacks']
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset(self) -> None:
+        self.hits = self.misses = self.evictions = self.writebacks = 0
+
+    def __repr__(self) -> str:
+        return (f'BufferPoolStats(hits={self.hits}, misses={self.misses}, '
+                f'evictions={self.evictions}, writebacks={self.writebacks})')
+
+
+class _LRUReplacer:
+    """ Least recently used frame is the victim. """
+
+    def __init__(self) -> None:
+        self.order: 'collections.OrderedDict[int, None]' = collections.OrderedDict()
+
+    def touch(self, index: int) -> None:
+        self.order[index] = None
+        self.order.move_to_end(index)
+
+    def remove(self, index: int) -> None:
+        self.order.pop(index, None)
+
+    def victim(self, evictable: Callable[[int], bool]) -> Optional[int]:
+        for index in self.order:
+            if evictable(index):
+                del self.order[index]
+                return index
+        return None
+
+
+class _ClockReplacer:
+    """ Second chance algorithm: frames with reference bit set survive one more round of the hand. """
+
+    def __init__(self) -> None:
+        self.ring: List[int] = []
+        self.referenced: Dict[int, bool] = {}
+        self.hand = 0
+
+    def touch(self, index: int) -> None:
+        if index not in self.referenced:
+            self.ring.append(index)
+        self.referenced[index] = True
+
+    def remove(self, index: int) -> None:
+        if index in self.referenced:
+            position = self.ring.index(index)
+            del self.ring[position]
+            del self.referenced[index]
+            if position < self.hand: self.hand -= 1
+
+    def victim(self, evictable: Callable[[int], bool]) -> Optional[int]:
+        # two full turns: first one clears reference bits, second one must find a victim if there is any
+        for _ in range(2 * len(self.ring)):
+            if self.hand >= len(self.ring): self.hand = 0
+            index = self.ring[self.hand]
+
+            if not evictable(index):
+                self.hand += 1
+
+            elif self.referenced[index]:
+                self.referenced[index] = False
+                self.hand += 1
+
+            else:
+                del self.ring[self.hand]
+                del self.referenced[index]
+                return index
+
+        return None
+
+
+class BufferPool(BlockStorage):
+    """
+    Write-back cache of blocks with fixed capacity and pluggable eviction policy (LRU or CLOCK).
+
+    Blocks returned by `read_block` are shared with the pool: changes become visible
+    to the storage only after `write_block` marks them dirty.  Dirty blocks are written
+    down on eviction, `flush` and `close`.
+
+    Pinned blocks are never evicted.  If every frame is pinned, the pool temporarily grows beyond its capacity.
+    So do dirty blocks while `no_steal` is set: until then, the storage sees no uncommitted changes.
+    """
+
+    def __init__(self, storage: BlockStorage, capacity: int = DEFAULT_CAPACITY, policy: str = LRU) -> None:
+        super().__init__()
+        assert capacity >= 0, 'Negative buffer pool capacity'
+
+        if policy == LRU:
+            self.replacer = _LRUReplacer()
+        elif policy == CLOCK:
+            self.replacer = _ClockReplacer()
+        else:
+            raise ValueError(f'Unknown eviction policy: {policy}')
+
+        self.storage = storage
+        self.capacity = capacity
+        self.policy = policy
+        self.frames: Dict[int, Block] = {}
+        self.dirty: Set[int] = set()
+        self.pins: Dict[int, int] = {}
+        self.no_steal = False
+        self.stats = BufferPoolStats()
+
+    ###########
+    # Pinning #
+    ###########
+
+    def pin(self, index: int) -> Block:
+        """
+        Read block and keep it resident until matching `unpin`.
+        """
+        block = self.read_block(index)
+        self.pins[index] = self.pins.get(index, 0) + 1
+        return block
+
+    def unpin(self, index: int, dirty: bool = False) -> None:
+        assert self.pins.get(index, 0) > 0, f'Block {index} is not pinned'
+
+        if dirty: self.dirty.add(index)
+
+        self.pins[index] -= 1
+        if self.pins[index] == 0:
+            del self.pins[index]
+            self._evict()
+
+    def is_cached(self, index: int) -> bool:
+        return index in self.frames
+
+    def discard(self, index: int) -> None:
+        """
+        Drop the frame of block `index` without write-back, e.g. because the block is no longer used.
+        """
+        assert index not in self.pins, f'Block {index} is pinned'
+
+        if self.frames.pop(index, None) is not None:
+            self.dirty.discard(index)
+            self.replacer.remove(index)
+
+    def invalidate(self) -> None:
+        """
+        Drop every frame without write-back, e.g. to roll back uncommitted changes.
+        """
+        assert not self.pins, 'Some blocks are pinned'
+
+        for index in list(self.frames):
+            self.discard(index)
+
+    def zero_blocks(self, first: int, count: int) -> None:
+        """
+        Fill existing blocks with zeroes, bypassing the cache like `allocate_blocks` does.
+        While `no_steal` is set, they go through the cache instead, since they may hold committed data.
+        """
+        for index in range(first, first + count):
+            if self.no_steal:
+                self.write_block(Block.empty(index))
+                continue
+
+            self.discard(index)
+            self.storage.write_block(Block.empty(index))
+
+    ################
+    # BlockStorage #
+    ################
+
+    def read_block(self, index: int) -> Block:
+        block = self.frames.get(index)
+
+        if block is not None:
+            self.stats.hits += 1
+            self.replacer.touch(index)
+
+        else:
+            self.stats.misses += 1
+            block = self.storage.read_block(index)
+            self._insert(block)
+
+        return block
+
+    def view_block(self, index: int) -> memoryview:
+        """
+        Random reads, e.g. of index pages, are cached like `read_block`, at the cost of a copy from mmap storage.
+        """
+        return memoryview(self.read_block(index))
+
+    def scan_block(self, index: int) -> memoryview:
+        """
+        Blocks of sequential scans which are not resident (hence clean) are viewed straight from the underlying
+        storage without being cached, so that large scans do not wipe out the pool, and mmap storage is not copied.
+        Resident blocks are viewed in place, but not promoted.
+        """
+        block = self.frames.get(index)
+
+        if block is not None:
+            self.stats.hits += 1
+            return memoryview(block)
+
+        else:
+            self.stats.misses += 1
+            return self.storage.view_block(index)
+
+    def write_block(self, block: Block) -> None:
+        assert block.idx < self.count_blocks(), f'Block {block.idx} does not exist'
+
+        if self.frames.get(block.idx) is not block:
+            self.frames[block.idx] = block
+        self.dirty.add(block.idx)
+        self.replacer.touch(block.idx)
+        self._evict()
+
+    def allocate_block(self) -> Block:
+        block = self.storage.allocate_block()
+        self._insert(block)
+        return block
+
+    def allocate_blocks(self, count: int) -> int:
+        # fresh blocks are not cached: large extents would just flush out the whole pool
+        return self.storage.allocate_blocks(count)
+
+    def truncate_blocks(self, count: int) -> None:
+        for index in [i for i in self.frames if i >= count]:
+            self.discard(index)
+
+        self.storage.truncate_blocks(count)
+
+    def count_blocks(self) -> int:
+        return self.storage.count_blocks()
+
+    def flush(self) -> None:
+        for index in sorted(self.dirty):
+            self.storage.write_block(self.frames[index])
+            self.stats.writebacks += 1
+        self.dirty.clear()
+
+        self.storage.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.storage.close()
+
+        self.frames.clear()
+        self.pins.clear()
+
+    #############
+    # Internals #
+    #############
+
+    def _insert(self, block: Block) -> None:
+        self.frames[block.idx] = block
+        self.replacer.touch(block.idx)
+        self._evict()
+
+    def _evictable(self, index: int) -> bool:
+        return index not in self.pins and not (self.no_steal and index in self.dirty)
+
+    def _evict(self) -> None:
+        while len(self.frames) > self.capacity:
+            index = self.replacer.victim(self._evictable)
+            if index is None: return  # everything is pinned
+
+            block = self.frames.pop(index)
+            if index in self.dirty:
+                self.dirty.remove(index)
+                self.storage.write_block(block)
+                self.stats.writebacks += 1
+
+            self.stats.evictions += 1
@@ -1,17 +1,23 @@
 from typing import *
 
 from dropSQL.ast.ast import AstStmt
+from dropSQL.ast.transaction import TransactionControl
+from dropSQL.ast.vacuum_database import VacuumDatabase
 from dropSQL.generic import *
 from dropSQL.parser.streams.statements import Statements
+from .buffer_pool import DEFAULT_CAPACITY, LRU
 from .db_file import DBFile
+from .transaction import Transaction
+from .wal import GROUP
 from dropSQL.engine.types import *
 
 
 class Connection:
-    def __init__(self, path: str = MEMORY) -> None:
+    def __init__(self, path: str = MEMORY, cache_size: int = DEFAULT_CAPACITY, cache_policy: str = LRU,
+                 use_mmap: bool = False, use_wal: bool = True, wal_sync: str = GROUP) -> None:
         super().__init__()
 
-        self.file = DBFile(path)
+        self.file = DBFile(path, cache_size, cache_policy, use_mmap, use_wal=use_wal, wal_sync=wal_sync)
         self.cache: Dict[str, AstStmt] = []
 
     def prepare_statement(self, sql: str) -> IResult[AstStmt]:
@@ -29,9 +35,38 @@ class Connection:
 
         return IOk(stmt)
 
-    # TODO
+    @property
+    def transaction(self) -> Optional[Transaction]:
+        """
+        Active explicit transaction, if any.
+        """
+        return self.file.transaction
+
     def execute_statement(self, stmt: AstStmt, args: List[Any] = ()) -> Result[None, None]:
-        return stmt.execute(self.file, args)
+        """
+        Outside of explicit transaction every statement is committed on its own, or rolled back on failure.
+        Failed statement inside explicit transaction aborts it: until `/rollback`, every other statement fails.
+        Vacuum manages the file itself and is never wrapped into a transaction.
+        """
+        if isinstance(stmt, (TransactionControl, VacuumDatabase)):
+            return stmt.execute(self.file, args)
+
+        transaction = self.transaction
+        if transaction is not None:
+            if transaction.aborted: return Err('Transaction is aborted, roll it back')
+
+            res = stmt.execute(self.file, args)
+            if not res: transaction.aborted = True
+            return res
+
+        self.file.begin().ok()
+        res = stmt.execute(self.file, args)
+
+        if not res:
+            self.file.rollback().ok()
+        else:
+            self.file.commit().ok()
+        return res
 
     def execute(self, sql: str, args: List[Any] = ()) -> Result[None, None]:
         stmt = self.prepare_statement(sql).ok()
@@ -2,73 +2,84 @@
 Class for db file i/o
 """
 
-import io
-import os
 from typing import *
 
 from dropSQL.ast import *
 from dropSQL.engine.column import Column
 from dropSQL.engine.row_set import *
+from dropSQL.engine.spool import *
 from dropSQL.engine.types import *
 from dropSQL.generic import *
 from dropSQL.parser.tokens import Identifier
 from .block import Block, BLOCK_SIZE
 from .block_storage import BlockStorage
+from .buffer_pool import *
+from .file_storage import FileBlockStorage
+from .free_map import FreeMap
 from .metadata import Metadata
-from .table import Table
-
-
-def open_db(path: str) -> io.BufferedIOBase:
-    if path == MEMORY:
-        return io.BytesIO()
-    else:
-        if not os.path.exists(path):
-            # touch file
-            with open(path, "w"): pass
-        return open(path, "r+b", buffering=16 * BLOCK_SIZE)
+from .mmap_storage import MmapBlockStorage
+from .table import BTREE, REUSE, Table
+from .transaction import Transaction
+from .wal import *
 
 
 class DBFile(BlockStorage):
-    def __init__(self, path: str = MEMORY) -> None:
+    def __init__(self, path: str = MEMORY, cache_size: int = DEFAULT_CAPACITY, cache_policy: str = LRU,
+                 use_mmap: bool = False, slot_policy: str = REUSE, use_wal: bool = True,
+                 wal_sync: str = GROUP) -> None:
         """
         Open /dropSQL™ⓒⓡ database file stored at given `path`.
 
         A special value path, ":memory:", will open connection to a new transient in-memory database.
+
+        All block I/O goes through the buffer pool of `cache_size` blocks with `cache_policy` eviction.
+        With `use_mmap` the file is memory-mapped instead of being read with system calls.
+        `slot_policy` tells tables whether slots of deleted records are reused (REUSE) or not (APPEND).
+
+        Persistent databases are journaled with write-ahead log in `path + "-wal"`, unless `use_wal` is off.
+        Every `flush` is committed atomically, and the log is synced according to `wal_sync` policy (FULL, GROUP or OFF).
+        With GROUP, the last commits may stay unsynced until the next flush of an idle database;
+        call `sync` to make them durable right away.
         """
         self.tables: List[Table] = []
         self.path: str = path
-        self.file: io.BufferedIOBase = open_db(self.path)
-        self.blocks = self.storage_size() // BLOCK_SIZE
+        self.slot_policy = slot_policy
+        self._metadata: Optional[Metadata] = None
+        self.transaction: Optional[Transaction] = None
 
-        self._init_base()
+        backend = MmapBlockStorage(self.path) if use_mmap else FileBlockStorage(self.path)
 
-    def storage_size(self) -> int:
-        if isinstance(self.file, io.BytesIO):
-            return len(self.file.getbuffer())
-        else:
-            return os.stat(self.file.fileno()).st_size
+        self.wal: Optional[WriteAheadLog] = None
+        if use_wal and not self.is_in_memory():
+            self.wal = backend = WriteAheadLog(backend, self.path + WAL_SUFFIX, wal_sync)
 
-    def _init_base(self) -> None:
-        size = self.storage_size()
+        self.pool = BufferPool(backend, cache_size, cache_policy)
+
+        self._init_base()
+        self.free_map = FreeMap(self.pool, self.metadata)
 
-        if size % BLOCK_SIZE != 0:
-            raise ValueError(f'Database size is not a multiple of {BLOCK_SIZE}')
+    @property
+    def blocks(self) -> int:
+        return self.pool.count_blocks()
 
-        if size == 0:
-            for i in range(17):
-                self.allocate_block()
+    def _init_base(self) -> None:
+        if self.blocks == 0:
+            self.pool.allocate_blocks(17)
 
-    def _maybe_update_metadata_block_count(self) -> None:
-        if self.blocks >= 17:
-            self.metadata.data_blocks_count = self.blocks - 17
+    def _update_metadata_block_count(self) -> None:
+        metadata = self.metadata
+        if metadata.data_blocks_count != self.blocks - 17:
+            metadata.data_blocks_count = self.blocks - 17
 
     @property
     def metadata(self) -> Metadata:
-        return Metadata(self)
+        if self._metadata is None:
+            self._metadata = Metadata(self)
+        return self._metadata
 
     def get_tables(self) -> List[Table]:
         if len(self.tables) == 0:
-            self.tables = [Table(self, i) for i in range(0, 16)]
+            self.tables = [Table(self, i, self.slot_policy) for i in range(0, 16)]
 
         return self.tables
 
@@ -102,35 +113,222 @@ class DBFile(BlockStorage):
     ################
 
     def read_block(self, index: int) -> Block:
-        assert index < self.blocks, f'Block {index} does not exist'
+        return self.pool.read_block(index)
 
-        self.file.seek(index * BLOCK_SIZE)
-        block = Block(self.file.read(BLOCK_SIZE), index)
-        return block
+    def view_block(self, index: int) -> memoryview:
+        return self.pool.view_block(index)
 
-    def write_block(self, block: Block) -> None:
-        assert block.idx < self.blocks, f'Block {block.idx} does not exist'
+    def scan_block(self, index: int) -> memoryview:
+        return self.pool.scan_block(index)
 
-        self.file.seek(block.idx * BLOCK_SIZE)
-        self.file.write(block)
+    def write_block(self, block: Block) -> None:
+        self.pool.write_block(block)
 
     def allocate_block(self) -> Block:
-        block = Block.empty(self.blocks)
-        self.blocks += 1
-        self._maybe_update_metadata_block_count()
-        self.write_block(block)
+        """
+        Released blocks are handed out first, the file grows only when there are none.
+        """
+        index = self.free_map.allocate()
+        if index == -1: return self.pool.allocate_block()
+
+        block = Block.empty(index)
+        self.pool.write_block(block)
         return block
 
+    def allocate_blocks(self, count: int) -> int:
+        """
+        Extent allocator: first run of `count` adjacent released blocks, or a new run at the end of the file.
+        """
+        first = self.free_map.allocate(count)
+        if first == -1: return self.pool.allocate_blocks(count)
+
+        self.pool.zero_blocks(first, count)
+        return first
+
+    def release_block(self, index: int) -> None:
+        """
+        Blocks at the end of the file are cut off, others are remembered in the free map.
+        Inside a transaction the file never shrinks, so that rollback could restore it.
+        """
+        assert 17 <= index < self.blocks, f'Block {index} can not be released'
+        self.pool.discard(index)
+
+        if index == self.blocks - 1 and self.transaction is None:
+            count = index
+            while self.free_map.is_free(count - 1):
+                self.free_map.take(count - 1)
+                count -= 1
+            self.truncate_blocks(count)
+
+        else:
+            self.free_map.release(index)
+
+    def truncate_blocks(self, count: int) -> None:
+        self.pool.truncate_blocks(count)
+
     def count_blocks(self) -> int:
         return self.blocks
 
+    ################
+    # Transactions #
+    ################
+
+    def begin(self) -> Result[None, str]:
+        if self.transaction is not None: return Err('Transaction is already active')
+
+        self.flush()
+        self.transaction = Transaction(self.blocks)
+        # log keeps uncommitted blocks apart by itself
+        self.pool.no_steal = self.wal is None
+        return Ok(None)
+
+    def commit(self) -> Result[None, str]:
+        if self.transaction is None: return Err('No active transaction')
+        if self.transaction.aborted: return Err('Transaction is aborted, roll it back')
+
+        self.transaction = None
+        self.pool.no_steal = False
+        self.flush()
+        return Ok(None)
+
+    def rollback(self) -> Result[None, str]:
+        if self.transaction is None: return Err('No active transaction')
+
+        transaction, self.transaction = self.transaction, None
+        self.pool.no_steal = False
+
+        # clean frames may have been read back from the uncommitted part of the log, so drop them too
+        self.pool.invalidate()
+        if self.wal is not None:
+            self.wal.abort()
+        elif self.blocks > transaction.blocks:
+            self.truncate_blocks(transaction.blocks)
+
+        self._metadata = None
+        self.free_map = FreeMap(self.pool, self.metadata)
+        for table in self.tables:
+            table.reload()
+
+        return Ok(None)
+
     #################
     # Miscellaneous #
     #################
 
+    def flush(self) -> None:
+        """
+        Write down all pending changes.
+
+        Data pages are handed over to the storage first, then table descriptors and metadata which refer to them.
+        With write-ahead log all of them are committed at once.
+
+        Inside a transaction changes are only handed over to the buffer pool, and written down on commit.
+        """
+        in_transaction = self.transaction is not None
+        if not in_transaction: self.pool.flush()
+
+        for table in self.tables:
+            table.flush()
+        self._update_metadata_block_count()
+        self.metadata.flush()
+        if in_transaction: return
+
+        self.pool.flush()
+
+        if self.wal is not None:
+            self.wal.commit()
+
+    def sync(self) -> None:
+        """
+        Flush and wait until everything committed reaches the disk, regardless of the sync policy.
+        """
+        self.flush()
+        self.pool.storage.sync()
+
     def close(self) -> None:
-        self.file.flush()
-        self.file.close()
+        """
+        Active transaction is rolled back.
+        """
+        if self.transaction is not None: self.rollback().ok()
+
+        self.flush()
+        self.pool.close()
+
+    def vacuum(self) -> Result[int, str]:
+        """
+        Compact live records of every table into contiguous pages, and give the rest of the file back.
+
+        Pointer trees are rebuilt from scratch, dead slots and blocks of dropped tables are discarded.
+        Records get renumbered.
+
+        Rows are spooled away first, then written back from the start of the file inside a transaction,
+        together with cutting off the tail and recording remaining holes in the free map,
+        so any failure or crash rolls everything back.
+
+        A persistent database needs write-ahead log for that: without it, the whole rewritten database
+        would have to stay in the buffer pool until commit.  In-memory database does just that.
+
+        :return: Number of bytes reclaimed.
+        """
+        if self.transaction is not None: return Err('Can not vacuum inside a transaction')
+        if self.wal is None and not self.is_in_memory(): return Err('Can not vacuum without write-ahead log')
+
+        before = self.blocks
+        self.begin().ok()
+
+        contents: List[Tuple[Table, RowSpool]] = []
+        try:
+            for table in self.get_tables():
+                if table.get_table_name().identifier != '':
+                    contents.append((table, RowSpool().extend(row for _, row in table.scan())))
+                table.reset_pages()
+
+            # old bitmaps are overwritten like any other block
+            self.free_map.clear()
+            self.free_map.reuse(range(17, self.blocks))
+
+            for table, spool in contents:
+                res = self._refill(table, spool)
+                if not res:
+                    self.rollback().ok()
+                    return Err(f'Can not vacuum table {table.get_table_name()}: {res.err()}')
+
+            # blocks which were not reused
+            count = self.blocks
+            while self.free_map.is_free(count - 1):
+                self.free_map.take(count - 1)
+                count -= 1
+            if count < self.blocks: self.truncate_blocks(count)
+
+            holes, self.free_map.free = self.free_map.free, []
+            for index in holes:
+                self.free_map.release(index)
+
+        except BaseException:
+            self.rollback().ok()
+            raise
+
+        finally:
+            for _, spool in contents:
+                spool.close()
+
+        self.commit().ok()
+        return Ok((before - self.blocks) * BLOCK_SIZE)
+
+    @staticmethod
+    def _refill(table: Table, rows: Iterable[ROW_TYPE]) -> Result[None, str]:
+        chunk: List[ROW_TYPE] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == MEMORY_ROWS:
+                res = table.insert_many(chunk)
+                if not res: return Err(res.err())
+                chunk = []
+
+        if chunk:
+            res = table.insert_many(chunk)
+            if not res: return Err(res.err())
+        return Ok(None)
 
     def is_in_memory(self):
         return self.path == MEMORY
@@ -148,6 +346,13 @@ class DBFile(BlockStorage):
             if name.identifier == '': continue
             sql = CreateTable(None, name, table.get_columns()).to_sql()
             rows.append(['table', name.identifier, sql])
+
+            column_names = [column.name for column in table.get_columns()]
+            for definition in table.get_indexes():
+                if definition.primary: continue  # part of the table definition
+                using = Identifier('btree') if definition.kind == BTREE else None
+                sql = CreateIndex(None, definition.name, name, column_names[definition.column], using).to_sql()
+                rows.append(['index', definition.name.identifier, sql])
         return MockRowSet(columns, rows)
 
     def __str__(self) -> str:
@@ -0,0 +1,92 @@
+import io
+import os
+
+from dropSQL.engine.types import *
+from .block import Block, BLOCK_SIZE
+from .block_storage import BlockStorage
+
+
+def open_db(path: str) -> io.BufferedIOBase:
+    if path == MEMORY:
+        return io.BytesIO()
+    else:
+        if not os.path.exists(path):
+            # touch file
+            with open(path, "w"): pass
+        return open(path, "r+b", buffering=16 * BLOCK_SIZE)
+
+
+class FileBlockStorage(BlockStorage):
+    """
+    Raw block storage on top of a regular file (or in-memory buffer), no caching whatsoever.
+    """
+
+    def __init__(self, path: str = MEMORY) -> None:
+        super().__init__()
+
+        self.path: str = path
+        self.file: io.BufferedIOBase = open_db(self.path)
+
+        size = self.storage_size()
+        if size % BLOCK_SIZE != 0:
+            raise ValueError(f'Database size is not a multiple of {BLOCK_SIZE}')
+
+        self.blocks = size // BLOCK_SIZE
+
+    def storage_size(self) -> int:
+        if isinstance(self.file, io.BytesIO):
+            return len(self.file.getbuffer())
+        else:
+            return os.stat(self.file.fileno()).st_size
+
+    def read_block(self, index: int) -> Block:
+        assert index < self.blocks, f'Block {index} does not exist'
+
+        self.file.seek(index * BLOCK_SIZE)
+        block = Block(self.file.read(BLOCK_SIZE), index)
+        return block
+
+    def write_block(self, block: Block) -> None:
+        assert block.idx < self.blocks, f'Block {block.idx} does not exist'
+
+        self.file.seek(block.idx * BLOCK_SIZE)
+        self.file.write(block)
+
+    def allocate_block(self) -> Block:
+        block = Block.empty(self.blocks)
+        self.blocks += 1
+        self.write_block(block)
+        return block
+
+    def allocate_blocks(self, count: int) -> int:
+        assert count > 0
+        first = self.blocks
+        self.blocks += count
+
+        if isinstance(self.file, io.BytesIO):
+            self.file.seek(first * BLOCK_SIZE)
+            self.file.write(bytes(count * BLOCK_SIZE))
+        else:
+            self.file.truncate(self.blocks * BLOCK_SIZE)
+
+        return first
+
+    def truncate_blocks(self, count: int) -> None:
+        assert 0 <= count <= self.blocks
+        self.blocks = count
+        self.file.truncate(self.blocks * BLOCK_SIZE)
+
+    def count_blocks(self) -> int:
+        return self.blocks
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def sync(self) -> None:
+        self.file.flush()
+        if not isinstance(self.file, io.BytesIO):
+            os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        self.file.flush()
+        self.file.close()
@@ -0,0 +1,119 @@
+from bisect import bisect_left, insort
+from typing import *
+
+from .block import *
+from .block_storage import BlockStorage
+from .metadata import Metadata, MAX_BITMAPS
+
+__all__ = [
+    'BLOCKS_PER_BITMAP',
+    'FreeMap',
+]
+
+# number of physical blocks covered by one bitmap block
+BLOCKS_PER_BITMAP = BLOCK_SIZE * 8
+
+
+class FreeMap:
+    """
+    Persistent set of released physical blocks which may be handed out again.
+
+    Free blocks are marked by set bits in bitmap blocks, each covering BLOCKS_PER_BITMAP consecutive blocks.
+    Bitmap blocks are appended lazily, when the first block in their range gets released,
+    and they are reachable from the metadata block.
+
+    Sorted list of free blocks is kept in memory to find runs of adjacent blocks quickly.
+    """
+
+    def __init__(self, storage: BlockStorage, metadata: Metadata) -> None:
+        super().__init__()
+
+        self.storage = storage
+        self.metadata = metadata
+        self.free: List[int] = []
+
+        for n in range(MAX_BITMAPS):
+            pointer = metadata.get_bitmap(n)
+            if pointer == 0: continue
+
+            bitmap = storage.view_block(pointer)
+            base = n * BLOCKS_PER_BITMAP
+            for i, byte in enumerate(bitmap):
+                if byte == 0: continue
+                for bit in range(8):
+                    if byte & (1 << bit): self.free.append(base + i * 8 + bit)
+
+    def __len__(self) -> int:
+        return len(self.free)
+
+    def is_free(self, index: int) -> bool:
+        i = bisect_left(self.free, index)
+        return i < len(self.free) and self.free[i] == index
+
+    def allocate(self, count: int = 1) -> int:
+        """
+        Take the first run of `count` adjacent free blocks.
+
+        :return: Index of the first block in the run, or -1 if there is no such run.
+        """
+        assert count > 0
+        free = self.free
+
+        start = 0
+        for i in range(len(free)):
+            if free[i] - free[start] != i - start:
+                start = i
+            if i - start + 1 == count:
+                first = free[start]
+                del free[start:i + 1]
+                for index in range(first, first + count):
+                    self._mark(index, False)
+                return first
+
+        return -1
+
+    def take(self, index: int) -> None:
+        """
+        Remove particular block from the set of free blocks.
+        """
+        assert self.is_free(index), f'Block {index} is not free'
+        del self.free[bisect_left(self.free, index)]
+        self._mark(index, False)
+
+    def release(self, index: int) -> None:
+        assert not self.is_free(index), f'Block {index} is already free'
+        self._mark(index, True)
+        insort(self.free, index)
+
+    def reuse(self, indices: Iterable[int]) -> None:
+        """
+        Hand out given blocks like free ones, without marking them in bitmaps.
+        Whatever is left of them must be released or cut off by the caller afterwards.
+        """
+        self.free = sorted(set(self.free).union(indices))
+
+    def clear(self) -> None:
+        """
+        Forget about all free blocks and bitmaps.  Bitmap blocks themselves are not released.
+        """
+        self.free.clear()
+        for n in range(MAX_BITMAPS):
+            if self.metadata.get_bitmap(n) != 0:
+                self.metadata.set_bitmap(n, 0)
+
+    def _mark(self, index: int, free: bool) -> None:
+        n, bit = divmod(index, BLOCKS_PER_BITMAP)
+
+        pointer = self.metadata.get_bitmap(n)
+        if pointer == 0:
+            if not free: return
+            # append, so that the bitmap never lands into its own free space
+            pointer = self.storage.allocate_block().idx
+            self.metadata.set_bitmap(n, pointer)
+
+        bitmap = self.storage.read_block(pointer)
+        if free:
+            bitmap[bit // 8] |= 1 << (bit % 8)
+        else:
+            bitmap[bit // 8] &= ~(1 << (bit % 8)) & 0xFF
+        self.storage.write_block(bitmap)
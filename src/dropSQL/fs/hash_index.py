@@ -0,0 +1,291 @@
+import struct
+import zlib
+from typing import *
+
+from dropSQL.engine.types import *
+from .block import *
+from .block_storage import BlockStorage
+
+__all__ = [
+    'ENTRIES_PER_PAGE',
+    'HashIndex',
+    'MAX_DEPTH',
+    'hash_key',
+]
+
+# directory block holds global depth followed by 2 ** depth bucket pointers
+MAX_DEPTH = (POINTERS_PER_BLOCK - 1).bit_length() - 1
+
+PAGE_HEADER = struct.Struct('>III')  # next page in the chain, number of entries, local depth
+ENTRY = struct.Struct('>II')  # hash of the key, record id
+ENTRIES_PER_PAGE = (BLOCK_SIZE - PAGE_HEADER.size) // ENTRY.size
+
+
+def hash_key(value: DB_TYPE) -> int:
+    """
+    Stable 32-bit hash of a column value.  Values which compare equal hash equally, e.g. 1 and 1.0.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    if isinstance(value, str):
+        data = b's' + value.encode('UTF-8')
+    elif isinstance(value, int):
+        data = b'i' + str(value).encode('ascii')
+    else:
+        data = b'f' + repr(value).encode('ascii')
+
+    return zlib.crc32(data)
+
+
+class HashIndex:
+    """
+    On-disk extendible hash index which maps column values to record ids.
+
+    Directory block holds global depth and 2 ** depth pointers to bucket pages, addressed by low bits of key hash.
+    Bucket page of local depth d is shared by all directory slots with the same low d bits.
+    Every bucket page starts with a pointer to the next page of its chain, a number of entries and local depth,
+    followed by (hash of the key, record id) pairs.
+
+    Index starts with a single bucket.  When a bucket fills up, it splits in two by the next bit of the hash,
+    and the directory doubles if needed.  A bucket whose entries can not be told apart by hash bits
+    (e.g. duplicates of one key), or which is at MAX_DEPTH, grows an overflow chain instead.
+
+    Keys themselves are not stored, so lookups may return false positives which must be checked against records.
+    Index without directory (root = 0) is empty; directory is allocated by the first insert.
+    """
+
+    __slots__ = ['storage', 'root']
+
+    def __init__(self, storage: BlockStorage, root: int = 0) -> None:
+        super().__init__()
+
+        self.storage = storage
+        self.root = root
+
+    def lookup(self, key: DB_TYPE) -> List[int]:
+        """
+        :return: Ids of records which may have this key.
+        """
+        if self.root == 0: return []
+
+        h = hash_key(key)
+        needle = h.to_bytes(4, byteorder=BYTEORDER)
+        records: List[int] = []
+
+        pointer = self._bucket(self.storage.read_block(self.root), h)
+        while pointer != 0:
+            page = self.storage.read_block(pointer)
+            pointer, count, _ = PAGE_HEADER.unpack_from(page)
+            end = PAGE_HEADER.size + count * ENTRY.size
+
+            position = page.find(needle, PAGE_HEADER.size, end)
+            while position != -1:
+                # hash may also match across entry boundaries or inside a record id
+                if (position - PAGE_HEADER.size) % ENTRY.size == 0:
+                    records.append(ENTRY.unpack_from(page, position)[1])
+                position = page.find(needle, position + 1, end)
+
+        return records
+
+    def insert(self, key: DB_TYPE, record: int) -> None:
+        self.insert_many([(key, record)])
+
+    def insert_many(self, entries: Iterable[Tuple[DB_TYPE, int]]) -> None:
+        """
+        Add (key, record id) entries, touching every bucket once unless it splits.
+        """
+        pending: List[Tuple[int, bytes]] = []
+        for key, record in entries:
+            h = hash_key(key)
+            pending.append((h, ENTRY.pack(h, record)))
+        if not pending: return
+
+        if self.root == 0:
+            directory = self.storage.allocate_block()
+            directory.set_pointer(1, self._new_page(0).idx)
+            self.root = directory.idx
+        else:
+            directory = self.storage.read_block(self.root)
+
+        groups: Dict[int, List[Tuple[int, bytes]]] = {}
+        for h, packed in pending:
+            groups.setdefault(self._bucket(directory, h), []).append((h, packed))
+
+        while groups:
+            pointer, items = groups.popitem()
+            items = self._append(pointer, items)
+            if not items: continue
+
+            # bucket is full
+            if self._split(directory, pointer, [h for h, _ in items]):
+                for h, packed in items:
+                    groups.setdefault(self._bucket(directory, h), []).append((h, packed))
+            else:
+                self._extend(pointer, items)
+
+        self.storage.write_block(directory)
+
+    def delete(self, key: DB_TYPE, record: int) -> bool:
+        """
+        Remove one (key, record id) entry.  Hole is filled with the last entry of the same page.
+
+        :return: Whether the entry has been found.
+        """
+        if self.root == 0: return False
+
+        h = hash_key(key)
+        needle = ENTRY.pack(h, record)
+
+        pointer = self._bucket(self.storage.read_block(self.root), h)
+        while pointer != 0:
+            page = self.storage.read_block(pointer)
+            next_page, count, depth = PAGE_HEADER.unpack_from(page)
+            end = PAGE_HEADER.size + count * ENTRY.size
+
+            position = page.find(needle, PAGE_HEADER.size, end)
+            while position != -1 and (position - PAGE_HEADER.size) % ENTRY.size != 0:
+                position = page.find(needle, position + 1, end)
+
+            if position != -1:
+                last = end - ENTRY.size
+                page[position:position + ENTRY.size] = page[last:end]
+                page[last:end] = bytes(ENTRY.size)
+                PAGE_HEADER.pack_into(page, 0, next_page, count - 1, depth)
+                self.storage.write_block(page)
+                return True
+
+            pointer = next_page
+
+        return False
+
+    def blocks(self) -> Iterator[int]:
+        """
+        Physical indices of the directory and all bucket pages.
+        """
+        if self.root == 0: return
+        yield self.root
+
+        directory = self.storage.read_block(self.root)
+        buckets = {directory.get_pointer(1 + slot) for slot in range(1 << directory.get_pointer(0))}
+        for pointer in sorted(buckets):
+            while pointer != 0:
+                yield pointer
+                pointer, _, _ = PAGE_HEADER.unpack_from(self.storage.view_block(pointer))
+
+    #############
+    # Internals #
+    #############
+
+    @staticmethod
+    def _bucket(directory: Block, h: int) -> int:
+        depth = directory.get_pointer(0)
+        return directory.get_pointer(1 + (h & ((1 << depth) - 1)))
+
+    def _new_page(self, depth: int) -> Block:
+        page = self.storage.allocate_block()
+        PAGE_HEADER.pack_into(page, 0, 0, 0, depth)
+        self.storage.write_block(page)
+        return page
+
+    def _chain(self, pointer: int) -> List[Block]:
+        pages: List[Block] = []
+        while pointer != 0:
+            page = self.storage.read_block(pointer)
+            pages.append(page)
+            pointer = PAGE_HEADER.unpack_from(page)[0]
+        return pages
+
+    def _append(self, pointer: int, items: List[Tuple[int, bytes]]) -> List[Tuple[int, bytes]]:
+        """
+        Put as many entries as there is room for into pages of the chain.
+
+        :return: Entries which did not fit.
+        """
+        for page in self._chain(pointer):
+            if not items: break
+
+            next_page, count, depth = PAGE_HEADER.unpack_from(page)
+            n = min(len(items), ENTRIES_PER_PAGE - count)
+            if n == 0: continue
+
+            offset = PAGE_HEADER.size + count * ENTRY.size
+            page[offset:offset + n * ENTRY.size] = b''.join(packed for _, packed in items[:n])
+            PAGE_HEADER.pack_into(page, 0, next_page, count + n, depth)
+            self.storage.write_block(page)
+            items = items[n:]
+
+        return items
+
+    def _extend(self, pointer: int, items: List[Tuple[int, bytes]]) -> None:
+        """
+        Link overflow pages to the end of the chain for entries which did not fit.
+        """
+        last = self._chain(pointer)[-1]
+        while items:
+            next_page, count, depth = PAGE_HEADER.unpack_from(last)
+            page = self._new_page(depth)
+            PAGE_HEADER.pack_into(last, 0, page.idx, count, depth)
+            self.storage.write_block(last)
+
+            items = self._append(page.idx, items)
+            last = self.storage.read_block(page.idx)
+
+    def _split(self, directory: Block, pointer: int, pending: List[int]) -> bool:
+        """
+        Split the bucket by the next bit of the hash, redistributing entries of its whole chain.
+
+        :param pending: Hashes of entries which are about to be inserted.
+        :return: Whether the bucket has been split.
+        """
+        pages = self._chain(pointer)
+        depth = PAGE_HEADER.unpack_from(pages[0])[2]
+        if depth == MAX_DEPTH: return False
+
+        entries: List[bytes] = []
+        for page in pages:
+            count = PAGE_HEADER.unpack_from(page)[1]
+            data = page[PAGE_HEADER.size:PAGE_HEADER.size + count * ENTRY.size]
+            entries.extend(bytes(data[i:i + ENTRY.size]) for i in range(0, len(data), ENTRY.size))
+
+        # splitting would not separate anything
+        mask = (1 << MAX_DEPTH) - 1
+        if len({ENTRY.unpack(packed)[0] & mask for packed in entries}.union(h & mask for h in pending)) < 2:
+            return False
+
+        global_depth = directory.get_pointer(0)
+        if depth == global_depth:
+            for slot in range(1 << global_depth):
+                directory.set_pointer(1 + (1 << global_depth) + slot, directory.get_pointer(1 + slot))
+            global_depth += 1
+            directory.set_pointer(0, global_depth)
+
+        sibling = self._new_page(depth + 1)
+        low = ENTRY.unpack(entries[0])[0] if entries else pending[0]
+        for slot in range(low & ((1 << depth) - 1), 1 << global_depth, 1 << depth):
+            if slot >> depth & 1: directory.set_pointer(1 + slot, sibling.idx)
+
+        stay = [packed for packed in entries if not ENTRY.unpack(packed)[0] >> depth & 1]
+        move = [packed for packed in entries if ENTRY.unpack(packed)[0] >> depth & 1]
+        self._rewrite(pages, stay, depth + 1)
+        self._rewrite([sibling], move, depth + 1)
+        return True
+
+    def _rewrite(self, pages: List[Block], entries: List[bytes], depth: int) -> None:
+        """
+        Fill the chain with given entries from scratch, allocating or releasing overflow pages as needed.
+        """
+        needed = max(1, -(-len(entries) // ENTRIES_PER_PAGE))
+        while len(pages) < needed:
+            pages.append(self._new_page(depth))
+        for page in pages[needed:]:
+            self.storage.release_block(page.idx)
+        pages = pages[:needed]
+
+        for i, page in enumerate(pages):
+            chunk = entries[i * ENTRIES_PER_PAGE:(i + 1) * ENTRIES_PER_PAGE]
+            next_page = pages[i + 1].idx if i + 1 < len(pages) else 0
+            page[:] = bytes(BLOCK_SIZE)
+            PAGE_HEADER.pack_into(page, 0, next_page, len(chunk), depth)
+            page[PAGE_HEADER.size:PAGE_HEADER.size + len(chunk) * ENTRY.size] = b''.join(chunk)
+            self.storage.write_block(page)
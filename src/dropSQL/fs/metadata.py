@@ -3,12 +3,21 @@ from .block import *
 from .block_storage import BlockStorage
 
 NAME_LENGTH = 256
+# pointers to free-block bitmaps follow database name and block count
+BITMAPS_OFFSET = NAME_LENGTH + POINTER_SIZE
+MAX_BITMAPS = (BLOCK_SIZE - BITMAPS_OFFSET) // POINTER_SIZE
 
 
 class Metadata:
+    """
+    Database meta block.  Block count changes with every allocation, so it is only kept
+    in memory and marked dirty until the next `flush`.  So do pointers to free-block bitmaps.
+    """
+
     def __init__(self, connection: BlockStorage):
         self.connection = connection
         self.block: Block = connection.read_block(0)
+        self.dirty = False
 
     @property
     def name(self) -> str:
@@ -25,17 +34,33 @@ class Metadata:
     @property
     def data_blocks_count(self) -> int:
         """ Number of data blocks, excluding DB meta block and table meta blocks. """
-        block = self.connection.read_block(0)
-        count = block[NAME_LENGTH:NAME_LENGTH + POINTER_SIZE]
+        count = self.block[NAME_LENGTH:NAME_LENGTH + POINTER_SIZE]
         return int.from_bytes(count, byteorder=BYTEORDER)
 
     @data_blocks_count.setter
     def data_blocks_count(self, count: int) -> None:
         count = count.to_bytes(POINTER_SIZE, byteorder=BYTEORDER)
         self.block[NAME_LENGTH:NAME_LENGTH + POINTER_SIZE] = count
-        self.connection.write_block(self.block)
+        self.dirty = True
 
     @property
     def blocks_count(self) -> int:
         """ Total number of blocks, including meta blocks. """
         return 17 + self.data_blocks_count
+
+    def get_bitmap(self, index: int) -> int:
+        """ Pointer to the free-block bitmap number `index`, or 0 if there is none yet. """
+        assert 0 <= index < MAX_BITMAPS
+        offset = BITMAPS_OFFSET + index * POINTER_SIZE
+        return int.from_bytes(self.block[offset:offset + POINTER_SIZE], byteorder=BYTEORDER)
+
+    def set_bitmap(self, index: int, pointer: int) -> None:
+        assert 0 <= index < MAX_BITMAPS
+        offset = BITMAPS_OFFSET + index * POINTER_SIZE
+        self.block[offset:offset + POINTER_SIZE] = pointer.to_bytes(POINTER_SIZE, byteorder=BYTEORDER)
+        self.dirty = True
+
+    def flush(self) -> None:
+        if self.dirty:
+            self.connection.write_block(self.block)
+            self.dirty = False
@@ -0,0 +1,156 @@
+import io
+import mmap
+import os
+from typing import *
+
+from dropSQL.engine.types import *
+from .block import Block, BLOCK_SIZE
+from .block_storage import BlockStorage
+
+__all__ = [
+    'CHUNK_BLOCKS',
+    'MmapBlockStorage',
+]
+
+# Mapping grows by segments of this many blocks.
+# 64 blocks are 768 KiB, which is a multiple of allocation granularity on every supported platform.
+CHUNK_BLOCKS = 64
+
+
+class MmapBlockStorage(BlockStorage):
+    """
+    Block storage backed by memory-mapped file.
+
+    File is mapped by fixed-size segments which are never remapped, so views handed out by
+    `view_block` stay valid while the storage grows.  Underlying file is extended by whole segments,
+    and truncated back to the actual number of blocks on `close`.
+
+    Path ":memory:" maps anonymous memory instead of a file.
+    """
+
+    def __init__(self, path: str = MEMORY, chunk: int = CHUNK_BLOCKS) -> None:
+        super().__init__()
+        assert chunk > 0
+
+        self.path = path
+        self.chunk = chunk
+        self.segments: List[mmap.mmap] = []
+        self.file: Optional[io.FileIO] = None
+
+        if path == MEMORY:
+            size = 0
+        else:
+            if not os.path.exists(path):
+                # touch file
+                with open(path, "w"): pass
+            self.file = open(path, 'r+b', buffering=0)
+            size = os.fstat(self.file.fileno()).st_size
+
+        if size % BLOCK_SIZE != 0:
+            raise ValueError(f'Database size is not a multiple of {BLOCK_SIZE}')
+
+        self.blocks = size // BLOCK_SIZE
+        self._map(self.blocks)
+
+    def _map(self, blocks: int) -> None:
+        """
+        Make sure that first `blocks` blocks are mapped.
+        """
+        segment_size = self.chunk * BLOCK_SIZE
+
+        while len(self.segments) * self.chunk < blocks:
+            if self.file is None:
+                segment = mmap.mmap(-1, segment_size)
+
+            else:
+                offset = len(self.segments) * segment_size
+                if os.fstat(self.file.fileno()).st_size < offset + segment_size:
+                    self.file.truncate(offset + segment_size)
+                segment = mmap.mmap(self.file.fileno(), segment_size, offset=offset)
+
+            self.segments.append(segment)
+
+    def _locate(self, index: int) -> Tuple[mmap.mmap, int]:
+        segment = self.segments[index // self.chunk]
+        offset = (index % self.chunk) * BLOCK_SIZE
+        return segment, offset
+
+    ################
+    # BlockStorage #
+    ################
+
+    def view_block(self, index: int) -> memoryview:
+        assert index < self.blocks, f'Block {index} does not exist'
+
+        segment, offset = self._locate(index)
+        return memoryview(segment)[offset:offset + BLOCK_SIZE]
+
+    def read_block(self, index: int) -> Block:
+        return Block(self.view_block(index), index)
+
+    def write_block(self, block: Block) -> None:
+        assert block.idx < self.blocks, f'Block {block.idx} does not exist'
+
+        segment, offset = self._locate(block.idx)
+        segment[offset:offset + BLOCK_SIZE] = block
+
+    def allocate_block(self) -> Block:
+        block = Block.empty(self.blocks)
+        self._map(self.blocks + 1)
+        self.blocks += 1
+        self.write_block(block)
+        return block
+
+    def allocate_blocks(self, count: int) -> int:
+        assert count > 0
+        first = self.blocks
+        self._map(self.blocks + count)
+        self.blocks += count
+
+        zeroes = bytes(BLOCK_SIZE)
+        for index in range(first, self.blocks):
+            segment, offset = self._locate(index)
+            segment[offset:offset + BLOCK_SIZE] = zeroes
+
+        return first
+
+    def truncate_blocks(self, count: int) -> None:
+        """
+        Segments stay mapped, and file is cut down to size on `close`.
+        Shrinking a file under live mapping would turn stale views into SIGBUS.
+        """
+        assert 0 <= count <= self.blocks
+        self.blocks = count
+
+    def count_blocks(self) -> int:
+        return self.blocks
+
+    def flush(self) -> None:
+        """
+        Synchronously write dirty pages of every segment back to the file (msync).
+        """
+        if self.file is None: return
+
+        for segment in self.segments:
+            segment.flush()
+
+    def close(self) -> None:
+        """
+        File is cut down to the actual number of blocks, but never below a segment which is still viewed.
+        Then the spare tail stays in the file as zero blocks.
+        """
+        self.flush()
+
+        size = self.blocks * BLOCK_SIZE
+        segment_size = self.chunk * BLOCK_SIZE
+        for n, segment in enumerate(self.segments):
+            try:
+                segment.close()
+            except BufferError:
+                # somebody still holds a view; memory is released together with the last view
+                size = max(size, (n + 1) * segment_size)
+        self.segments.clear()
+
+        if self.file is not None:
+            self.file.truncate(size)
+            self.file.close()
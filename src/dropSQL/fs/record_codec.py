@@ -0,0 +1,175 @@
+import struct
+from typing import *
+
+from dropSQL.ast.column_def import ColumnDef
+from dropSQL.ast.ty import *
+from dropSQL.engine.types import *
+from dropSQL.generic import *
+
+__all__ = [
+    'ALIVE',
+    'DEAD',
+    'PartialCodec',
+    'RecordCodec',
+]
+
+ALIVE = b'a'
+DEAD = b'd'
+
+
+class RecordCodec:
+    """
+    Compiled binary layout of table records for a fixed set of columns.
+
+    Record is a struct (native alignment) of one-byte alive/dead mark followed by column values.
+    Codec must be thrown away whenever table schema changes.
+    """
+
+    __slots__ = ['struct', 'size', 'offsets', 'columns', 'varchars', 'formats']
+
+    def __init__(self, columns: List[ColumnDef]) -> None:
+        super().__init__()
+
+        fmt = 'c'
+        offsets: List[int] = []
+        self.formats: List[str] = [column.ty.struct_format_string() for column in columns]
+        for column in columns:
+            ty = column.ty.struct_format_string()
+            offsets.append(struct.calcsize(fmt + ty) - struct.calcsize(ty))
+            fmt += ty
+
+        self.struct = struct.Struct(fmt)
+        self.size: int = self.struct.size
+        # offset of each column's value within the record
+        self.offsets: List[int] = offsets
+        # one-value structs to pick single columns out of a record
+        self.columns: List[struct.Struct] = [struct.Struct(column.ty.struct_format_string()) for column in columns]
+        # indices of columns which need conversion between str and bytes
+        self.varchars: List[int] = [i for i, column in enumerate(columns) if isinstance(column.ty, VarCharTy)]
+
+    def partial(self, columns: Iterable[int]) -> 'PartialCodec':
+        """
+        Decoder of the given columns only.
+        """
+        return PartialCodec(self, columns)
+
+    def encode(self, values: ROW_TYPE) -> bytes:
+        """
+        Assume that value types correspond to column types.
+        Strings longer than their columns are cut at a character boundary, so stored UTF-8 is always valid.
+        """
+        raw = list(values)
+        for i in self.varchars:
+            binary = raw[i].encode('UTF-8')
+            width = self.columns[i].size
+            if len(binary) > width:
+                binary = binary[:width].decode('UTF-8', 'ignore').encode('UTF-8')
+            raw[i] = binary
+        return self.struct.pack(ALIVE, *raw)
+
+    def decode(self, binary: bytes) -> Result[ROW_TYPE, str]:
+        try:
+            data = self.struct.unpack(binary)
+        except struct.error as e:
+            return Err(str(e))
+
+        if data[0] == DEAD: return Err('Record is dead')
+        if data[0] != ALIVE: return Err('Incorrect record: {}'.format(data))
+
+        row = self._to_row(data)
+        if row is None: return Err('Incorrect UTF-8 string in record: {}'.format(data))
+        return Ok(row)
+
+    def decode_from(self, buffer, offset: int = 0) -> Optional[ROW_TYPE]:
+        """
+        Decode a record at `offset` within `buffer`.
+
+        :return: Row or None if record is dead or malformed.
+        """
+        if buffer[offset] != ALIVE[0]: return None
+        return self._to_row(self.struct.unpack_from(buffer, offset))
+
+    def decode_many(self, buffer, first: int = 0) -> Iterator[Tuple[int, ROW_TYPE]]:
+        """
+        Decode consecutive records packed in the `buffer` whose size must be a multiple of record size.
+
+        :param first: Record id of the first record in the buffer.
+        :return: Generator of (record id, row) pairs for alive records.
+        """
+        for i, data in enumerate(self.struct.iter_unpack(buffer), first):
+            if data[0] != ALIVE: continue
+            row = self._to_row(data)
+            if row is not None: yield i, row
+
+    def _to_row(self, data: Tuple) -> Optional[ROW_TYPE]:
+        row = list(data[1:])
+        try:
+            for i in self.varchars:
+                row[i] = row[i].partition(b'\0')[0].decode('UTF-8')
+        except UnicodeDecodeError:
+            return None
+        return row
+
+
+class PartialCodec:
+    """
+    Decodes only some columns of records, leaving the rest None.
+
+    Values are picked at their offsets by a struct with pad bytes in place of other columns,
+    so skipped columns cost nothing, and their strings are not decoded.
+    `RecordCodec.encode` never writes malformed UTF-8, so only a damaged record could be dropped by full decoding
+    and still be read partially.
+    """
+
+    __slots__ = ['struct', 'size', 'width', 'columns', 'varchars']
+
+    def __init__(self, codec: RecordCodec, columns: Iterable[int]) -> None:
+        super().__init__()
+
+        self.columns: List[int] = sorted(set(columns))
+        self.width = len(codec.offsets)
+
+        # explicit offsets, no alignment
+        fmt = '=c'
+        position = 1
+        for i in self.columns:
+            fmt += f'{codec.offsets[i] - position}x' + codec.formats[i]
+            position = codec.offsets[i] + codec.columns[i].size
+        fmt += f'{codec.size - position}x'
+
+        self.struct = struct.Struct(fmt)
+        self.size: int = self.struct.size
+        assert self.size == codec.size
+        self.varchars: List[int] = [i for i in self.columns if i in codec.varchars]
+
+    def decode_from(self, buffer, offset: int = 0) -> Optional[ROW_TYPE]:
+        """
+        Decode a record at `offset` within `buffer`.
+
+        :return: Row or None if record is dead or malformed.
+        """
+        if buffer[offset] != ALIVE[0]: return None
+        return self._to_row(self.struct.unpack_from(buffer, offset))
+
+    def decode_many(self, buffer, first: int = 0) -> Iterator[Tuple[int, ROW_TYPE]]:
+        """
+        Decode consecutive records packed in the `buffer` whose size must be a multiple of record size.
+
+        :param first: Record id of the first record in the buffer.
+        :return: Generator of (record id, row) pairs for alive records.
+        """
+        for i, data in enumerate(self.struct.iter_unpack(buffer), first):
+            if data[0] != ALIVE: continue
+            row = self._to_row(data)
+            if row is not None: yield i, row
+
+    def _to_row(self, data: Tuple) -> Optional[ROW_TYPE]:
+        row: ROW_TYPE = [None] * self.width
+        for i, value in zip(self.columns, data[1:]):
+            row[i] = value
+        try:
+            for i in self.varchars:
+                row[i] = row[i].partition(b'\0')[0].decode('UTF-8')
+        except UnicodeDecodeError:
+            return None
+        return row
@@ -1,4 +1,3 @@
-import struct
 from typing import *
 
 from dropSQL.ast.column_def import ColumnDef
@@ -8,6 +7,9 @@ from dropSQL.generic import *
 from dropSQL.parser.tokens import Identifier
 from .block import *
 from .block_storage import BlockStorage
+from .btree_index import BTreeIndex
+from .hash_index import HashIndex
+from .record_codec import *
 
 RAW_TYPE = Union[bytes, int, float]
 LVL0 = DIRECT_POINTERS
@@ -19,6 +21,43 @@ POINTERS_PER_LVL1 = POINTERS_PER_BLOCK
 POINTERS_PER_LVL2 = POINTERS_PER_BLOCK ** 2
 POINTERS_PER_LVL3 = POINTERS_PER_BLOCK ** 3
 
+# slot policies
+APPEND = 'append'  # never reuse slots of deleted records, always write sequentially at the end
+REUSE = 'reuse'  # fill slots of deleted records first
+
+# index kinds, as stored in descriptor
+HASH = b'h'
+BTREE = b'b'
+INDEX_KINDS = {'hash': HASH, 'btree': BTREE}
+
+# index flags, as stored in descriptor
+UNIQUE = 1
+PRIMARY = 2
+
+
+class IndexDef:
+    """
+    Definition of a single-column index, stored in the table descriptor.
+
+    Primary key of a table is its unique index with the primary flag.
+    """
+
+    __slots__ = ['name', 'column', 'kind', 'root', 'unique', 'primary']
+
+    def __init__(self, name: Identifier, column: int, kind: bytes = HASH, root: int = 0,
+                 unique: bool = False, primary: bool = False) -> None:
+        super().__init__()
+
+        self.name = name
+        self.column = column  # index of the column in the table
+        self.kind = kind
+        self.root = root  # first block of the index structure, 0 if it is empty
+        self.unique = unique or primary
+        self.primary = primary
+
+    def flags(self) -> int:
+        return (UNIQUE if self.unique else 0) | (PRIMARY if self.primary else 0)
+
 
 class Descriptor:
     """
@@ -32,14 +71,26 @@ class Descriptor:
     >>> d.name = Identifier('employer')
     >>> d.save().ok()
     Descriptor object should not be stored apart from table.
+
+    Frequent changes (record counter, page pointers) are only kept in memory and marked dirty,
+    they reach the storage on `flush`.  `DBFile.flush` hands data pages over to the storage
+    before descriptors, so a descriptor on disk never counts records or points to pages
+    which have not been written yet.  Pages allocated after the last flush are leaked on crash.
+
+    Slots of deleted records form a singly linked free list: tombstone mark is followed by
+    the id of the next free slot.  Descriptor stores the head of the list right before the pointers.
+
+    Index definitions follow the columns: name, zero byte, column number, kind, flags and root pointer each.
     """
 
     N_POINTERS = DIRECT_POINTERS + 3
+    # offset of the free list head, followed by pointers and number of records
+    FREE_OFFSET = BLOCK_SIZE - POINTER_SIZE * (N_POINTERS + 2)
 
-    __slots__ = ['table', 'block', 'name', 'pointers', 'records', 'columns']
+    __slots__ = ['table', 'block', 'name', 'pointers', 'records', 'columns', 'indexes', 'free', 'dirty']
 
     def __init__(self, table: 'Table', block: Block, table_name: Identifier, pointers: List[int], records: int,
-                 columns: List[ColumnDef]) -> None:
+                 columns: List[ColumnDef], free: int = -1, indexes: List[IndexDef] = None) -> None:
         super().__init__()
         assert len(pointers) == Descriptor.N_POINTERS
 
@@ -49,6 +100,9 @@ class Descriptor:
         self.pointers = pointers
         self.records = records
         self.columns = columns
+        self.indexes: List[IndexDef] = indexes if indexes is not None else []
+        self.free = free  # first free slot or -1
+        self.dirty = False
 
     @classmethod
     def empty(cls, table: 'Table') -> 'Descriptor':
@@ -71,9 +125,11 @@ class Descriptor:
             table_name = Identifier((block.split(b'\0')[0]).decode("UTF-8"), True)
             pointers = [get_pointer(block, i) for i in range(Descriptor.N_POINTERS)]
             records = int.from_bytes(block[BLOCK_SIZE - POINTER_SIZE:], byteorder=BYTEORDER)
+            # stored off by one, so that zeroed block means empty list
+            free = int.from_bytes(block[Descriptor.FREE_OFFSET:base], byteorder=BYTEORDER) - 1
             columns: List[ColumnDef] = []
 
-            column_descriptors = block[block.find(b'\0') + 1: base]
+            column_descriptors = block[block.find(b'\0') + 1: Descriptor.FREE_OFFSET]
 
             i = 0
             while column_descriptors[i] != 0:
@@ -81,10 +137,24 @@ class Descriptor:
                 name = column_descriptors[i:null].decode("UTF-8")
                 ty = Ty.decode(column_descriptors[null + 1: null + 3])
 
-                columns.append(ColumnDef(Identifier(name), ty, False))  # TODO: primary key
+                columns.append(ColumnDef(Identifier(name), ty, False))  # primary key is restored from indexes
                 i = null + 3
 
-            return Descriptor(table, block, table_name, pointers, records, columns)
+            indexes: List[IndexDef] = []
+            i += 1
+            while column_descriptors[i] != 0:
+                null = column_descriptors.find(b'\0', i)
+                name = column_descriptors[i:null].decode("UTF-8")
+                column = column_descriptors[null + 1]
+                kind = bytes(column_descriptors[null + 2:null + 3])
+                flags = column_descriptors[null + 3]
+                root = int.from_bytes(column_descriptors[null + 4:null + 4 + POINTER_SIZE], byteorder=BYTEORDER)
+
+                indexes.append(IndexDef(Identifier(name), column, kind, root, bool(flags & UNIQUE), bool(flags & PRIMARY)))
+                if flags & PRIMARY: columns[column].is_primary_key = True
+                i = null + 4 + POINTER_SIZE
+
+            return Descriptor(table, block, table_name, pointers, records, columns, free, indexes)
 
     def save(self) -> Result[None, str]:
         if self.table.descriptor() is not self: return Err('Descriptor is outdated')
@@ -104,8 +174,24 @@ class Descriptor:
             block.override(i, col.ty.encode())
             i += 2  # column type must be 2 bytes long
 
-        # leave enough room for Descriptor pointers and number of records
-        i = BLOCK_SIZE - POINTER_SIZE * (Descriptor.N_POINTERS + 1)
+        block.override(i, b'\0')
+        i += 1
+
+        for index in self.indexes:
+            data = index.name.identifier.encode('UTF-8')
+            block.override(i, data + b'\0' + bytes([index.column]) + index.kind + bytes([index.flags()]))
+            i += len(data) + 4
+            block.override(i, index.root.to_bytes(POINTER_SIZE, byteorder=BYTEORDER))
+            i += POINTER_SIZE
+
+        if i >= Descriptor.FREE_OFFSET: return Err('Table descriptor is full')
+        block.override(i, b'\0')
+
+        # leave enough room for free list head, Descriptor pointers and number of records
+        i = Descriptor.FREE_OFFSET
+
+        block.override(i, (self.free + 1).to_bytes(POINTER_SIZE, byteorder=BYTEORDER))
+        i += POINTER_SIZE
 
         for pointer in self.pointers:
             block.override(i, pointer.to_bytes(POINTER_SIZE, byteorder=BYTEORDER))
@@ -114,20 +200,52 @@ class Descriptor:
         block.override(i, self.records.to_bytes(POINTER_SIZE, byteorder=BYTEORDER))
 
         self.table.storage.write_block(block)
+        self.dirty = False
         return Ok(None)
 
+    def mark_dirty(self) -> None:
+        """
+        Defer saving until the next `flush`.
+        """
+        self.dirty = True
+
+    def flush(self) -> Result[None, str]:
+        if not self.dirty: return Ok(None)
+        return self.save()
+
 
 class Table:
-    def __init__(self, storage: BlockStorage, index: int) -> None:
+    def __init__(self, storage: BlockStorage, index: int, slot_policy: str = REUSE) -> None:
+        if slot_policy not in (APPEND, REUSE): raise ValueError(f'Unknown slot policy: {slot_policy}')
+
         self.storage = storage
         self.index = index
+        self.slot_policy = slot_policy
         self._descriptor: Optional[Descriptor] = None
+        # page (virtual) index -> physical block index, filled lazily
+        self._pages: Dict[int, int] = {}
+        self._codec: Optional[RecordCodec] = None
 
     def descriptor(self) -> Descriptor:
         if self._descriptor is None:
             self._descriptor = Descriptor.decode(self)
         return self._descriptor
 
+    def reload(self) -> None:
+        """
+        Forget everything cached about the table, e.g. after rollback.
+        """
+        self._descriptor = None
+        self._pages.clear()
+        self._codec = None
+
+    def flush(self) -> None:
+        """
+        Save descriptor if it has pending changes.
+        """
+        if self._descriptor is not None:
+            self._descriptor.flush().ok()
+
     def get_table_name(self) -> Identifier:
         return self.descriptor().name
 
@@ -146,12 +264,158 @@ class Table:
     #     return self.count_records() * self.record_size // BLOCK_SIZE
 
     def add_column(self, column: ColumnDef):
+        """
+        Primary key column gets a unique B+tree index, which grows with the data,
+        or a hash index if the column is too wide for the tree.
+        """
         assert self.count_records() == 0, 'Adding column to non-empty table'
 
         descriptor = self.descriptor()
         descriptor.columns.append(column)
         descriptor.save().ok()
 
+        self._codec = None
+
+        if column.is_primary_key:
+            name = Identifier(f'{self.get_table_name().identifier}_primary_key')
+            column_index = len(descriptor.columns) - 1
+            if not self.create_index(name, column_index, 'btree', primary=True):
+                self.create_index(name, column_index, primary=True).ok()
+
+    def codec(self) -> RecordCodec:
+        """
+        Compiled record layout for the current set of columns.
+        """
+        if self._codec is None:
+            self._codec = RecordCodec(self.get_columns())
+        return self._codec
+
+    ###########
+    # Indexes #
+    ###########
+
+    def get_indexes(self) -> List[IndexDef]:
+        return self.descriptor().indexes
+
+    def find_index(self, column: int, kind: Optional[str] = None) -> Optional[IndexDef]:
+        """
+        Any index on the column, or only of the given kind ('hash' or 'btree').
+        """
+        for definition in self.get_indexes():
+            if definition.column == column and (kind is None or definition.kind == INDEX_KINDS[kind]):
+                return definition
+        return None
+
+    def open_index(self, definition: IndexDef) -> Union[HashIndex, BTreeIndex]:
+        if definition.kind == BTREE:
+            return BTreeIndex(self.storage, self.get_columns()[definition.column].ty, definition.root)
+        return HashIndex(self.storage, definition.root)
+
+    def create_index(self, name: Identifier, column: int, kind: str = 'hash',
+                     unique: bool = False, primary: bool = False) -> Result[None, str]:
+        """
+        Build an index of the given kind ('hash' or 'btree') on the column from existing records.
+        """
+        assert 0 <= column < len(self.get_columns())
+        if kind not in INDEX_KINDS: return Err(f'Unknown index type: {kind}')
+
+        definition = IndexDef(name, column, INDEX_KINDS[kind], 0, unique, primary)
+        index = self.open_index(definition)
+        if isinstance(index, BTreeIndex) and not index.fits():
+            return Err(f'Column {self.get_columns()[column].name} is too wide for btree index')
+        index.insert_many((row[column], record) for record, row in self.scan())
+        definition.root = index.root
+
+        descriptor = self.descriptor()
+        descriptor.indexes.append(definition)
+        res = descriptor.save()
+        if not res:
+            descriptor.indexes.pop()
+            for block in list(index.blocks()):
+                self.storage.release_block(block)
+            return Err(res.err())
+
+        return Ok(None)
+
+    def lookup(self, definition: IndexDef, value: DB_TYPE) -> Iterator[Tuple[int, ROW_TYPE]]:
+        """
+        Alive records whose indexed column is equal to the value.
+
+        :return: Generator of (record id, row) pairs in the order of record ids.
+        """
+        column = definition.column
+        for record in sorted(set(self.open_index(definition).lookup(value))):
+            res = self.select(record)
+            if res and res.ok()[column] == value:
+                yield record, res.ok()
+
+    def scan_range(self, definition: IndexDef,
+                   low: Optional[DB_TYPE] = None, low_inclusive: bool = True,
+                   high: Optional[DB_TYPE] = None, high_inclusive: bool = True) -> Iterator[Tuple[int, ROW_TYPE]]:
+        """
+        Alive records whose indexed column is within the bounds.  Requires btree index.
+
+        :return: Generator of (record id, row) pairs in the order of keys.
+        """
+        index = self.open_index(definition)
+        assert isinstance(index, BTreeIndex)
+
+        for record in index.scan(low, low_inclusive, high, high_inclusive):
+            res = self.select(record)
+            if res: yield record, res.ok()
+
+    def _check_unique(self, row: ROW_TYPE, record_num: int = -1) -> Result[None, str]:
+        """
+        Look up values of unique columns through their indexes.
+
+        :param row: Stored form of the new row.
+        :param record_num: Record which is being overwritten, if any.
+        """
+        for definition in self.get_indexes():
+            if not definition.unique: continue
+
+            value = row[definition.column]
+            for record, _ in self.lookup(definition, value):
+                if record != record_num:
+                    column = self.get_columns()[definition.column].name
+                    return Err(f'Duplicate value in unique column {column}: {value!r}')
+
+        return Ok(None)
+
+    def _stored(self, values: ROW_TYPE) -> ROW_TYPE:
+        """
+        Values as they are read back: floats lose precision, strings are cut to column width.
+        Indexes must see exactly the same keys on insert and delete.
+        """
+        return self.codec().decode(self.codec().encode(values)).ok()
+
+    def _index_many(self, entries: List[Tuple[int, ROW_TYPE]]) -> None:
+        if not self.get_indexes(): return
+
+        entries = [(record, self._stored(row)) for record, row in entries]
+        for definition in self.get_indexes():
+            index = self.open_index(definition)
+            index.insert_many((row[definition.column], record) for record, row in entries)
+            self._save_root(definition, index)
+
+    def _reindex(self, record: int, old: Optional[ROW_TYPE], new: Optional[ROW_TYPE]) -> None:
+        """
+        Replace index entries of the record: old row is gone, new row is in place.
+        """
+        for definition in self.get_indexes():
+            column = definition.column
+            if old is not None and new is not None and old[column] == new[column]: continue
+
+            index = self.open_index(definition)
+            if old is not None: index.delete(old[column], record)
+            if new is not None: index.insert(new[column], record)
+            self._save_root(definition, index)
+
+    def _save_root(self, definition: IndexDef, index: Union[HashIndex, BTreeIndex]) -> None:
+        if definition.root != index.root:
+            definition.root = index.root
+            self.descriptor().mark_dirty()
+
     ###################
     # Page management #
     ###################
@@ -172,7 +436,23 @@ class Table:
 
         return self.storage.read_block(pointer)
 
+    def view_page(self, index: int, sequential: bool = False) -> memoryview:
+        """
+        Read-only counterpart of `get_or_allocate_page` which avoids copying when storage permits.
+
+        :param sequential: Page is read by a full scan, so it should not push other blocks out of the cache.
+        """
+        pointer = self._get_page_pointer(index)
+        if pointer == 0:
+            return memoryview(self.get_or_allocate_page(index))
+
+        if sequential: return self.storage.scan_block(pointer)
+        return self.storage.view_block(pointer)
+
     def _get_page_pointer(self, index: int) -> int:
+        pointer = self._pages.get(index)
+        if pointer is not None: return pointer
+
         if 0 <= index < LVL0:
             # zero level block
             pointer = self._get_lvl0(index)
@@ -189,37 +469,44 @@ class Table:
             # invalid / overflow
             pointer = 0
 
+        if pointer != 0: self._pages[index] = pointer
         return pointer
 
-    def _allocate_page(self, index: int) -> None:
+    def _allocate_page(self, index: int, lvl0: int = 0) -> None:
+        """
+        Allocate data block for the page, unless it is already given in `lvl0`, and link it into pointers tree.
+        """
         assert self._get_page_pointer(index) == 0
 
         if 0 <= index < LVL0:
             # zero level block
-            self._allocate_lvl0(index)
+            self._allocate_lvl0(index, lvl0)
         elif LVL0 <= index < LVL1:
             # 1 level block
-            self._allocate_lvl1(index)
+            self._allocate_lvl1(index, lvl0)
         elif LVL1 <= index < LVL2:
             # 2 level block
-            self._allocate_lvl2(index)
+            self._allocate_lvl2(index, lvl0)
         elif LVL2 <= index < LVL3:
             # 3 level block
-            self._allocate_lvl3(index)
+            self._allocate_lvl3(index, lvl0)
 
-    def _allocate_lvl0(self, index: int) -> None:
+    def _allocate_lvl0(self, index: int, lvl0: int = 0) -> None:
         assert 0 <= index < LVL0
         assert 0 == self._get_lvl0(index)
 
-        lvl0 = self.storage.allocate_block().idx
+        if lvl0 == 0: lvl0 = self.storage.allocate_block().idx
 
         descriptor = self.descriptor()
         descriptor.pointers[index] = lvl0
-        descriptor.save().ok()
+        descriptor.mark_dirty()
+
+        self._pages[index] = lvl0
 
-    def _allocate_lvl1(self, index: int) -> None:
+    def _allocate_lvl1(self, index: int, lvl0: int = 0) -> None:
         assert LVL0 <= index < LVL1
         assert 0 == self._get_lvl1(index)
+        page = index
         index -= LVL0
         descriptor = self.descriptor()
 
@@ -227,13 +514,14 @@ class Table:
         if lvl1 == 0:
             lvl1 = self.storage.allocate_block().idx
             descriptor.pointers[DIRECT_POINTERS] = lvl1
-            descriptor.save()
+            descriptor.mark_dirty()
 
-        self._allocate_last_mile(lvl1, index)
+        self._allocate_last_mile(lvl1, index, page, lvl0)
 
-    def _allocate_lvl2(self, index: int) -> None:
+    def _allocate_lvl2(self, index: int, lvl0: int = 0) -> None:
         assert LVL1 <= index < LVL2
         assert 0 == self._get_lvl2(index)
+        page = index
         index -= LVL1
         descriptor = self.descriptor()
 
@@ -241,7 +529,7 @@ class Table:
         if lvl2 == 0:
             lvl2 = self.storage.allocate_block().idx
             descriptor.pointers[DIRECT_POINTERS + 1] = lvl2
-            descriptor.save()
+            descriptor.mark_dirty()
 
         block = self.storage.read_block(lvl2)
         lvl1 = block.get_pointer(index // POINTERS_PER_LVL1)
@@ -250,11 +538,12 @@ class Table:
             block.set_pointer(index // POINTERS_PER_LVL1, lvl1)
             self.storage.write_block(block)
 
-        self._allocate_last_mile(lvl1, index)
+        self._allocate_last_mile(lvl1, index, page, lvl0)
 
-    def _allocate_lvl3(self, index: int) -> None:
+    def _allocate_lvl3(self, index: int, lvl0: int = 0) -> None:
         assert LVL2 <= index < LVL3
         assert 0 == self._get_lvl3(index)
+        page = index
         index -= LVL2
         descriptor = self.descriptor()
 
@@ -262,7 +551,7 @@ class Table:
         if lvl3 == 0:
             lvl3 = self.storage.allocate_block().idx
             descriptor.pointers[DIRECT_POINTERS + 2] = lvl3
-            descriptor.save()
+            descriptor.mark_dirty()
 
         block = self.storage.read_block(lvl3)
         lvl2 = block.get_pointer(index // POINTERS_PER_LVL2)
@@ -278,14 +567,16 @@ class Table:
             block.set_pointer(index // POINTERS_PER_LVL1, lvl1)
             self.storage.write_block(block)
 
-        self._allocate_last_mile(lvl1, index)
+        self._allocate_last_mile(lvl1, index, page, lvl0)
 
-    def _allocate_last_mile(self, pointer: int, index: int) -> None:
-        lvl0 = self.storage.allocate_block().idx
+    def _allocate_last_mile(self, pointer: int, index: int, page: int, lvl0: int = 0) -> None:
+        if lvl0 == 0: lvl0 = self.storage.allocate_block().idx
         block = self.storage.read_block(pointer)
         block.set_pointer(index % POINTERS_PER_LVL1, lvl0)
         self.storage.write_block(block)
 
+        self._pages[page] = lvl0
+
     def _get_lvl0(self, index: int) -> int:
         assert 0 <= index < LVL0
 
@@ -348,9 +639,38 @@ class Table:
         descriptor = self.descriptor()
         rc = descriptor.records
         descriptor.records += 1
-        descriptor.save().ok()
+        descriptor.mark_dirty()
         return rc
 
+    def _reuses_slots(self) -> bool:
+        # tombstone must have enough room for the link to the next free slot
+        return self.slot_policy == REUSE and self.record_size >= 1 + POINTER_SIZE
+
+    def _is_alive(self, record_num: int) -> bool:
+        page, offset = self.page_and_offset(record_num)
+        return self._read(page, offset, 1) == ALIVE
+
+    def _pop_free_slot(self) -> int:
+        """
+        :return: id of a free slot taken from the free list, or -1 if there is none.
+        """
+        descriptor = self.descriptor()
+        slot = descriptor.free
+        if slot == -1 or not self._reuses_slots(): return -1
+
+        page, offset = self.page_and_offset(slot)
+        tombstone = self._read(page, offset, 1 + POINTER_SIZE)
+
+        if tombstone[:1] != DEAD or slot >= self.count_records():
+            # list is broken, e.g. by a crash between data page and descriptor writes. forget about it.
+            descriptor.free = -1
+            descriptor.mark_dirty()
+            return -1
+
+        descriptor.free = int.from_bytes(tombstone[1:], byteorder=BYTEORDER) - 1
+        descriptor.mark_dirty()
+        return slot
+
     def page_and_offset(self, record: int) -> (int, int):
         record_offset = self.record_size * record
         page = record_offset // BLOCK_SIZE
@@ -372,7 +692,7 @@ class Table:
 
         # first page
 
-        block = self.get_or_allocate_page(page)
+        block = self.view_page(page)
         chunk = block[offset:min(offset + n, BLOCK_SIZE)]
         record.extend(chunk)
 
@@ -380,15 +700,15 @@ class Table:
 
         first = len(chunk)
         i = 1
-        while first + (i + 1) * BLOCK_SIZE <= n:
-            block = self.get_or_allocate_page(page + i)
+        while first + i * BLOCK_SIZE <= n:
+            block = self.view_page(page + i)
             record.extend(block)
             i += 1
 
         # last, beginning of the page
 
         if len(record) < n:
-            block = self.get_or_allocate_page(page + i)
+            block = self.view_page(page + i)
             chunk = block[:n - len(record)]
             record.extend(chunk)
 
@@ -447,12 +767,101 @@ class Table:
         if record_num > self.count_records():
             return Err('record_num({}) > #records({})'.format(record_num, self.count_records()))
 
+        stored = old = None
+        if self.get_indexes():
+            stored = self._decode_record(record).ok()
+            res = self._check_unique(stored, record_num)
+            if not res: return Err(res.err())
+
+            if record_num != -1: old = self.select(record_num).ok_or(None)
+
+        if record_num == -1: record_num = self._pop_free_slot()
         if record_num == -1: record_num = self._increment_record_counter()
 
         self._write_record(record, record_num)
+        if stored is not None: self._reindex(record_num, old, stored)
 
         return Ok(record_num)
 
+    def insert_many(self, rows: List[ROW_TYPE]) -> Result[List[int], str]:
+        """
+        Insert a batch of records.  Either all rows are inserted, or none of them.
+
+        Free slots are filled first, the rest is appended.
+        Missing pages are allocated as one contiguous extent, and each page is written exactly once.
+
+        :return: Ok(record ids) or Err(error description)
+        """
+        for i, values in enumerate(rows):
+            res = self._validate_insert_values(values)
+            if not res: return Err(f'row #{i}: {res.err()}')
+
+        unique = [definition for definition in self.get_indexes() if definition.unique]
+        if unique:
+            # against existing records, and within the batch
+            seen: List[Set[DB_TYPE]] = [set() for _ in unique]
+            for i, values in enumerate(rows):
+                stored = self._stored(values)
+                res = self._check_unique(stored)
+                if not res: return Err(f'row #{i}: {res.err()}')
+
+                for definition, batch in zip(unique, seen):
+                    value = stored[definition.column]
+                    if value in batch:
+                        column = self.get_columns()[definition.column].name
+                        return Err(f'row #{i}: Duplicate value in unique column {column}: {value!r}')
+                    batch.add(value)
+
+        # fill holes first
+        ids: List[int] = []
+        while len(ids) < len(rows):
+            slot = self._pop_free_slot()
+            if slot == -1: break
+            self._write_record(self._encode_record(rows[len(ids)]), slot)
+            ids.append(slot)
+
+        if ids: self._index_many(list(zip(ids, rows)))
+
+        rows = rows[len(ids):]
+        if not rows: return Ok(ids)
+
+        codec = self.codec()
+        data = b''.join(codec.encode(values) for values in rows)
+
+        first = self.count_records()
+        start = first * codec.size
+        end = start + len(data)
+        first_page = start // BLOCK_SIZE
+        last_page = (end - 1) // BLOCK_SIZE
+
+        # allocate
+        missing = [page for page in range(first_page, last_page + 1) if self._get_page_pointer(page) == 0]
+        if missing:
+            pointer = self.storage.allocate_blocks(len(missing))
+            for i, page in enumerate(missing):
+                self._allocate_page(page, pointer + i)
+
+        # write
+        for page in range(first_page, last_page + 1):
+            lo = max(start, page * BLOCK_SIZE)
+            hi = min(end, (page + 1) * BLOCK_SIZE)
+            chunk = data[lo - start:hi - start]
+
+            if len(chunk) == BLOCK_SIZE:
+                block = Block(chunk, self._get_page_pointer(page))
+            else:
+                block = self.get_or_allocate_page(page)
+                block.override(lo - page * BLOCK_SIZE, chunk)
+            self.storage.write_block(block)
+
+        descriptor = self.descriptor()
+        descriptor.records += len(rows)
+        descriptor.mark_dirty()
+
+        self._index_many(list(zip(range(first, first + len(rows)), rows)))
+
+        return Ok(ids + list(range(first, first + len(rows))))
+
     def select(self, record_num: int) -> Result[ROW_TYPE, str]:
         if record_num >= self.count_records():
             return Err('record_num({}) >= #records({})'.format(record_num, self.count_records()))
@@ -465,20 +874,171 @@ class Table:
 
         return Ok(row)
 
+    def scan(self, columns: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, ROW_TYPE]]:
+        """
+        Sequentially read all alive records, page by page.
+
+        Each page is fetched once and every record on it is decoded in one pass.
+        Records which cross page boundary are glued together from consecutive pages.
+        Dead and malformed records are silently skipped.
+
+        :param columns: Indices of columns to decode, others are None.  All columns by default.
+        :return: Generator of (record id, row) pairs in the order of record ids.
+        """
+        n = self.count_records()
+        codec = self.codec() if columns is None else self.codec().partial(columns)
+        size = codec.size
+
+        record = 0
+        page = 0
+        carry = bytearray()  # head of the record which begins on previous page(s)
+
+        while record < n:
+            view = self.view_page(page, sequential=True)
+            page += 1
+            offset = 0
+
+            if carry:
+                need = size - len(carry)
+                if need > BLOCK_SIZE:
+                    carry.extend(view)
+                    continue
+
+                carry.extend(view[:need])
+                row = codec.decode_from(carry)
+                if row is not None: yield record, row
+                record += 1
+                offset = need
+                carry = bytearray()
+
+            # all records which fit entirely on this page at once
+            count = min(n - record, (BLOCK_SIZE - offset) // size)
+            if count > 0:
+                yield from codec.decode_many(view[offset:offset + count * size], record)
+                record += count
+                offset += count * size
+
+            if record < n and offset < BLOCK_SIZE:
+                carry.extend(view[offset:])
+
     def delete(self, record_num: int) -> Result[None, str]:
         if record_num >= self.count_records():
             return Err('record_num({}) >= #records({})'.format(record_num, self.count_records()))
 
+        if not self._is_alive(record_num): return Ok(None)
+
+        if self.get_indexes():
+            old = self.select(record_num)
+            if old: self._reindex(record_num, old.ok(), None)
+
         page, offset = self.page_and_offset(record_num)
 
-        self._write(page, offset, b'd')
+        if self._reuses_slots():
+            descriptor = self.descriptor()
+            link = (descriptor.free + 1).to_bytes(POINTER_SIZE, byteorder=BYTEORDER)
+            self._write(page, offset, DEAD + link)
+            descriptor.free = record_num
+            descriptor.mark_dirty()
+
+        else:
+            self._write(page, offset, DEAD)
 
         return Ok(None)
 
     def update(self, values: ROW_TYPE, index: int) -> Result[int, str]:
+        if index >= self.count_records() or not self._is_alive(index): return Err('Record is dead')
+
         return self.insert(values, index)
 
+    def update_many(self, rows: List[Tuple[int, ROW_TYPE]]) -> Result[int, str]:
+        """
+        Overwrite a batch of records.  Either all rows are updated, or none of them.
+
+        Unique columns are checked against the state after the whole batch,
+        so values may move between updated records, e.g. `id = id + 1`.
+
+        :param rows: Pairs of (record id, new values), every record at most once.
+        :return: Ok(number of updated records) or Err(error description)
+        """
+        for i, (record, values) in enumerate(rows):
+            if record >= self.count_records() or not self._is_alive(record): return Err(f'row #{i}: Record is dead')
+            res = self._validate_insert_values(values)
+            if not res: return Err(f'row #{i}: {res.err()}')
+
+        if not self.get_indexes():
+            for record, values in rows:
+                self._write_record(self._encode_record(values), record)
+            return Ok(len(rows))
+
+        updated = {record for record, _ in rows}
+        assert len(updated) == len(rows), 'Record is updated twice'
+        stored = [self._stored(values) for _, values in rows]
+
+        unique = [definition for definition in self.get_indexes() if definition.unique]
+        seen: List[Set[DB_TYPE]] = [set() for _ in unique]
+        for i, row in enumerate(stored):
+            for definition, batch in zip(unique, seen):
+                value = row[definition.column]
+                # records outside of the batch keep their values
+                if value in batch or any(record not in updated for record, _ in self.lookup(definition, value)):
+                    column = self.get_columns()[definition.column].name
+                    return Err(f'row #{i}: Duplicate value in unique column {column}: {value!r}')
+                batch.add(value)
+
+        for (record, values), new in zip(rows, stored):
+            old = self.select(record).ok()
+            self._write_record(self._encode_record(values), record)
+            self._reindex(record, old, new)
+
+        return Ok(len(rows))
+
+    def reset_pages(self) -> None:
+        """
+        Forget about all pages, records and index entries, but keep the schema.  Blocks are not released.
+        """
+        descriptor = self.descriptor()
+        descriptor.pointers = [0] * Descriptor.N_POINTERS
+        descriptor.records = 0
+        descriptor.free = -1
+        for definition in descriptor.indexes:
+            definition.root = 0
+        descriptor.mark_dirty()
+        self._pages.clear()
+
+    def blocks(self) -> Iterator[int]:
+        """
+        Physical indices of all data pages, indirect pointer blocks and index blocks of this table.
+        """
+        pointers = self.descriptor().pointers
+
+        for pointer in pointers[:DIRECT_POINTERS]:
+            if pointer != 0: yield pointer
+
+        for depth, pointer in enumerate(pointers[DIRECT_POINTERS:], 1):
+            yield from self._tree_blocks(pointer, depth)
+
+        for definition in self.get_indexes():
+            yield from self.open_index(definition).blocks()
+
+    def _tree_blocks(self, pointer: int, depth: int) -> Iterator[int]:
+        if pointer == 0: return
+        yield pointer
+        if depth == 0: return
+
+        block = self.storage.read_block(pointer)
+        children = [block.get_pointer(i) for i in range(POINTERS_PER_BLOCK)]
+        for child in children:
+            yield from self._tree_blocks(child, depth - 1)
+
     def drop(self) -> None:
+        """
+        Reset the descriptor and give all the blocks back to the storage.
+        """
+        for block in list(self.blocks()):
+            self.storage.release_block(block)
+
+        self._pages.clear()
+        self._codec = None
         self._descriptor = Descriptor.empty(self)
         self._descriptor.save().ok()
 
@@ -502,54 +1062,15 @@ class Table:
 
         return Ok(None)
 
-    def _calculate_record_size(self) -> int:
-        return struct.calcsize(self._struct_format_string())
-
     @property
     def record_size(self) -> int:
-        return self._calculate_record_size()
-
-    def _struct_format_string(self) -> str:
-        fmt = 'c' + ''.join(column.ty.struct_format_string()
-                            for column in self.get_columns())
-        return fmt
+        return self.codec().size
 
     def _decode_record(self, binary: bytes) -> Result[ROW_TYPE, str]:
-        try:
-            data = struct.unpack(self._struct_format_string(), binary)
-        except struct.error as e:
-            return Err(str(e))
+        return self.codec().decode(binary)
 
-        if data[0] == b'd': return Err('Record is dead')
-        if data[0] != b'a': return Err('Incorrect record: {}'.format(data))
-
-        if len(data) - 1 != len(self.get_columns()):
-            return Err('record({}) != #columns({})'.format(len(data) - 1, len(self.get_columns())))
-
-        r = bytes_to_str(list(data[1:]))
-        if not r: return Err(r.err())
-        return Ok(r.ok())
-
-    def _encode_record(self, values: ROW_TYPE):
+    def _encode_record(self, values: ROW_TYPE) -> bytes:
         """
         Assume that value types correspond to column types.
         """
-        t: List[RAW_TYPE] = [b'a']  # alive FIXME
-        for v in values:
-            if isinstance(v, str):
-                t.append(v.encode("UTF-8"))
-            else:
-                t.append(v)
-        return struct.pack(self._struct_format_string(), *t)
-
-
-def bytes_to_str(row: ROW_TYPE) -> Result[ROW_TYPE, str]:
-    """ Convert bytes back to utf-8 str. """
-    for i in range(len(row)):
-        value = row[i]
-        if isinstance(value, bytes):
-            try:
-                row[i] = value.split(b'\0')[0].decode("UTF-8")
-            except UnicodeDecodeError as e:
-                return Err(str(e))
-    return Ok(row)
+        return self.codec().encode(values)
@@ -0,0 +1,22 @@
+__all__ = ['Transaction']
+
+
+class Transaction:
+    """
+    Explicit transaction of a database file.
+
+    Changes are kept in the buffer pool, which does not write dirty blocks down meanwhile (no-steal),
+    or, with write-ahead log, in uncommitted part of the log.  Commit makes them durable at once,
+    rollback throws them away and restores the size of the file.
+
+    Transaction in which a statement has failed is aborted: it may only be rolled back.
+    """
+
+    __slots__ = ['blocks', 'aborted']
+
+    def __init__(self, blocks: int) -> None:
+        super().__init__()
+
+        # number of blocks at the beginning
+        self.blocks = blocks
+        self.aborted = False
@@ -0,0 +1,333 @@
+import os
+import struct
+import time
+import zlib
+from typing import *
+
+from .block import Block, BLOCK_SIZE
+from .block_storage import BlockStorage
+
+__all__ = [
+    'CHECKPOINT_FRAMES',
+    'FULL',
+    'GROUP',
+    'OFF',
+    'WAL_SUFFIX',
+    'WriteAheadLog',
+]
+
+# sync policies
+FULL = 'full'  # fsync the log on every commit
+GROUP = 'group'  # fsync once for a group of commits, see GROUP_INTERVAL for the window of possible loss
+OFF = 'off'  # leave it to the operating system
+
+# group commit: fsync after that many commits, or when the oldest unsynced commit is that old (seconds).
+# Age is checked on every commit of the database file, even an empty one, i.e. at every statement boundary,
+# so an acknowledged commit is durable after GROUP_INTERVAL or by the next statement, whichever comes later.
+GROUP_COMMITS = 16
+GROUP_INTERVAL = 0.1
+
+# log is copied back into the main file once it grows beyond that many block images
+CHECKPOINT_FRAMES = 1024
+
+WAL_SUFFIX = '-wal'
+
+MAGIC = b'dropWAL\0'
+LOG_HEADER = struct.Struct('>8sI')  # magic, salt
+FRAME_FIELDS = struct.Struct('>cII')  # kind, value, salt
+CHECKSUM = struct.Struct('>I')
+FRAME_HEADER_SIZE = FRAME_FIELDS.size + CHECKSUM.size
+
+# frame kinds
+BLOCK_FRAME = b'B'  # value is block index, followed by block image
+TRUNCATE_FRAME = b'T'  # value is new number of blocks
+COMMIT_FRAME = b'C'  # value is number of blocks
+ABORT_FRAME = b'A'  # value is number of blocks as of the last commit
+
+
+class WriteAheadLog(BlockStorage):
+    """
+    Redo log of block images between buffer pool and the main storage.
+
+    Written blocks are appended to a side log instead of being overwritten in place.
+    `commit` seals everything logged so far: after a crash, log is replayed up to the last
+    commit record, and whatever follows it is thrown away, so a statement is applied entirely or not at all.
+    `abort` throws away everything logged since the last commit right away.
+
+    Every frame carries the salt of the log generation and a CRC32 checksum; replay stops at the first torn frame.
+    Checkpoint copies the latest images into the main storage in block order, syncs it and starts a new log.
+    The log is replayed and checkpointed when opened, and removed on `close`.
+    """
+
+    def __init__(self, storage: BlockStorage, path: str, sync: str = GROUP,
+                 checkpoint_frames: int = CHECKPOINT_FRAMES) -> None:
+        super().__init__()
+        if sync not in (FULL, GROUP, OFF): raise ValueError(f'Unknown sync policy: {sync}')
+
+        self.storage = storage
+        self.path = path
+        self.sync_policy = sync
+        self.checkpoint_frames = checkpoint_frames
+
+        # block index -> offset of its latest image in the log
+        self.frames: Dict[int, int] = {}
+        # logical number of blocks
+        self.blocks = storage.count_blocks()
+        # blocks starting from this index have been truncated since the last checkpoint and read as zeroes
+        self.low = self.blocks
+        # number of block images in the log
+        self.logged = 0
+        # anything logged since the last commit
+        self.changed = False
+        # previous offsets of blocks logged since the last commit
+        self.undo: Dict[int, Optional[int]] = {}
+        # number of blocks and low as of the last commit
+        self.committed = (self.blocks, self.low)
+
+        self.unsynced = 0
+        self.unsynced_since = 0.0
+
+        if not os.path.exists(path):
+            # touch file
+            with open(path, 'w'): pass
+        self.log = open(path, 'r+b')
+        self.salt = 0
+        self.end = 0
+
+        self._replay()
+        self.checkpoint()
+
+    ###############
+    # Log control #
+    ###############
+
+    def commit(self) -> None:
+        """
+        Make everything logged so far one atomic unit, and sync the log according to the policy.
+        Without changes, only a pending group of commits is synced if it is due.
+        """
+        if not self.changed:
+            if self.sync_policy == GROUP: self._sync_due()
+            return
+
+        self._append(COMMIT_FRAME, self.blocks)
+        self.changed = False
+        self.undo.clear()
+        self.committed = (self.blocks, self.low)
+
+        if self.unsynced == 0: self.unsynced_since = time.monotonic()
+        self.unsynced += 1
+
+        if self.sync_policy == FULL:
+            self.sync()
+        elif self.sync_policy == GROUP:
+            if self.unsynced >= GROUP_COMMITS: self.sync()
+            else: self._sync_due()
+        else:
+            self.log.flush()
+
+        if self.logged >= self.checkpoint_frames:
+            self.checkpoint()
+
+    def abort(self) -> None:
+        """
+        Forget everything logged since the last commit.
+        """
+        if not self.changed: return
+
+        for index, offset in self.undo.items():
+            if offset is None:
+                self.frames.pop(index, None)
+            else:
+                self.frames[index] = offset
+        self.undo.clear()
+        self.blocks, self.low = self.committed
+
+        self._append(ABORT_FRAME, self.blocks)
+        self.changed = False
+        self.log.flush()
+
+    def checkpoint(self) -> None:
+        """
+        Copy committed images into the main storage and start a new log.
+        """
+        assert not self.changed, 'Checkpoint with uncommitted changes'
+
+        storage = self.storage
+        if storage.count_blocks() > self.low:
+            storage.truncate_blocks(self.low)
+        if storage.count_blocks() < self.blocks:
+            storage.allocate_blocks(self.blocks - storage.count_blocks())
+
+        for index in sorted(self.frames):
+            storage.write_block(self._read_frame(index))
+        storage.sync()
+
+        self.frames.clear()
+        self.low = self.blocks
+        self.committed = (self.blocks, self.low)
+        self.logged = 0
+        self._reset()
+
+    ################
+    # BlockStorage #
+    ################
+
+    def read_block(self, index: int) -> Block:
+        assert index < self.blocks, f'Block {index} does not exist'
+
+        if index in self.frames:
+            return self._read_frame(index)
+        if index >= self.low:
+            return Block.empty(index)
+        return self.storage.read_block(index)
+
+    def view_block(self, index: int) -> memoryview:
+        if index in self.frames or index >= self.low:
+            return memoryview(self.read_block(index))
+
+        return self.storage.view_block(index)
+
+    def write_block(self, block: Block) -> None:
+        assert block.idx < self.blocks, f'Block {block.idx} does not exist'
+
+        self._remember(block.idx)
+        self.frames[block.idx] = self._append(BLOCK_FRAME, block.idx, block)
+        self.logged += 1
+
+    def allocate_block(self) -> Block:
+        block = Block.empty(self.blocks)
+        self.blocks += 1
+        self.changed = True
+        return block
+
+    def allocate_blocks(self, count: int) -> int:
+        assert count > 0
+        first = self.blocks
+        self.blocks += count
+        self.changed = True
+        return first
+
+    def truncate_blocks(self, count: int) -> None:
+        assert 0 <= count <= self.blocks
+
+        self._append(TRUNCATE_FRAME, count)
+        for index in [i for i in self.frames if i >= count]:
+            self._remember(index)
+            del self.frames[index]
+        self.blocks = count
+        self.low = min(self.low, count)
+
+    def count_blocks(self) -> int:
+        return self.blocks
+
+    def flush(self) -> None:
+        self.log.flush()
+
+    def sync(self) -> None:
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.unsynced = 0
+
+    def _sync_due(self) -> None:
+        if self.unsynced > 0 and time.monotonic() - self.unsynced_since >= GROUP_INTERVAL:
+            self.sync()
+
+    def close(self) -> None:
+        self.commit()
+        self.checkpoint()
+
+        self.log.close()
+        os.remove(self.path)
+        self.storage.close()
+
+    #############
+    # Internals #
+    #############
+
+    def _append(self, kind: bytes, value: int, payload: bytes = b'') -> int:
+        """
+        :return: Offset of the payload in the log.
+        """
+        fields = FRAME_FIELDS.pack(kind, value, self.salt)
+        checksum = zlib.crc32(payload, zlib.crc32(fields))
+
+        self.log.seek(self.end)
+        self.log.write(fields + CHECKSUM.pack(checksum))
+        self.log.write(payload)
+
+        offset = self.end + FRAME_HEADER_SIZE
+        self.end = offset + len(payload)
+        self.changed = True
+        return offset
+
+    def _remember(self, index: int) -> None:
+        if index not in self.undo:
+            self.undo[index] = self.frames.get(index)
+
+    def _read_frame(self, index: int) -> Block:
+        self.log.seek(self.frames[index])
+        return Block(self.log.read(BLOCK_SIZE), index)
+
+    def _reset(self) -> None:
+        """
+        Empty the log and start a new generation with a fresh salt, so that leftovers of the old one never match.
+        """
+        self.salt = int.from_bytes(os.urandom(4), byteorder='big')
+
+        self.log.seek(0)
+        self.log.truncate()
+        self.log.write(LOG_HEADER.pack(MAGIC, self.salt))
+        self.end = LOG_HEADER.size
+
+        if self.sync_policy == OFF:
+            self.log.flush()
+        else:
+            self.sync()
+
+    def _replay(self) -> None:
+        """
+        Restore committed state from the log left by a crashed session.
+        """
+        self.log.seek(0)
+        header = self.log.read(LOG_HEADER.size)
+        if len(header) < LOG_HEADER.size: return
+
+        magic, salt = LOG_HEADER.unpack(header)
+        if magic != MAGIC: return  # torn header, nothing was committed
+
+        frames: Dict[int, int] = {}
+        blocks, low, logged = self.blocks, self.low, 0
+        offset = LOG_HEADER.size
+
+        while True:
+            header = self.log.read(FRAME_HEADER_SIZE)
+            if len(header) < FRAME_HEADER_SIZE: break
+
+            kind, value, frame_salt = FRAME_FIELDS.unpack_from(header)
+            checksum, = CHECKSUM.unpack_from(header, FRAME_FIELDS.size)
+            if frame_salt != salt: break
+
+            payload = b''
+            if kind == BLOCK_FRAME:
+                payload = self.log.read(BLOCK_SIZE)
+                if len(payload) < BLOCK_SIZE: break
+
+            if zlib.crc32(payload, zlib.crc32(header[:FRAME_FIELDS.size])) != checksum: break
+
+            if kind == BLOCK_FRAME:
+                frames[value] = offset + FRAME_HEADER_SIZE
+                logged += 1
+            elif kind == TRUNCATE_FRAME:
+                for index in [i for i in frames if i >= value]:
+                    del frames[index]
+                low = min(low, value)
+            elif kind == COMMIT_FRAME:
+                blocks = value
+                self.frames, self.blocks, self.low, self.logged = dict(frames), blocks, min(low, blocks), logged
+            elif kind == ABORT_FRAME:
+                frames, blocks, low, logged = dict(self.frames), self.blocks, self.low, self.logged
+            else:
+                break
+
+            offset += FRAME_HEADER_SIZE + len(payload)
@@ -1,3 +1,4 @@
+from dropSQL.ast.create_index import INDEX
 from dropSQL.ast.stmt import *
 from dropSQL.generic import *
 from dropSQL.parser.tokens import *
@@ -22,6 +23,12 @@ class Statements(Stream[AstStmt]):
         tok = t.ok()
 
         if isinstance(tok, Create):
+            # look past the '/create' token to choose between table and index
+            self.tokens.next()
+            t = self.tokens.peek()
+            self.tokens.back()
+            if t and t.ok() == INDEX:
+                return CreateIndex.from_sql(self.tokens)
             return CreateTable.from_sql(self.tokens)
 
         if isinstance(tok, Drop):
@@ -39,4 +46,17 @@ class Statements(Stream[AstStmt]):
         if isinstance(tok, Select):
             return SelectFrom.from_sql(self.tokens)
 
-        return Err(Syntax('/create, /drop, /insert, /delete, /update or /select', str(tok)))
+        if isinstance(tok, Vacuum):
+            return VacuumDatabase.from_sql(self.tokens)
+
+        if isinstance(tok, Begin):
+            return BeginTransaction.from_sql(self.tokens)
+
+        if isinstance(tok, Commit):
+            return CommitTransaction.from_sql(self.tokens)
+
+        if isinstance(tok, Rollback):
+            return RollbackTransaction.from_sql(self.tokens)
+
+        return Err(Syntax('/create, /drop, /insert, /delete, /update, /select, /vacuum, '
+                          '/begin, /commit or /rollback', str(tok)))
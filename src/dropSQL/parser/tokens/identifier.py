@@ -20,6 +20,16 @@ class IdentifierBase(Token, metaclass=abc.ABCMeta):
         self.identifier = identifier
         self.slash = slash
 
+    @property
+    def identifier(self) -> str:
+        return self._identifier
+
+    @identifier.setter
+    def identifier(self, identifier: str) -> None:
+        self._identifier = identifier
+        # case-insensitive comparisons happen a lot, fold the case once
+        self.key = identifier.lower()
+
     def __str__(self) -> str:
         if self.slash:
             return f'/{self.identifier}'
@@ -27,10 +37,10 @@ class IdentifierBase(Token, metaclass=abc.ABCMeta):
             return f'{self.identifier}'
 
     def __eq__(self, o: object) -> bool:
-        return isinstance(o, type(self)) and self.identifier.lower() == o.identifier.lower()
+        return isinstance(o, type(self)) and self.key == o.key
 
     def __hash__(self) -> int:
-        return self.identifier.lower().__hash__()
+        return self.key.__hash__()
 
 
 class Identifier(IdentifierBase):
@@ -2,6 +2,8 @@ from .identifier import Keyword
 
 __all__ = [
     'As',
+    'Begin',
+    'Commit',
     'Create',
     'Delete',
     'Drop',
@@ -15,10 +17,12 @@ __all__ = [
     'Not',
     'On',
     'Primary',
+    'Rollback',
     'Select',
     'SetKw',
     'Table',
     'Update',
+    'Vacuum',
     'Values',
     'Where',
 ]
@@ -29,6 +33,21 @@ class As(Keyword):
         super().__init__('as', True)
 
 
+class Begin(Keyword):
+    def __init__(self) -> None:
+        super().__init__('begin', True)
+
+
+class Commit(Keyword):
+    def __init__(self) -> None:
+        super().__init__('commit', True)
+
+
+class Rollback(Keyword):
+    def __init__(self) -> None:
+        super().__init__('rollback', True)
+
+
 class Create(Keyword):
     def __init__(self) -> None:
         super().__init__('create', True)
@@ -114,6 +133,11 @@ class SetKw(Keyword):
         super().__init__('set', True)
 
 
+class Vacuum(Keyword):
+    def __init__(self) -> None:
+        super().__init__('vacuum', True)
+
+
 class Values(Keyword):
     def __init__(self) -> None:
         super().__init__('values', False)
@@ -57,7 +57,7 @@ class Repl:
             self.buffer += line
             self.buffer += '\n'
 
-            for dot in (Help, ListTables, BlockDebug):
+            for dot in (Help, ListTables, BlockDebug, CacheStats, Vacuum):
                 m = re.match(rf'\.{dot.name}\b\s*(.*)\s*', self.buffer.strip())
                 if m:
                     dot.execute(self.conn, m.group(1))
@@ -132,13 +132,18 @@ Type in commands and watch the output.
 .help       Show this help.
 .tables     Show all tables in the database.
 .block N    Show block N with `xxd`.
+.cache      Show buffer pool statistics.
+.vacuum     Compact tables and shrink the database file.
 
 /create table t(a integer, b float, c varchar(42)) /drop
+/create index t_a on t (a) /drop (or /using btree for ranges)
 /insert into t (a, c, b) values (42, 'morty', 13.37), ('', 0, .0) /drop
 /select *, a, 2 * b, c /as d from t Alias /where (a < 100) /and (c /= '') /drop
 /update t set c = 'rick', a = a + 1 /drop
 /delete from t where c > 'r' /drop
 /drop   table if exists t /drop
+/begin /drop ... /commit /drop (or /rollback /drop)
+/vacuum /drop
 """
 
 
@@ -185,6 +190,29 @@ class BlockDebug(DotCommand):
                 p.communicate(block)
 
 
+class CacheStats(DotCommand):
+    name = 'cache'
+
+    @classmethod
+    def execute(cls, conn: Connection, arg: str) -> None:
+        pool = conn.file.pool
+        stats = pool.stats
+        print(f'buffer pool: {len(pool.frames)}/{pool.capacity} blocks, {len(pool.dirty)} dirty, policy {pool.policy}')
+        print(f'hits: {stats.hits}, misses: {stats.misses}, hit ratio: {stats.hit_ratio():.2%}')
+        print(f'evictions: {stats.evictions}, write-backs: {stats.writebacks}')
+
+
+class Vacuum(DotCommand):
+    name = 'vacuum'
+
+    @classmethod
+    def execute(cls, conn: Connection, arg: str) -> None:
+        before = conn.file.count_blocks()
+        res = conn.file.vacuum()
+        if not res: return print(res.err())
+        print(f'blocks: {before} -> {conn.file.count_blocks()}, {res.ok()} bytes reclaimed')
+
+
 def try_int(x: str) -> Result[int, str]:
     try:
         return Ok(int(x))
@@ -4,6 +4,8 @@ from dropSQL.ast import *
 from dropSQL.engine.column import Column
 from dropSQL.engine.context import Context
 from dropSQL.engine.row_set import *
+from dropSQL.fs.connection import Connection
+from dropSQL.parser.streams import Tokens
 from dropSQL.parser.tokens import Operator
 
 
@@ -70,3 +72,92 @@ class ExprTestCase(TestCase):
         ctx = Context(next(it), ())
         ref = ExpressionReference(None, Identifier('height')).eval_with(ctx).ok()
         self.assertEqual(157., ref)
+
+    def test_resolve(self) -> None:
+        columns = [Column(Identifier('a'), Identifier('id'), IntegerTy()),
+                   Column(Identifier('a'), Identifier('Name'), VarCharTy(8)),
+                   Column(Identifier('b'), Identifier('id'), IntegerTy())]
+
+        self.assertEqual(ExpressionReference(None, Identifier('NAME')).resolve(columns).ok(), 1)
+        self.assertEqual(ExpressionReference(Identifier('B'), Identifier('id')).resolve(columns).ok(), 2)
+        self.assertFalse(ExpressionReference(None, Identifier('id')).resolve(columns))
+        self.assertFalse(ExpressionReference(Identifier('c'), Identifier('id')).resolve(columns))
+
+    def test_derive_type(self) -> None:
+        columns = [Column(Identifier('person'), Identifier('name'), VarCharTy(64)),
+                   Column(Identifier('person'), Identifier('age'), IntegerTy()),
+                   Column(Identifier('person'), Identifier('height'), FloatTy())]
+        args = (10, 'j', 1.5)
+
+        for source, ty in [('age', 'integer'), ('age + 1', 'integer'), ('age + height', 'float'), ('age / 2', 'float'),
+                           ('?3 * age', 'float'), ("name + 'xyz'", 'varchar(67)'), ('?2', 'varchar(1)'),
+                           ('name * 2', 'varchar(128)'), ("?1 * 'ab'", 'varchar(20)'), ("'ab' * (1 - 2)", 'varchar(0)'),
+                           ('name * age', 'varchar'), ("(name * age) + 'x'", 'varchar'),
+                           ("(name = 'x') /or (height > 2)", 'integer')]:
+            expr = Expression.from_sql(Tokens.from_str(source)).ok()
+            self.assertEqual(expr.derive_type(columns, args).ok().to_sql(), ty, source)
+
+        for source in ('name - age', "height + 'x'", '?4', 'weight'):
+            self.assertFalse(Expression.from_sql(Tokens.from_str(source)).ok().derive_type(columns, args), source)
+
+        # projection is typed without reading rows
+        class Unreadable(MockRowSet):
+            def iter(self):
+                raise AssertionError('must not be read')
+
+        outputs = ResultColumn.from_sql(Tokens.from_str('age / 2')).ok(), ResultStar()
+        rs = ProjectionRowSet(Unreadable(columns, []), list(outputs), args)
+        self.assertEqual([column.ty.to_sql() for column in rs.columns()], ['float', 'varchar(64)', 'integer', 'float'])
+
+    def test_simplify(self) -> None:
+        def simplify(source: str, *args) -> str:
+            return Expression.from_sql(Tokens.from_str(source)).ok().simplify(args).to_sql()
+
+        self.assertEqual(simplify('2 * 3'), '6')
+        self.assertEqual(simplify("'a' = 'a'"), '1')
+        self.assertEqual(simplify('(a + (2 * ?1)) - ?2', 5, 1.5), 'a + 10 - 1.500000')
+        self.assertEqual(simplify('(a > 1) /and (?1 > 2)', 3), 'a > 1')
+        self.assertEqual(simplify('(a > 1) /and (?1 > 2)', 1), '0')
+        self.assertEqual(simplify('(?1 = 2) /or (a > 1)', 2), '1')
+        self.assertEqual(simplify('(a > 1) /or 0'), 'a > 1')
+
+        # value of `a` is not necessarily 0 or 1
+        self.assertEqual(simplify('a /and 1'), 'a /and 1')
+        # errors are left for evaluation
+        self.assertEqual(simplify('(1 / 0) + ?2', 1), '1 / 0 + ?2')
+
+        # references dropped by simplification are still checked
+        conn = Connection()
+        conn.execute('/create table t(a integer) /drop')
+        conn.execute('/insert into t (a) values (1), (2), (3) /drop')
+        self.assertFalse(conn.execute('/update t /set a = 5 /where (nope = 1) /or 1 /drop'))
+        self.assertFalse(conn.execute('/update t /set a = (nope = 1) /or 1 /drop'))
+        self.assertFalse(conn.execute('/delete from t /where (nope = 1) /and 0 /drop'))
+        self.assertFalse(conn.execute('/select (nope = 1) /or 1 from t /drop'))
+        self.assertFalse(conn.execute('/select * from t /join t u /on (nope = 1) /and 0 /drop'))
+        rows = conn.execute('/select * from t /drop').ok().iter()
+        self.assertEqual([row.data for row in rows], [[1], [2], [3]])
+
+    def test_compile(self) -> None:
+        rs = MockRowSet(
+            [Column(Identifier('person'), Identifier('name'), VarCharTy(64)),
+             Column(Identifier('person'), Identifier('age'), IntegerTy())],
+            [['morty', 11], ['jimmy', 10], ['', 0]])
+        args = (10, 'j')
+
+        sources = ['age', 'person age + 1', '(age > ?1) /or (name < ?2)', '?1 = age', 'name /and (2 * (age / 2) = age)',
+                   '(age - ?1) * 3', "name /= 'jimmy'"]
+        for source in sources:
+            expr = Expression.from_sql(Tokens.from_str(source)).ok()
+            f = expr.compile(rs.columns(), args).ok()
+            for row in rs.iter():
+                self.assertEqual(f(row.data), expr.eval_with(Context(row, args)).ok(), source)
+
+        # errors known in advance
+        self.assertFalse(ExpressionReference(None, Identifier('height')).compile(rs.columns(), args))
+        self.assertFalse(ExpressionPlaceholder(3).compile(rs.columns(), args))
+
+        # errors which depend on data
+        f = Expression.from_sql(Tokens.from_str('?1 / age')).ok().compile(rs.columns(), args).ok()
+        self.assertEqual(f(['', 5]), 2)
+        self.assertRaises(ZeroDivisionError, f, ['', 0])
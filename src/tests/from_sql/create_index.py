@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from dropSQL.ast import *
+from dropSQL.parser.streams import *
+
+
+class CreateIndexTestCase(TestCase):
+    def test(self) -> None:
+        res = CreateIndex.from_sql(Tokens.from_str('/create index if not exists by_age on /person (/age) /drop'))
+        self.assertTrue(res)
+        index = res.ok()
+
+        self.assertTrue(index.if_not_exists)
+        self.assertEqual(index.index, Identifier('by_age'))
+        self.assertEqual(index.table, Identifier('person'))
+        self.assertEqual(index.column, Identifier('age'))
+        self.assertIsNone(index.using)
+        self.assertEqual(index.to_sql(), '/create index if not exists by_age on /person (/age) /drop')
+
+        res = CreateIndex.from_sql(Tokens.from_str('/create index by_age on person (age) /using btree /drop'))
+        self.assertTrue(res)
+        self.assertEqual(res.ok().using, Identifier('btree'))
+        self.assertEqual(res.ok().to_sql(), '/create index by_age on person (age) /using btree /drop')
+
+    def test_incomplete(self) -> None:
+        res = CreateIndex.from_sql(Tokens.from_str('/create index by_age on person'))
+        self.assertFalse(res)
+        self.assertTrue(res.err().is_incomplete())
+
+        res = CreateIndex.from_sql(Tokens.from_str('/create table person (age integer) /drop'))
+        self.assertFalse(res)
+
+    def test_not_reserved(self) -> None:
+        res = CreateIndex.from_sql(Tokens.from_str('/create index using on index (using) /using btree /drop'))
+        self.assertTrue(res)
+        self.assertEqual(res.ok().to_sql(), '/create index using on index (using) /using btree /drop')
+
+        res = CreateTable.from_sql(Tokens.from_str('/create table index (using integer, index integer) /drop'))
+        self.assertTrue(res)
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from dropSQL.ast import *
+from dropSQL.parser.streams import *
+
+
+class TransactionTestCase(TestCase):
+    def test(self) -> None:
+        tokens = Tokens.from_str('/begin /drop /commit /drop /rollback /drop /begin')
+
+        for cls in (BeginTransaction, CommitTransaction, RollbackTransaction):
+            res = cls.from_sql(tokens)
+            self.assertTrue(res)
+            self.assertIsInstance(res.ok(), cls)
+
+        self.assertEqual(BeginTransaction().to_sql(), '/begin /drop')
+        self.assertEqual(RollbackTransaction().to_sql(), '/rollback /drop')
+
+        res = BeginTransaction.from_sql(tokens)
+        self.assertFalse(res)
+        self.assertTrue(res.err().is_incomplete())
@@ -0,0 +1,16 @@
+from unittest import TestCase
+
+from dropSQL.ast import *
+from dropSQL.parser.streams import *
+
+
+class VacuumDatabaseTestCase(TestCase):
+    def test(self) -> None:
+        tokens = Tokens.from_str('/vacuum /drop\n/vacuum')
+        res = VacuumDatabase.from_sql(tokens)
+        self.assertTrue(res)
+        self.assertEqual(res.ok().to_sql(), '/vacuum /drop')
+
+        res = VacuumDatabase.from_sql(tokens)
+        self.assertFalse(res)
+        self.assertTrue(res.err().is_incomplete())
@@ -0,0 +1,93 @@
+import random
+from unittest import TestCase
+
+from dropSQL.ast import Expression, FloatTy, Identifier, IntegerTy, VarCharTy
+from dropSQL.ast.planner import filter_row_set
+from dropSQL.engine.row_set import *
+from dropSQL.fs.btree_index import BTreeIndex
+from dropSQL.fs.connection import Connection
+from dropSQL.fs.db_file import DBFile
+from dropSQL.parser.streams import Tokens
+
+
+class BTreeIndexTestCase(TestCase):
+    def test_splits(self) -> None:
+        db = DBFile()
+        # wide keys: a dozen entries per node, so that the tree grows several levels
+        index = BTreeIndex(db, VarCharTy(1000))
+        self.assertEqual(index.leaf_capacity, 12)
+
+        keys = [f'{i:04}' for i in range(2000)]
+        entries = [(key, i) for i, key in enumerate(keys)] + [('0042', 5000)]
+        random.Random(42).shuffle(entries)
+        for key, record in entries:
+            index.insert(key, record)
+
+        self.assertEqual(list(index.scan()), [record for _, record in sorted(entries)])
+        self.assertEqual(index.lookup('0042'), [42, 5000])
+        self.assertEqual(list(index.scan('1990', False, '1995', True)), list(range(1991, 1996)))
+        self.assertEqual(list(index.scan(high='0003', high_inclusive=False)), [0, 1, 2])
+        self.assertEqual(list(index.scan(low='1998')), [1998, 1999])
+
+        blocks = list(index.blocks())
+        self.assertEqual(len(blocks), len(set(blocks)))
+        self.assertGreater(len(blocks), 2001 // 12)
+
+        for i in range(0, 2000, 3):
+            self.assertTrue(index.delete(keys[i], i))
+        self.assertFalse(index.delete(keys[0], 0))
+        self.assertEqual(list(index.scan('0000', True, '0010', True)), [1, 2, 4, 5, 7, 8, 10])
+
+    def test_bulk_load(self) -> None:
+        db = DBFile()
+        for ty, keys in ((IntegerTy(), [i // 2 - 1000 for i in range(5000)]),
+                         (FloatTy(), [i / 4 for i in range(5000)])):
+            index = BTreeIndex(db, ty)
+            index.insert_many((key, i) for i, key in enumerate(keys))
+
+            self.assertEqual(list(index.scan()), list(range(5000)))
+            self.assertEqual(index.lookup(keys[3001]), [3000, 3001] if isinstance(ty, IntegerTy) else [3001])
+            self.assertEqual(len(list(index.scan(keys[100], True, keys[200], False))), 100)
+
+            # and keeps growing after bulk load
+            index.insert(keys[0], 9999)
+            self.assertEqual(index.lookup(keys[0])[-1], 9999)
+
+        self.assertFalse(BTreeIndex(db, VarCharTy(5000)).fits())
+
+
+class RangeScanTestCase(TestCase):
+    def test_planner(self) -> None:
+        conn = Connection()
+        conn.execute('/create table t(ts integer, name varchar(8)) /drop')
+        for i in range(200):
+            conn.execute('/insert into t (ts, name) values (?1, ?2) /drop', [(i * 37) % 200, str(i)])
+        self.assertTrue(conn.execute('/create index t_ts on t (ts) /using btree /drop'))
+        self.assertTrue(conn.execute('/create index t_name on t (name) /using btree /drop'))
+        self.assertFalse(conn.execute('/create index t_x on t (ts) /using bitmap /drop'))
+        conn.execute('/delete from t /where ts < 10 /drop')
+        conn.execute('/update t /set ts = ts + 1000 /where (ts >= 190) /drop')
+
+        table = conn.file.get_table_by_name(Identifier('t')).ok()
+
+        def plan(sql: str, *args):
+            return filter_row_set(TableRowSet(table), Expression.from_sql(Tokens.from_str(sql)).ok(), args).ok()
+
+        rs = plan('(ts > ?1) /and (?2 >= ts)', 20, 25)
+        self.assertIsInstance(rs.inner, IndexRangeRowSet)
+        self.assertEqual([row.data[0] for row in rs.iter()], [21, 22, 23, 24, 25])
+
+        rs = plan('(ts < 15) /and (ts >= 12) /and (ts < 100)')
+        self.assertEqual((rs.inner.low, rs.inner.high, rs.inner.high_inclusive), (12, 15, False))
+        self.assertEqual([row.data[0] for row in rs.iter()], [12, 13, 14])
+
+        self.assertIsInstance(plan('ts = 50').inner, IndexScanRowSet)
+        self.assertIsInstance(plan("name > '5'").inner, IndexRangeRowSet)
+        self.assertNotIsInstance(plan("ts > '5'").inner, IndexRangeRowSet)
+        self.assertNotIsInstance(plan('(ts > 5) /or (ts < 2)').inner, IndexRangeRowSet)
+
+        rows = [row.data for row in conn.execute('/select ts from t /where ts > 185 /drop').ok().iter()]
+        self.assertEqual(rows, [[186], [187], [188], [189]] + [[1000 + i] for i in range(190, 200)])
+
+        master = [row.data[2] for row in conn.execute('/select * from autism /drop').ok().iter()]
+        self.assertIn('/create index t_ts on /t (ts) /using btree /drop', master)
@@ -0,0 +1,114 @@
+from unittest import TestCase
+
+from dropSQL.fs.block import Block, BLOCK_SIZE
+from dropSQL.fs.buffer_pool import *
+from dropSQL.fs.file_storage import FileBlockStorage
+from dropSQL.fs.mmap_storage import MmapBlockStorage
+
+
+class BufferPoolTestCase(TestCase):
+    def make_pool(self, capacity: int, policy: str = LRU) -> BufferPool:
+        storage = FileBlockStorage()
+        for _ in range(8):
+            storage.allocate_block()
+        return BufferPool(storage, capacity, policy)
+
+    def test_hits_and_misses(self) -> None:
+        pool = self.make_pool(2)
+
+        pool.read_block(0)
+        pool.read_block(0)
+        pool.read_block(1)
+
+        self.assertEqual(pool.stats.hits, 1)
+        self.assertEqual(pool.stats.misses, 2)
+        self.assertEqual(pool.stats.evictions, 0)
+
+    def test_lru_eviction(self) -> None:
+        pool = self.make_pool(2)
+
+        pool.read_block(0)
+        pool.read_block(1)
+        pool.read_block(0)  # 1 is now the least recently used
+        pool.read_block(2)
+
+        self.assertTrue(pool.is_cached(0))
+        self.assertFalse(pool.is_cached(1))
+        self.assertEqual(pool.stats.evictions, 1)
+
+    def test_clock_eviction(self) -> None:
+        pool = self.make_pool(2, CLOCK)
+
+        for i in range(6):
+            pool.read_block(i % 3)
+
+        self.assertEqual(len(pool.frames), 2)
+        self.assertEqual(pool.stats.evictions, 4)
+
+    def test_write_back(self) -> None:
+        pool = self.make_pool(1)
+
+        block = pool.read_block(3)
+        block.override(0, b'dirty')
+        pool.write_block(block)
+        self.assertEqual(pool.storage.read_block(3)[:5], b'\0' * 5)
+
+        pool.read_block(4)  # evicts dirty block 3
+        self.assertEqual(pool.stats.writebacks, 1)
+        self.assertEqual(pool.storage.read_block(3)[:5], b'dirty')
+
+        block = pool.read_block(4)
+        block.override(0, b'flush')
+        pool.write_block(block)
+        pool.flush()
+        self.assertEqual(pool.storage.read_block(4)[:5], b'flush')
+
+    def test_pin(self) -> None:
+        pool = self.make_pool(1)
+
+        pool.pin(0)
+        pool.read_block(1)
+        pool.read_block(2)
+        self.assertTrue(pool.is_cached(0))
+
+        pool.unpin(0)
+        pool.read_block(3)
+        self.assertFalse(pool.is_cached(0))
+
+    def test_write_foreign_block(self) -> None:
+        pool = self.make_pool(4)
+
+        pool.read_block(5)
+        pool.write_block(Block(b'x' * len(Block.empty()), 5))
+        self.assertEqual(pool.read_block(5)[:1], b'x')
+
+    def test_view_block(self) -> None:
+        pool = self.make_pool(2)
+
+        pool.view_block(0)
+        pool.view_block(0)
+        self.assertTrue(pool.is_cached(0))
+        self.assertEqual(pool.stats.hits, 1)
+        self.assertEqual(pool.stats.misses, 1)
+
+    def test_scan_resistance(self) -> None:
+        for policy in (LRU, CLOCK):
+            pool = self.make_pool(2, policy)
+            pool.view_block(0)
+            pool.view_block(1)
+
+            # scanned blocks are not cached, resident ones are viewed in place
+            for i in range(8):
+                self.assertEqual(bytes(pool.scan_block(i)), bytes(Block.empty(i)))
+            self.assertEqual(sorted(pool.frames), [0, 1])
+            self.assertEqual(pool.stats.hits, 2)
+            self.assertEqual(pool.stats.evictions, 0)
+
+        storage = MmapBlockStorage()
+        storage.allocate_blocks(2)
+        pool = BufferPool(storage, 2)
+        view = pool.scan_block(1)
+        self.assertFalse(pool.is_cached(1))
+        storage.write_block(Block(b'x' * BLOCK_SIZE, 1))
+        self.assertEqual(bytes(view[:1]), b'x')
+        view.release()
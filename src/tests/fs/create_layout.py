@@ -28,11 +28,11 @@ class LayoutCase(TestCase):
             table.add_column(ColumnDef(Identifier("text"), VarCharTy(15)))
             for i in range(0, 10 ** 4):
                 # sys.stderr.write("Inserting record {} into {}\n".format(i, index))
-                table.insert([i, "qwerty123456"]).ok()
-                if i % 3 == 0: table.delete(i).ok()
-                if i % 3 == 1: table.update([-i, "123456qwerty"], i).ok()
+                record = table.insert([i, "qwerty123456"]).ok()
+                if i % 3 == 0: table.delete(record).ok()
+                if i % 3 == 1: table.update([-i, "123456qwerty"], record).ok()
 
-                res = table.select(i)
+                res = table.select(record)
                 if not res: continue
                 values = res.ok()
 
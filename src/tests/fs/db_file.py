@@ -0,0 +1,122 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.ast import ColumnDef, IntegerTy, VarCharTy
+from dropSQL.fs.block import BLOCK_SIZE
+from dropSQL.fs.db_file import DBFile
+from dropSQL.fs.metadata import Metadata
+from dropSQL.fs.wal import WAL_SUFFIX
+from dropSQL.generic import *
+from dropSQL.parser.tokens.identifier import Identifier
+
+
+class DBFileTestCase(TestCase):
+    def test_metadata_block_count(self) -> None:
+        db = DBFile()
+        self.assertIs(db.metadata, db.metadata)
+
+        writes = db.pool.stats.writebacks
+        first = db.allocate_blocks(100)
+        self.assertEqual(first, 17)
+        self.assertEqual(db.count_blocks(), 117)
+        db.allocate_block()
+
+        # nothing is written until flush
+        self.assertEqual(db.pool.stats.writebacks, writes)
+        self.assertEqual(Metadata(db.pool.storage).data_blocks_count, 0)
+
+        db.flush()
+        self.assertEqual(db.metadata.data_blocks_count, 101)
+        self.assertEqual(Metadata(db.pool.storage).data_blocks_count, 101)
+        self.assertEqual(db.read_block(116), b'\0' * len(db.read_block(116)))
+
+    def test_vacuum(self) -> None:
+        db = DBFile()
+        tables = []
+        for name in ('a', 'b', 'c'):
+            table = db.new_table().ok()
+            table.set_table_name(Identifier(name))
+            table.add_column(ColumnDef(Identifier('x'), IntegerTy()))
+            table.add_column(ColumnDef(Identifier('y'), VarCharTy(500)))
+            table.insert_many([[i, name * i] for i in range(300)]).ok()
+            tables.append(table)
+
+        a, b, c = tables
+        for i in range(0, 300, 3):
+            a.delete(i).ok()
+        b.drop()
+        db.flush()
+
+        before = db.count_blocks()
+        expected = [row for _, row in a.scan()]
+        reclaimed = db.vacuum().ok()
+
+        self.assertGreater(reclaimed, 0)
+        self.assertEqual(reclaimed, (before - db.count_blocks()) * BLOCK_SIZE)
+        self.assertEqual(db.metadata.data_blocks_count, db.count_blocks() - 17)
+        self.assertEqual(list(a.scan()), list(enumerate(expected)))
+        self.assertEqual(a.count_records(), 200)
+        self.assertEqual([row for _, row in c.scan()], [[i, 'c' * i] for i in range(300)])
+
+        # nothing left to reclaim
+        self.assertEqual(db.vacuum().ok(), 0)
+
+    def test_vacuum_failure(self) -> None:
+        def fill(db: DBFile) -> None:
+            for name in ('a', 'b'):
+                table = db.new_table().ok()
+                table.set_table_name(Identifier(name))
+                table.add_column(ColumnDef(Identifier('x'), IntegerTy()))
+                table.add_column(ColumnDef(Identifier('y'), VarCharTy(500)))
+                table.insert_many([[i, name * i] for i in range(300)]).ok()
+                for i in range(0, 300, 2):
+                    table.delete(i).ok()
+            db.flush()
+
+        def check(db: DBFile) -> None:
+            for name in ('a', 'b'):
+                table = db.get_table_by_name(Identifier(name)).ok()
+                self.assertEqual([row for _, row in table.scan()], [[i, name * i] for i in range(1, 300, 2)])
+
+        def broken(_rows):
+            raise RuntimeError('crash')
+
+        # rows of the first table are written back by the time the second one fails
+        db = DBFile()
+        fill(db)
+        before = db.count_blocks()
+        db.get_table_by_name(Identifier('b')).ok().insert_many = lambda _rows: Err('full')
+
+        self.assertFalse(db.vacuum())
+        self.assertIsNone(db.transaction)
+        self.assertEqual(db.count_blocks(), before)
+        check(db)
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(path)
+        try:
+            db = DBFile(path)
+            fill(db)
+            db.get_table_by_name(Identifier('b')).ok().insert_many = broken
+
+            with self.assertRaises(RuntimeError):
+                db.vacuum()
+            check(db)
+            db.close()
+
+            db = DBFile(path)
+            check(db)
+            self.assertGreater(db.vacuum().ok(), 0)
+            check(db)
+            db.close()
+
+            # rewritten database would have to stay in memory until commit
+            db = DBFile(path, use_wal=False)
+            self.assertFalse(db.vacuum())
+            db.close()
+
+        finally:
+            for name in (path, path + WAL_SUFFIX):
+                if os.path.exists(name): os.remove(name)
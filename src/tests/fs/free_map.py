@@ -0,0 +1,93 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.ast import ColumnDef, IntegerTy, VarCharTy
+from dropSQL.fs.db_file import DBFile
+from dropSQL.parser.tokens.identifier import Identifier
+
+
+class FreeMapTestCase(TestCase):
+    def test_allocate(self) -> None:
+        db = DBFile()
+        first = db.allocate_blocks(10)
+        last = db.allocate_block().idx
+
+        for index in (first + 1, first + 3, first + 4, first + 5, first + 8):
+            db.release_block(index)
+        self.assertEqual(db.free_map.free, [first + 1, first + 3, first + 4, first + 5, first + 8])
+
+        # first run which is long enough
+        self.assertEqual(db.allocate_blocks(2), first + 3)
+        self.assertEqual(db.allocate_block().idx, first + 1)
+        self.assertEqual(db.allocate_blocks(2), last + 2)  # bitmap has been appended after the last block
+        self.assertEqual(db.free_map.free, [first + 5, first + 8])
+
+        # reused blocks come back zeroed
+        self.assertEqual(db.allocate_block().idx, first + 5)
+        block = db.read_block(first + 5)
+        block[:3] = b'abc'
+        db.write_block(block)
+        db.release_block(first + 5)
+        self.assertEqual(db.allocate_block().idx, first + 5)
+        self.assertEqual(db.read_block(first + 5)[:3], b'\0\0\0')
+
+    def test_truncate_tail(self) -> None:
+        db = DBFile()
+        first = db.allocate_blocks(5)
+
+        db.release_block(first + 2)
+        self.assertEqual(db.count_blocks(), first + 6)  # bitmap has been appended
+        self.assertEqual(db.allocate_blocks(3), first + 6)
+
+        # released blocks at the end of the file are cut off together with free blocks before them
+        db.release_block(first + 8)
+        self.assertEqual(db.count_blocks(), first + 8)
+        db.release_block(first + 6)
+        self.assertEqual(db.count_blocks(), first + 8)
+        db.release_block(first + 7)
+        self.assertEqual(db.count_blocks(), first + 6)
+
+        # but not beyond the bitmap
+        db.release_block(first + 4)
+        db.release_block(first + 3)
+        self.assertEqual(db.count_blocks(), first + 6)
+        self.assertEqual(db.free_map.free, [first + 2, first + 3, first + 4])
+
+    def test_drop_and_reopen(self) -> None:
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(path)
+        try:
+            db = DBFile(path)
+            a = db.new_table().ok()
+            a.set_table_name(Identifier('a'))
+            a.add_column(ColumnDef(Identifier('x'), VarCharTy(5000)))
+            a.insert_many([[str(i)] for i in range(100)]).ok()
+
+            b = db.new_table().ok()
+            b.set_table_name(Identifier('b'))
+            b.add_column(ColumnDef(Identifier('x'), IntegerTy()))
+            b.insert([1]).ok()
+
+            blocks = sorted(a.blocks())
+            size = db.count_blocks()
+            a.drop()
+            self.assertEqual(sorted(db.free_map.free), blocks)
+            db.close()
+
+            db = DBFile(path)
+            self.assertEqual(db.free_map.free, blocks)
+
+            # new table takes its pages from the free map
+            c = db.get_tables()[0]
+            c.set_table_name(Identifier('c'))
+            c.add_column(ColumnDef(Identifier('x'), VarCharTy(5000)))
+            c.insert_many([[str(i)] for i in range(100)]).ok()
+            self.assertEqual(db.count_blocks(), size + 1)  # the only new block is a bitmap
+            self.assertEqual(len(db.free_map), 0)
+            self.assertEqual(list(c.scan())[-1], (99, ['99']))
+            db.close()
+
+        finally:
+            os.remove(path)
@@ -0,0 +1,172 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.ast import Expression, Identifier
+from dropSQL.ast.planner import filter_row_set
+from dropSQL.engine.row_set import *
+from dropSQL.fs.connection import Connection
+from dropSQL.fs.db_file import DBFile
+from dropSQL.fs.hash_index import ENTRIES_PER_PAGE, HashIndex
+from dropSQL.fs.wal import WAL_SUFFIX
+from dropSQL.parser.streams import Tokens
+
+
+def where(sql: str) -> Expression:
+    return Expression.from_sql(Tokens.from_str(sql)).ok()
+
+
+class HashIndexTestCase(TestCase):
+    def test_lookup(self) -> None:
+        db = DBFile()
+        index = HashIndex(db)
+        self.assertEqual(index.lookup(1), [])
+        self.assertEqual(list(index.blocks()), [])
+
+        index.insert_many([(i % 10, i) for i in range(100)] + [('ten', 100), (2.5, 101)])
+        self.assertNotEqual(index.root, 0)
+
+        self.assertEqual(sorted(index.lookup(3)), list(range(3, 100, 10)))
+        self.assertEqual(index.lookup(3.0), index.lookup(3))
+        self.assertEqual(index.lookup('ten'), [100])
+        self.assertEqual(index.lookup(2.5), [101])
+        self.assertEqual(index.lookup('3'), [])
+
+        self.assertTrue(index.delete(3, 33))
+        self.assertFalse(index.delete(3, 33))
+        self.assertFalse(index.delete(4, 33))
+        self.assertEqual(sorted(index.lookup(3)), [3, 13, 23, 43, 53, 63, 73, 83, 93])
+
+        # reopen by root
+        self.assertEqual(HashIndex(db, index.root).lookup('ten'), [100])
+
+    def test_overflow_chain(self) -> None:
+        db = DBFile()
+        index = HashIndex(db)
+
+        n = 3 * ENTRIES_PER_PAGE + 5
+        index.insert_many([('same', i) for i in range(n)])
+        index.insert('same', n)
+        self.assertEqual(sorted(index.lookup('same')), list(range(n + 1)))
+        self.assertEqual(len(list(index.blocks())), 1 + 4)
+
+        for i in range(0, n + 1, 2):
+            self.assertTrue(index.delete('same', i))
+        self.assertEqual(sorted(index.lookup('same')), list(range(1, n + 1, 2)))
+
+    def test_split(self) -> None:
+        db = DBFile()
+        index = HashIndex(db)
+
+        n = 10 * ENTRIES_PER_PAGE
+        index.insert_many([(i, i) for i in range(n // 2)])
+        for i in range(n // 2, n):
+            index.insert(i, i)
+        self.assertTrue(all(index.lookup(i) == [i] for i in range(0, n, 7)))
+
+        # directory grows with the data, pages are mostly full
+        self.assertGreater(db.read_block(index.root).get_pointer(0), 0)
+        self.assertLess(len(list(index.blocks())), 1 + 2 * n // ENTRIES_PER_PAGE)
+
+        # chain of duplicates is split apart together with other keys
+        index.insert_many([('same', i) for i in range(2 * ENTRIES_PER_PAGE)])
+        index.insert_many([(i, i) for i in range(n, 2 * n)])
+        self.assertEqual(sorted(index.lookup('same')), list(range(2 * ENTRIES_PER_PAGE)))
+        self.assertTrue(all(i in index.lookup(i) for i in range(0, 2 * n, 7)))
+        self.assertEqual(db.count_blocks() - 17, len(list(index.blocks())) + len(db.free_map))
+
+    def test_size(self) -> None:
+        conn = Connection()
+        conn.execute('/create table t(a integer, b integer) /drop')
+        table = conn.file.get_table_by_name(Identifier('t')).ok()
+        table.insert_many([[i, i] for i in range(3000)]).ok()
+
+        before = conn.file.count_blocks()
+        table.create_index(Identifier('t_a'), 0).ok()
+        self.assertLessEqual(conn.file.count_blocks() - before, 4)
+
+
+class IndexedTableTestCase(TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self) -> None:
+        for path in (self.path, self.path + WAL_SUFFIX):
+            if os.path.exists(path): os.remove(path)
+
+    def select(self, conn: Connection, sql: str, *args):
+        return [row.data for row in conn.execute(sql, args).ok().iter()]
+
+    def test_maintenance(self) -> None:
+        conn = Connection(self.path)
+        conn.execute('/create table t(a integer, b varchar(10)) /drop')
+        for i in range(50):
+            conn.execute('/insert into t (a, b) values (?1, ?2) /drop', [i % 5, str(i)])
+
+        self.assertTrue(conn.execute('/create index t_a on t (a) /drop'))
+        self.assertFalse(conn.execute('/create index t_a on t (b) /drop'))
+        self.assertFalse(conn.execute('/create index other on t (c) /drop'))
+        self.assertTrue(conn.execute('/create index if not exists t_a on t (b) /drop'))
+
+        conn.execute('/delete from t /where a = 1 /drop')
+        conn.execute('/update t /set a = 1 /where b = \'7\' /drop')
+        conn.execute('/insert into t (a, b) values (1, \'new\') /drop')
+
+        expected = [[1, '7'], [1, 'new']]
+        self.assertEqual(sorted(self.select(conn, '/select * from t /where a = 1 /drop')), expected)
+        self.assertEqual(sorted(self.select(conn, '/select * from t /where ?1 = a /drop', 1)), expected)
+        self.assertEqual(self.select(conn, '/select * from t x /where (x /a = 2) /and (b = \'7\') /drop'), [])
+
+        master = self.select(conn, '/select * from autism /drop')
+        self.assertIn(['index', 't_a', '/create index t_a on /t (a) /drop'], master)
+        conn.close()
+
+        # index survives reopening and vacuum
+        conn = Connection(self.path)
+        conn.file.vacuum().ok()
+        self.assertEqual(sorted(self.select(conn, '/select b from t /where a = 1 /drop')), [['7'], ['new']])
+        self.assertEqual(len(self.select(conn, '/select * from t /where a = 3 /drop')), 10)
+
+        # drop releases index blocks together with data pages
+        table = conn.file.get_table_by_name(Identifier('t')).ok()
+        blocks = list(table.blocks())
+        conn.execute('/drop table t /drop')
+        self.assertTrue(all(conn.file.free_map.is_free(block) for block in blocks))
+        conn.close()
+
+    def test_planner(self) -> None:
+        conn = Connection()
+        conn.execute('/create table t(a integer, b integer) /drop')
+        table = conn.file.get_table_by_name(Identifier('t')).ok()
+        table.insert_many([[i, i % 3] for i in range(30)]).ok()
+        table.create_index(Identifier('t_b'), 1).ok()
+
+        def plan(sql: str, *args):
+            return filter_row_set(TableRowSet(table), where(sql), args).ok()
+
+        for sql, args in [('b = 1', ()), ('(a < 10) /and (1 = b)', ()), ('b = ?1', (1,))]:
+            rs = plan(sql, *args)
+            self.assertIsInstance(rs, FilteredRowSet)
+            self.assertIsInstance(rs.inner, IndexScanRowSet)
+
+        # not an equality with a constant, or not indexed
+        for sql in ('b > 1', 'a = 1', 'b = a', '(b = 1) /or (a = 2)'):
+            self.assertNotIsInstance(plan(sql).inner, IndexScanRowSet)
+
+        # clause which can not be bound is rejected before the scan
+        for sql in ('b = ?1', 'c = 1'):
+            self.assertFalse(filter_row_set(TableRowSet(table), where(sql), ()))
+
+        full = FilteredRowSet(TableRowSet(table), where('(b = 2) /and (a > 10)'), ())
+        self.assertEqual([row.data for row in plan('(b = 2) /and (a > 10)').iter()],
+                         [row.data for row in full.iter()])
+
+    def test_unreserved_names(self) -> None:
+        conn = Connection()
+        self.assertTrue(conn.execute('/create table index (using integer, index integer) /drop'))
+        self.assertTrue(conn.execute('/insert into index (using, index) values (1, 2) /drop'))
+        self.assertTrue(conn.execute('/create index using on index (using) /drop'))
+        rs = conn.execute('/select index /from index /where using = 1 /drop').ok()
+        self.assertEqual([row.data for row in rs.iter()], [[2]])
@@ -0,0 +1,73 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.fs import Connection
+from dropSQL.fs.block import BLOCK_SIZE
+from dropSQL.fs.mmap_storage import MmapBlockStorage
+
+
+class MmapStorageTestCase(TestCase):
+    def test_memory(self) -> None:
+        storage = MmapBlockStorage(chunk=2)
+        for _ in range(5):
+            storage.allocate_block()
+        self.assertEqual(storage.count_blocks(), 5)
+        self.assertEqual(len(storage.segments), 3)
+
+        block = storage.read_block(4)
+        block.override(0, b'hello')
+        storage.write_block(block)
+
+        view = storage.view_block(4)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(bytes(view[:5]), b'hello')
+
+    def test_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'mmap.db')
+
+            storage = MmapBlockStorage(path, chunk=4)
+            for _ in range(6):
+                storage.allocate_block()
+            block = storage.read_block(5)
+            block.override(0, b'persistent')
+            storage.write_block(block)
+            storage.close()
+
+            self.assertEqual(os.path.getsize(path), 6 * BLOCK_SIZE)
+
+            storage = MmapBlockStorage(path, chunk=4)
+            self.assertEqual(storage.count_blocks(), 6)
+            self.assertEqual(bytes(storage.view_block(5)[:10]), b'persistent')
+            storage.close()
+
+    def test_close_with_live_view(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'mmap.db')
+
+            storage = MmapBlockStorage(path, chunk=4)
+            for _ in range(6):
+                storage.allocate_block()
+            storage.truncate_blocks(5)
+            view = storage.view_block(4)
+            storage.close()
+
+            # the second segment is still mapped, so it is not cut off
+            self.assertEqual(os.path.getsize(path), 8 * BLOCK_SIZE)
+            self.assertEqual(bytes(view[:4]), b'\0' * 4)
+            view.release()
+
+    def test_connection(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'conn.db')
+
+            conn = Connection(path, use_mmap=True)
+            conn.execute('/create table t (a integer, b varchar(8)) /drop')
+            conn.execute("/insert into t (a, b) values (1, 'one'), (2, 'two') /drop")
+            conn.close()
+
+            conn = Connection(path, use_mmap=True)
+            rows = [row.data for row in conn.execute('/select * from t /drop').ok().iter()]
+            self.assertEqual(rows, [[1, 'one'], [2, 'two']])
+            conn.close()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.fs.connection import Connection
+from dropSQL.fs.wal import WAL_SUFFIX
+from dropSQL.parser.tokens.identifier import Identifier
+
+
+class PrimaryKeyTestCase(TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self) -> None:
+        for path in (self.path, self.path + WAL_SUFFIX):
+            if os.path.exists(path): os.remove(path)
+
+    def rows(self, conn: Connection, sql: str = '/select * from t /drop', *args):
+        return [row.data for row in conn.execute(sql, args).ok().iter()]
+
+    def test_unique(self) -> None:
+        conn = Connection(self.path)
+        self.assertTrue(conn.execute('/create table t(id integer /primary key, name varchar(10)) /drop'))
+        self.assertFalse(conn.execute('/create table u(a integer /primary key, b integer /primary key) /drop'))
+
+        self.assertTrue(conn.execute("/insert into t (id, name) values (1, 'one'), (2, 'two') /drop"))
+        self.assertFalse(conn.execute("/insert into t (id, name) values (3, 'three'), (1, 'again') /drop"))
+        self.assertFalse(conn.execute("/insert into t (id, name) values (4, 'four'), (4, 'again') /drop"))
+        self.assertFalse(conn.execute('/update t /set id = 2 /where id = 1 /drop'))
+        self.assertTrue(conn.execute("/update t /set name = 'uno' /where id = 1 /drop"))
+        self.assertEqual(self.rows(conn), [[1, 'uno'], [2, 'two']])
+
+        # uniqueness holds for the final state, not after every row
+        self.assertTrue(conn.execute("/insert into t (id, name) values (3, 'three') /drop"))
+        self.assertEqual(conn.execute('/update t /set id = id + 1 /drop').ok(), 3)
+        self.assertEqual(self.rows(conn), [[2, 'uno'], [3, 'two'], [4, 'three']])
+        self.assertFalse(conn.execute('/update t /set id = id - 1 /where id > 2 /drop'))
+        self.assertFalse(conn.execute('/update t /set id = 5 /drop'))
+        self.assertEqual(conn.execute('/update t /set id = id - 1 /where id > 0 /drop').ok(), 3)
+        self.assertEqual(self.rows(conn), [[1, 'uno'], [2, 'two'], [3, 'three']])
+        self.assertEqual(self.rows(conn, '/select name from t /where id = 3 /drop'), [['three']])
+        conn.execute('/delete from t /where id = 3 /drop')
+
+        # key of a deleted record is free again
+        conn.execute('/delete from t /where id = 2 /drop')
+        self.assertTrue(conn.execute("/insert into t (id, name) values (2, 'dos') /drop"))
+        conn.close()
+
+        conn = Connection(self.path)
+        table = conn.file.get_table_by_name(Identifier('t')).ok()
+        self.assertEqual([column.is_primary_key for column in table.get_columns()], [True, False])
+        self.assertFalse(table.insert([2, 'twice']))
+        self.assertEqual(self.rows(conn, '/select name from t /where id = ?1 /drop', 2), [['dos']])
+
+        # primary key is a tree, which stays small for small tables
+        self.assertIsNotNone(table.find_index(0, 'btree'))
+        self.assertEqual(len(list(table.blocks())), 2)
+
+        self.assertTrue(conn.execute('/create table w(k varchar(5000) /primary key) /drop'))
+        wide = conn.file.get_table_by_name(Identifier('w')).ok()
+        self.assertIsNotNone(wide.find_index(0, 'hash'))
+        self.assertTrue(conn.execute("/insert into w (k) values ('a') /drop"))
+        self.assertFalse(conn.execute("/insert into w (k) values ('a') /drop"))
+
+        master = self.rows(conn, '/select type, sql from autism /drop')
+        self.assertEqual(master[:1], [['table', '/create table /t (\n\tid integer /primary key,\n\tname varchar(10),\n) /drop']])
+        conn.close()
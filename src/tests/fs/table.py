@@ -0,0 +1,154 @@
+from unittest import TestCase
+
+from dropSQL.ast import ColumnDef, IntegerTy, VarCharTy
+from dropSQL.engine.types import BYTEORDER
+from dropSQL.fs.block import BLOCK_SIZE, POINTER_SIZE
+from dropSQL.fs.db_file import DBFile
+from dropSQL.fs.table import LVL0
+from dropSQL.parser.tokens.identifier import Identifier
+
+
+class TableTestCase(TestCase):
+    def make_table(self, db: DBFile):
+        table = db.new_table().ok()
+        table.set_table_name(Identifier('t'))
+        table.add_column(ColumnDef(Identifier('a'), IntegerTy()))
+        table.add_column(ColumnDef(Identifier('b'), VarCharTy(1000)))
+        return table
+
+    def test_page_pointers(self) -> None:
+        db = DBFile()
+        table = self.make_table(db)
+
+        # enough records to spill into the first level of indirect pointers
+        n = (LVL0 + 3) * BLOCK_SIZE // table.record_size
+        for i in range(n):
+            table.insert([i, str(i)]).ok()
+
+        pages = dict(table._pages)
+        self.assertGreater(len(pages), LVL0)
+
+        # forget cached pointers and resolve them from disk again
+        table._pages.clear()
+        for i in range(0, n, 7):
+            self.assertEqual(table.select(i).ok(), [i, str(i)])
+        for page, pointer in table._pages.items():
+            self.assertEqual(pages[page], pointer)
+
+        table.drop()
+        self.assertEqual(table._pages, {})
+
+    def test_scan(self) -> None:
+        db = DBFile()
+
+        for width in (7, 1000, 20000):
+            table = db.new_table().ok()
+            table.set_table_name(Identifier(f't{width}'))
+            table.add_column(ColumnDef(Identifier('a'), IntegerTy()))
+            table.add_column(ColumnDef(Identifier('b'), VarCharTy(width)))
+
+            for i in range(100):
+                record = table.insert([i, str(i)]).ok()
+                if i % 5 == 0: table.delete(record).ok()
+
+            expected = [(i, table.select(i).ok()) for i in range(table.count_records()) if table.select(i)]
+            self.assertEqual(len(expected), 80)
+            self.assertEqual(list(table.scan()), expected)
+            self.assertEqual(list(table.scan([1])), [(i, [None, row[1]]) for i, row in expected])
+
+    def test_codec(self) -> None:
+        db = DBFile()
+        table = self.make_table(db)
+
+        codec = table.codec()
+        self.assertIs(table.codec(), codec)
+        self.assertEqual(codec.offsets, [4, 8])
+        self.assertEqual(codec.varchars, [1])
+        self.assertEqual(table.record_size, 1008)
+
+        records = codec.encode([1, 'one']) + codec.encode([2, 'two'])
+        self.assertEqual(list(codec.decode_many(records, 10)), [(10, [1, 'one']), (11, [2, 'two'])])
+
+        table.add_column(ColumnDef(Identifier('c'), IntegerTy()))
+        self.assertIsNot(table.codec(), codec)
+        self.assertEqual(table.codec().decode(table.codec().encode([3, 'three', 4])).ok(), [3, 'three', 4])
+
+        codec = table.codec()
+        record = codec.encode([3, 'three', 4]) + codec.encode([5, 'five', 6])
+        for columns, row in (([], [None, None, None]), ([2, 0], [3, None, 4]), ([1], [None, 'three', None])):
+            self.assertEqual(codec.partial(columns).decode_from(record), row)
+        self.assertEqual(list(codec.partial([2]).decode_many(record, 7)), [(7, [None, None, 4]), (8, [None, None, 6])])
+
+        # long string is cut between characters, so every written record decodes
+        self.assertEqual(codec.decode(codec.encode([1, 'x' * 999 + '\u00e9', 2])).ok(), [1, 'x' * 999, 2])
+
+        # damaged string is only noticed when its column is decoded
+        broken = bytearray(record)
+        broken[codec.offsets[1]] = 0xFF
+        self.assertFalse(codec.decode(bytes(broken[:codec.size])))
+        self.assertIsNone(codec.partial([1]).decode_from(broken))
+        self.assertEqual(codec.partial([0, 2]).decode_from(broken), [3, None, 4])
+
+    def test_deferred_descriptor(self) -> None:
+        db = DBFile()
+        table = self.make_table(db)
+
+        def records_on_disk() -> int:
+            block = db.pool.storage.read_block(1 + table.index)
+            return int.from_bytes(block[BLOCK_SIZE - POINTER_SIZE:], byteorder=BYTEORDER)
+
+        for i in range(10):
+            table.insert([i, str(i)]).ok()
+
+        self.assertTrue(table.descriptor().dirty)
+        self.assertEqual(table.count_records(), 10)
+        self.assertEqual(records_on_disk(), 0)
+
+        db.flush()
+        self.assertFalse(table.descriptor().dirty)
+        self.assertEqual(records_on_disk(), 10)
+
+    def test_insert_many(self) -> None:
+        db = DBFile()
+        table = self.make_table(db)
+        table.insert([-1, 'single']).ok()
+
+        n = (LVL0 + 5) * BLOCK_SIZE // table.record_size
+        ids = table.insert_many([[i, str(i)] for i in range(n)]).ok()
+        self.assertEqual(ids, list(range(1, n + 1)))
+        self.assertEqual(table.count_records(), n + 1)
+        self.assertEqual([row for _, row in table.scan()], [[-1, 'single']] + [[i, str(i)] for i in range(n)])
+
+        # whole batch is rejected
+        self.assertFalse(table.insert_many([[1, 'ok'], ['not ok', 2]]))
+        self.assertEqual(table.count_records(), n + 1)
+
+    def test_slot_reuse(self) -> None:
+        db = DBFile()
+        table = self.make_table(db)
+        table.insert_many([[i, str(i)] for i in range(10)]).ok()
+
+        for i in (7, 2, 5):
+            table.delete(i).ok()
+        table.delete(2).ok()  # deleting twice must not corrupt the free list
+        self.assertFalse(table.update([0, 'dead'], 2))
+
+        # most recently freed slot goes first
+        self.assertEqual(table.insert([50, '50']).ok(), 5)
+        self.assertEqual(table.insert_many([[i, str(i)] for i in range(20, 23)]).ok(), [2, 7, 10])
+        self.assertEqual(table.count_records(), 11)
+
+        # free list survives reopening of the descriptor
+        table.delete(3).ok()
+        db.flush()
+        table._descriptor = None
+        self.assertEqual(table.insert([30, '30']).ok(), 3)
+
+    def test_append_policy(self) -> None:
+        db = DBFile(slot_policy='append')
+        table = self.make_table(db)
+        table.insert_many([[i, str(i)] for i in range(3)]).ok()
+        table.delete(1).ok()
+
+        self.assertEqual(table.insert([3, '3']).ok(), 3)
+        self.assertEqual([row for _, row in table.scan()], [[0, '0'], [2, '2'], [3, '3']])
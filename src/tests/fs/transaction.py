@@ -0,0 +1,125 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.fs.connection import Connection
+from dropSQL.fs.wal import WAL_SUFFIX
+
+
+class TransactionTestCase(TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self) -> None:
+        for path in (self.path, self.path + WAL_SUFFIX):
+            if os.path.exists(path): os.remove(path)
+
+    def connections(self):
+        # no-steal buffer pool on its own, and together with write-ahead log; tiny cache forces evictions
+        yield Connection(cache_size=2)
+        yield Connection(self.path, cache_size=2)
+
+    def rows(self, conn: Connection):
+        return [row.data for row in conn.execute('/select * from t /drop').ok().iter()]
+
+    def test_rollback(self) -> None:
+        for conn in self.connections():
+            conn.execute('/create table t(a integer, b varchar(2000)) /drop')
+            conn.execute("/insert into t (a, b) values (1, 'one') /drop")
+            blocks = conn.file.count_blocks()
+
+            self.assertTrue(conn.execute('/begin /drop'))
+            self.assertIsNotNone(conn.transaction)
+            self.assertFalse(conn.execute('/begin /drop'))
+            for i in range(2, 50):
+                conn.execute(f"/insert into t (a, b) values ({i}, 'more') /drop")
+            conn.execute('/delete from t /where a = 1 /drop')
+            self.assertEqual(len(self.rows(conn)), 48)
+
+            self.assertTrue(conn.execute('/rollback /drop'))
+            self.assertIsNone(conn.transaction)
+            self.assertFalse(conn.execute('/rollback /drop'))
+            self.assertEqual(self.rows(conn), [[1, 'one']])
+            self.assertEqual(conn.file.count_blocks(), blocks)
+
+            conn.execute('/begin /drop')
+            conn.execute("/insert into t (a, b) values (2, 'two') /drop")
+            conn.execute('/drop table t /drop')
+            conn.execute('/rollback /drop')
+            self.assertEqual(self.rows(conn), [[1, 'one']])
+
+            conn.execute('/begin /drop')
+            conn.execute("/insert into t (a, b) values (2, 'two') /drop")
+            self.assertTrue(conn.execute('/commit /drop'))
+            self.assertEqual(self.rows(conn), [[1, 'one'], [2, 'two']])
+            conn.close()
+
+    def test_failed_statement(self) -> None:
+        for conn in self.connections():
+            conn.execute('/create table t(a integer, b varchar(2000)) /drop')
+            conn.execute("/insert into t (a, b) values (1, 'x'), (2, 'x'), (3, 'x'), (4, 'x') /drop")
+
+            # fails on the third row after two rows have been updated
+            self.assertFalse(conn.execute('/update t set a = 10 / (a - 3) /drop'))
+            self.assertEqual([row[0] for row in self.rows(conn)], [1, 2, 3, 4])
+
+            # failure inside a transaction aborts it, until it is rolled back
+            conn.execute('/begin /drop')
+            conn.execute('/delete from t /where a = 4 /drop')
+            self.assertFalse(conn.execute('/update t set a = 10 / (a - 3) /drop'))
+            self.assertTrue(conn.transaction.aborted)
+            self.assertFalse(conn.execute("/insert into t (a, b) values (5, 'x') /drop"))
+            self.assertFalse(conn.execute('/select * from t /drop'))
+            self.assertFalse(conn.execute('/commit /drop'))
+            self.assertFalse(conn.execute('/vacuum /drop'))
+            self.assertTrue(conn.execute('/rollback /drop'))
+            self.assertIsNone(conn.transaction)
+            self.assertEqual([row[0] for row in self.rows(conn)], [1, 2, 3, 4])
+
+            # nothing of an aborted transaction gets committed
+            conn.execute('/begin /drop')
+            conn.execute("/insert into t (a, b) values (6, 'x') /drop")
+            self.assertFalse(conn.execute('/select * from nope /drop'))
+            conn.execute("/insert into t (a, b) values (7, 'x') /drop")
+            self.assertFalse(conn.execute('/commit /drop'))
+            conn.execute('/rollback /drop')
+            self.assertEqual([row[0] for row in self.rows(conn)], [1, 2, 3, 4])
+            conn.close()
+
+    def test_crash_inside_transaction(self) -> None:
+        conn = Connection(self.path, cache_size=2)
+        conn.execute('/create table t(a integer, b varchar(2000)) /drop')
+        conn.execute('/begin /drop')
+        for i in range(20):
+            conn.execute(f"/insert into t (a, b) values ({i}, 'x') /drop")
+
+        # evicted blocks have reached the log, but the transaction is not committed
+        self.assertGreater(conn.file.wal.logged, 0)
+        conn.file.wal.log.close()
+        conn.file.wal.storage.file.close()
+
+        conn = Connection(self.path)
+        self.assertEqual(self.rows(conn), [])
+        conn.close()
+
+    def test_vacuum(self) -> None:
+        for conn in self.connections():
+            conn.execute('/create table t(a integer, b varchar(2000)) /drop')
+            for i in range(20):
+                conn.execute(f"/insert into t (a, b) values ({i}, 'x') /drop")
+            conn.execute('/delete from t /where a < 15 /drop')
+
+            # not wrapped into an implicit transaction
+            res = conn.execute('/vacuum /drop')
+            self.assertTrue(res)
+            self.assertGreater(res.ok(), 0)
+            self.assertEqual([row[0] for row in self.rows(conn)], [15, 16, 17, 18, 19])
+
+            # but still not allowed inside an explicit one
+            conn.execute('/begin /drop')
+            self.assertFalse(conn.execute('/vacuum /drop'))
+            self.assertIsNotNone(conn.transaction)
+            conn.execute('/rollback /drop')
+            conn.close()
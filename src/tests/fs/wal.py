@@ -0,0 +1,154 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from dropSQL.fs.block import Block, BLOCK_SIZE
+from dropSQL.fs.connection import Connection
+from dropSQL.fs.file_storage import FileBlockStorage
+from dropSQL.fs.wal import *
+from dropSQL.fs.wal import GROUP_INTERVAL
+from dropSQL.parser.tokens.identifier import Identifier
+
+
+def crash(wal: WriteAheadLog) -> None:
+    """ Drop everything on the floor without checkpoint. """
+    wal.log.close()
+    wal.storage.file.close()
+
+
+def filled(index: int, byte: bytes) -> Block:
+    return Block(byte * BLOCK_SIZE, index)
+
+
+class WriteAheadLogTestCase(TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self) -> None:
+        for path in (self.path, self.path + WAL_SUFFIX):
+            if os.path.exists(path): os.remove(path)
+
+    def open(self, **kwargs) -> WriteAheadLog:
+        return WriteAheadLog(FileBlockStorage(self.path), self.path + WAL_SUFFIX, **kwargs)
+
+    def test_replay(self) -> None:
+        wal = self.open(sync=FULL)
+        first = wal.allocate_blocks(3)
+        wal.write_block(filled(first, b'a'))
+        wal.write_block(filled(first + 2, b'c'))
+        wal.commit()
+
+        # main file is untouched until checkpoint
+        self.assertEqual(wal.storage.count_blocks(), 0)
+        self.assertEqual(wal.read_block(first + 2), filled(first + 2, b'c'))
+        self.assertEqual(wal.read_block(first + 1), Block.empty(first + 1))
+
+        # uncommitted changes are lost
+        wal.write_block(filled(first + 1, b'x'))
+        wal.allocate_block()
+        crash(wal)
+
+        wal = self.open()
+        self.assertEqual(wal.count_blocks(), 3)
+        self.assertEqual(wal.storage.count_blocks(), 3)
+        self.assertEqual(wal.read_block(first), filled(first, b'a'))
+        self.assertEqual(wal.read_block(first + 1), Block.empty(first + 1))
+        self.assertEqual(wal.read_block(first + 2), filled(first + 2, b'c'))
+        wal.close()
+
+        self.assertFalse(os.path.exists(self.path + WAL_SUFFIX))
+        self.assertEqual(os.path.getsize(self.path), 3 * BLOCK_SIZE)
+
+    def test_torn_tail(self) -> None:
+        wal = self.open(sync=OFF)
+        wal.allocate_blocks(2)
+        wal.write_block(filled(0, b'a'))
+        wal.commit()
+        wal.write_block(filled(1, b'b'))
+        wal.commit()
+        crash(wal)
+
+        # cut the last commit record in half
+        with open(self.path + WAL_SUFFIX, 'r+b') as log:
+            log.truncate(os.path.getsize(self.path + WAL_SUFFIX) - 5)
+
+        wal = self.open()
+        self.assertEqual(wal.read_block(0), filled(0, b'a'))
+        self.assertEqual(wal.read_block(1), Block.empty(1))
+        wal.close()
+
+    def test_truncate(self) -> None:
+        wal = self.open()
+        wal.allocate_blocks(4)
+        for i in range(4):
+            wal.write_block(filled(i, b'z'))
+        wal.commit()
+        wal.checkpoint()
+
+        # blocks which are truncated and allocated again must read as zeroes
+        wal.truncate_blocks(2)
+        self.assertEqual(wal.allocate_blocks(2), 2)
+        self.assertEqual(wal.read_block(3), Block.empty(3))
+        wal.write_block(filled(2, b'y'))
+        wal.commit()
+        crash(wal)
+
+        wal = self.open()
+        self.assertEqual(wal.count_blocks(), 4)
+        self.assertEqual([wal.read_block(i)[0] for i in range(4)], [ord('z'), ord('z'), ord('y'), 0])
+        wal.close()
+
+    def test_checkpoint(self) -> None:
+        wal = self.open(checkpoint_frames=4)
+        wal.allocate_blocks(2)
+        for i in range(3):
+            wal.write_block(filled(i % 2, bytes([i])))
+            wal.commit()
+        self.assertEqual(wal.storage.count_blocks(), 0)
+
+        wal.write_block(filled(0, b'!'))
+        wal.commit()
+        self.assertEqual(wal.frames, {})
+        self.assertEqual(wal.storage.read_block(0), filled(0, b'!'))
+        self.assertEqual(wal.storage.read_block(1), filled(1, b'\1'))
+        wal.close()
+
+    def test_connection(self) -> None:
+        conn = Connection(self.path)
+        conn.execute('/create table t(a integer, b varchar(100)) /drop')
+        conn.execute("/insert into t (a, b) values (1, 'one'), (2, 'two') /drop")
+
+        # half-done statement: data reaches the log, but is never committed
+        table = conn.file.get_table_by_name(Identifier('t')).ok()
+        table.insert([3, 'three']).ok()
+        table.flush()
+        conn.file.pool.flush()
+        crash(conn.file.wal)
+
+        conn = Connection(self.path)
+        rows = [row.data for row in conn.execute('/select * from t /drop').ok().iter()]
+        self.assertEqual(rows, [[1, 'one'], [2, 'two']])
+        conn.close()
+
+    def test_group_commit(self) -> None:
+        wal = self.open(sync=GROUP)
+        first = wal.allocate_blocks(1)
+        wal.write_block(filled(first, b'a'))
+        wal.commit()
+        self.assertEqual(wal.unsynced, 1)
+
+        # idle commit syncs the group only once it is due
+        wal.commit()
+        self.assertEqual(wal.unsynced, 1)
+        wal.unsynced_since -= GROUP_INTERVAL
+        wal.commit()
+        self.assertEqual(wal.unsynced, 0)
+        wal.close()
+
+        os.remove(self.path)
+        conn = Connection(self.path)
+        conn.execute('/create table t(a integer) /drop')
+        conn.file.sync()
+        self.assertEqual(conn.file.wal.unsynced, 0)
+        conn.close()
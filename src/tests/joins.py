@@ -0,0 +1,142 @@
+from unittest import TestCase
+
+from dropSQL.ast import *
+from dropSQL.ast.planner import join_row_set, join_tables
+from dropSQL.engine.column import Column
+from dropSQL.engine.row_set import *
+from dropSQL.fs.connection import Connection
+from dropSQL.parser.streams import Tokens
+
+
+def on(sql: str) -> Expression:
+    return Expression.from_sql(Tokens.from_str(sql)).ok()
+
+
+class JoinTestCase(TestCase):
+    def setUp(self) -> None:
+        self.people = RenameTableRowSet(MockRowSet(
+            [Column(Identifier('person'), Identifier('id'), IntegerTy()),
+             Column(Identifier('person'), Identifier('name'), VarCharTy(16))],
+            [[1, 'rick'], [2, 'morty'], [3, 'jerry'], [4, 'beth']]), Identifier('p'))
+        self.pets = RenameTableRowSet(MockRowSet(
+            [Column(Identifier('pet'), Identifier('owner'), IntegerTy()),
+             Column(Identifier('pet'), Identifier('kind'), VarCharTy(16)),
+             Column(Identifier('pet'), Identifier('age'), IntegerTy())],
+            [[2, 'dog', 3], [3, 'cat', 5], [2, 'fish', 1], [5, 'bird', 2], [3.0, 'frog', 7]]), Identifier('q'))
+
+    def nested(self, lhs: RowSet, rhs: RowSet, sql: str):
+        return sorted(row.data for row in InnerJoinRowSet(lhs, rhs, on(sql), ()).iter())
+
+    def test_hash_join(self) -> None:
+        for sql in ('id = owner', '(q /owner) = (p /id)', "(id = owner) /and (kind /= 'dog')",
+                    '(age > 2) /and ((owner = id) /and (q /age < 7))', '(id = owner) /and (name = kind)'):
+            for lhs, rhs in ((self.people, self.pets), (self.pets, self.people)):
+                rs = join_row_set(lhs, rhs, on(sql), ()).ok()
+                hashed = rs if isinstance(rs, HashJoinRowSet) else rs.inner
+                self.assertIsInstance(hashed, HashJoinRowSet, sql)
+                self.assertEqual(rs.columns(), lhs.columns() + rhs.columns())
+                self.assertEqual(sorted(row.data for row in rs.iter()), self.nested(lhs, rhs, sql), sql)
+
+        # either side may be hashed
+        rs = HashJoinRowSet(self.people, self.pets, [(0, 0)])
+        self.assertTrue(rs.build_left())
+        self.assertFalse(HashJoinRowSet(self.pets, self.people, [(0, 0)]).build_left())
+        self.assertEqual(len(list(rs.iter())), 4)
+
+    def test_cross_join(self) -> None:
+        expected = sorted(l.data + r.data for l in self.people.iter() for r in self.pets.iter())
+
+        for chunk_rows, memory_rows in ((1024, 1024), (3, 2), (1, 1), (10, 4)):
+            rs = CrossJoinRowSet(self.people, self.pets, chunk_rows, memory_rows)
+            self.assertEqual(sorted(row.data for row in rs.iter()), expected)
+
+        self.assertEqual(list(CrossJoinRowSet(self.people, EmptyRowSet()).iter()), [])
+
+    def test_sort(self) -> None:
+        rs = MockRowSet(self.pets.columns(), [[i * 7 % 11, 'x' if i % 3 else 2.5, i] for i in range(30)])
+        expected = sorted((row.data for row in rs.iter()), key=lambda data: (isinstance(data[1], str), data[1], data[0]))
+
+        for memory_rows in (100, 30, 7, 1):
+            self.assertEqual([row.data for row in SortedRowSet(rs, [1, 0], memory_rows).iter()], expected)
+
+    def test_merge_join(self) -> None:
+        pets = MockRowSet(self.pets.columns(), [row.data for row in self.pets.iter()] + [['1', 'str', 1]])
+
+        for sql, keys in (('id = owner', [(0, 0)]), ('(id = age) /and (name = kind)', [(0, 2), (1, 1)])):
+            for memory_rows in (100, 2, 1):
+                lhs = SortedRowSet(self.people, [left for left, _ in keys], memory_rows)
+                rhs = SortedRowSet(pets, [right for _, right in keys], memory_rows)
+                rs = MergeJoinRowSet(lhs, rhs, keys, memory_rows)
+                self.assertEqual(sorted(row.data for row in rs.iter()), self.nested(self.people, pets, sql), sql)
+
+        conn = Connection()
+        conn.execute('/create table a(x integer, y varchar(8)) /drop')
+        conn.execute('/create table b(x integer, z float) /drop')
+        a = conn.file.get_table_by_name(Identifier('a')).ok()
+        b = conn.file.get_table_by_name(Identifier('b')).ok()
+        a.insert_many([[i % 7, str(i)] for i in range(20)]).ok()
+        b.insert_many([[i % 5, i / 2] for i in range(20)]).ok()
+
+        sql = '/select * from a /join b /on a /x = (b /x) /drop'
+        expected = sorted(row.data for row in conn.execute(sql).ok().iter())
+        self.assertEqual(len(expected), 5 * 3 * 4)
+
+        a.create_index(Identifier('a_x'), 0, 'btree').ok()
+        b.create_index(Identifier('b_x'), 0, 'btree').ok()
+        rs = join_row_set(TableRowSet(a), TableRowSet(b), on('a /x = (b /x)'), ()).ok()
+        self.assertIsInstance(rs, MergeJoinRowSet)
+        self.assertEqual(sorted(row.data for row in conn.execute(sql).ok().iter()), expected)
+
+    def test_prune_columns(self) -> None:
+        conn = Connection()
+        conn.execute('/create table a(x integer, y varchar(8), z float) /drop')
+        conn.execute('/create table b(x integer, w varchar(8)) /drop')
+        for i in range(10):
+            conn.execute("/insert into a (x, y, z) values (?1, 'y', 0.5) /drop", [i])
+            conn.execute("/insert into b (x, w) values (?1, 'w') /drop", [i % 3])
+
+        rs = conn.execute('/select w, z /from a /join b /on a /x = (b /x) /where z > 0 /drop').ok()
+        self.assertEqual(sorted(row.data for row in rs.iter()), [['w', 0.5]] * 10)
+
+        scans = rs.inner.lhs.inner, rs.inner.rhs
+        self.assertEqual([scan.needed for scan in scans], [[0, 2], None])
+
+        rs = conn.execute('/select * from a /where x = 1 /drop').ok()
+        self.assertEqual([row.data for row in rs.iter()], [[1, 'y', 0.5]])
+
+    def test_push_down(self) -> None:
+        def rows(rs: RowSet):
+            return sorted(row.data for row in rs.iter())
+
+        where = on("(kind /= 'fish') /and ((name /= 'jerry') /and ((id = owner) /and (1 = 1)))")
+        expected = rows(FilteredRowSet(CrossJoinRowSet(self.people, self.pets), where, ()))
+        self.assertEqual(expected, [[2, 'morty', 2, 'dog', 3]])
+
+        rs = join_tables([self.people, self.pets], [None], where, ()).ok()
+        self.assertEqual(rows(rs), expected)
+
+        # constant term is gone, terms of single tables filter the scans
+        self.assertIsInstance(rs, HashJoinRowSet)
+        self.assertIsInstance(rs.lhs, FilteredRowSet)
+        self.assertIsInstance(rs.rhs, FilteredRowSet)
+
+        # condition which never holds
+        rs = join_tables([self.people, self.pets], [on('id = owner')], on('(age > 1) /and (?1 = 2)'), (3,)).ok()
+        self.assertIsInstance(rs, EmptyRowSet)
+        self.assertEqual(rs.columns(), self.people.columns() + self.pets.columns())
+
+        # /on constraint only sees tables joined so far
+        pets = RenameTableRowSet(self.pets, Identifier('r'))
+        rs = join_tables([self.people, self.pets, pets], [on('id = (q /owner)'), None], None, ()).ok()
+        self.assertEqual(len(rows(rs)), 4 * 5)
+        self.assertFalse(join_tables([self.people, self.pets, pets], [on('id = (r /owner)'), None], None, ()))
+        self.assertFalse(join_tables([self.people, self.pets, pets], [None, None], on('owner = 1'), ()))
+
+    def test_nested_loops(self) -> None:
+        # no equality between the two sides
+        for sql in ('id < owner', '(id = 2) /and (owner = 2)', '(id = owner) /or (age = 1)'):
+            rs = join_row_set(self.people, self.pets, on(sql), ()).ok()
+            self.assertIsInstance(rs, InnerJoinRowSet, sql)
+
+        self.assertFalse(join_row_set(self.people, self.pets, on('(id = owner) /and (nope = 1)'), ()))
+        self.assertFalse(join_row_set(self.people, self.pets, on('id = nope'), ()))
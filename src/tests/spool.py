@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from dropSQL.engine.spool import RowSpool
+
+
+class RowSpoolTestCase(TestCase):
+    def test(self) -> None:
+        rows = [[i, str(i), i / 2] for i in range(10)]
+
+        with RowSpool(memory_rows=20) as spool:
+            spool.extend(rows)
+            self.assertFalse(spool.spilled())
+            self.assertEqual(list(spool), rows)
+
+        with RowSpool(memory_rows=4) as spool:
+            spool.extend(rows[:5])
+            self.assertTrue(spool.spilled())
+            self.assertEqual(next(iter(spool)), rows[0])  # abandoned reader
+
+            spool.extend(rows[5:])
+            self.assertEqual(len(spool), 10)
+            self.assertEqual(list(spool), rows)
+            self.assertEqual(list(spool), rows)
+
+        self.assertEqual(list(spool), [])
@@ -124,6 +124,8 @@ class TokensTestCase(TestCase):
         # @formatter:off
         self.assertIsInstance(tok('and'),        Operator)
         self.assertIsInstance(tok('as'),         As)
+        self.assertIsInstance(tok('begin'),      Begin)
+        self.assertIsInstance(tok('commit'),     Commit)
         self.assertIsInstance(tok('create'),     Create)
         self.assertIsInstance(tok('delete'),     Delete)
         self.assertIsInstance(tok('drop'),       Drop)
@@ -131,6 +133,7 @@ class TokensTestCase(TestCase):
         self.assertIsInstance(tok('float'),      Identifier)
         self.assertIsInstance(tok('from'),       From)
         self.assertIsInstance(tok('if'),         If)
+        self.assertIsInstance(tok('index'),      Identifier)
         self.assertIsInstance(tok('insert'),     Insert)
         self.assertIsInstance(tok('integer'),    Identifier)
         self.assertIsInstance(tok('into'),       Into)
@@ -140,10 +143,13 @@ class TokensTestCase(TestCase):
         self.assertIsInstance(tok('on'),         On)
         self.assertIsInstance(tok('or'),         Operator)
         self.assertIsInstance(tok('primary'),    Primary)
+        self.assertIsInstance(tok('rollback'),   Rollback)
         self.assertIsInstance(tok('select'),     Select)
         self.assertIsInstance(tok('set'),        SetKw)
         self.assertIsInstance(tok('table'),      Table)
         self.assertIsInstance(tok('update'),     Update)
+        self.assertIsInstance(tok('using'),      Identifier)
+        self.assertIsInstance(tok('vacuum'),     Vacuum)
         self.assertIsInstance(tok('values'),     Values)
         self.assertIsInstance(tok('varchar'),    Identifier)
         self.assertIsInstance(tok('where'),      Where)